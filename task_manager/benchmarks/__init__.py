@@ -0,0 +1,7 @@
+"""
+Standalone benchmarks for the task manager API.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the project
+directory. Benchmarks run against a throwaway test database, never against
+``db.sqlite3``.
+"""
@@ -0,0 +1,100 @@
+"""
+Measure the task list and stats as a user's history of completed tasks grows,
+with the history in the task table and once it has been archived.
+
+    python -m benchmarks.archive --sizes 10000 100000 --hot 1000 --requests 20
+
+For each size, a user has `--hot` open tasks and `--sizes` old completed
+ones. GET /task/tasks/ (first page, with the list cache off, so every request
+also computes its ETag over the user's tasks), the same sorted by title, a
+search, and GET /task/tasks/stats/ are timed; then the old tasks are moved
+to the archive (the time and rate of which are reported) and the requests
+are timed again, plus the first page with `include_archived=true`.
+"""
+
+import argparse
+import datetime
+import time
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--hot", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.db.models import Value
+    from django.db.models.functions import Concat
+    from django.test import override_settings
+    from django.urls import reverse
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+
+    from task import archive, search, stats
+    from task.models import Task
+
+    requests = {
+        "list": ("task-list", {}),
+        "by title": ("task-list", {"ordering": "title"}),
+        "search": ("task-list", {"search": "seeded 7"}),
+        "stats": ("task-stats", {}),
+    }
+
+    def time_requests(client, extra=()):
+        timings = {}
+        for label, (name, params) in [*requests.items(), *extra]:
+            url = reverse(name)
+            timings[label] = utils.summarize(
+                utils.measure(lambda: client.get(url, params), args.requests)
+            )["p50"]
+        return timings
+
+    with utils.test_database(), override_settings(TASK_LIST_CACHE={"ENABLED": False}):
+        client = APIClient()
+        print(
+            f"{'history':>9} {'tables':<8} "
+            + " ".join(f"{label + ' ms':>12}" for label in requests)
+            + f" {'+archived ms':>12}"
+        )
+        for size in sorted(args.sizes):
+            user = utils.create_user(f"bench-{size}@example.com")
+            utils.seed_tasks(user, size)
+            Task.objects.filter(user=user).update(
+                title=Concat(Value("Old "), "title"),
+                status="completed",
+                completed_at=datetime.date.today() - datetime.timedelta(days=400),
+                updated_at=timezone.now() - datetime.timedelta(days=400),
+            )
+            utils.seed_tasks(user, args.hot)
+            # bulk_create() sends no signals; index and count the tasks.
+            search.index_tasks(list(Task.objects.filter(user=user)))
+            stats.rebuild(user.pk)
+            client.force_authenticate(user)
+
+            before = time_requests(client)
+            start = time.perf_counter()
+            archived = archive.archive(batch_size=args.batch_size, pause=0)
+            elapsed = time.perf_counter() - start
+            after = time_requests(
+                client, [("+archived", ("task-list", {"include_archived": "true"}))]
+            )
+            for label, timings in (("one", before), ("archived", after)):
+                print(
+                    f"{size:>9} {label:<8} "
+                    + " ".join(f"{timings[name]:>12.2f}" for name in requests)
+                    + f" {timings.get('+archived', float('nan')):>12.2f}"
+                )
+            print(
+                f"{'':>9} archived {archived} tasks in {elapsed:.1f} s "
+                f"({archived / elapsed:.0f}/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Load test the task list under ASGI (async views) and WSGI (DRF views).
+
+    python -m benchmarks.asgi --connections 500 --requests 5000 --threads 32
+
+Both handlers are driven in-process, without sockets: the ASGI application
+from an event loop with `--connections` concurrent clients, the WSGI
+application from a pool of `--threads` worker threads (like gunicorn's gthread
+worker) with the same number of clients queueing for them. Every request is
+authenticated with a real access token.
+
+`--db-latency` adds a sleep to every query to stand in for the network round
+trip to a database server, which in-memory SQLite doesn't have.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from benchmarks import utils
+
+
+def add_query_latency(latency):
+    """
+    Sleep `latency` seconds before every query, on every connection.
+    """
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install, weak=False)
+    install(connection)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def report(label, timings, elapsed, statuses):
+    timings = sorted(timings)
+    print(
+        f"{label:<5} {len(timings) / elapsed:>8.0f} req/s  "
+        f"p50 {statistics.median(timings):>7.1f} ms  "
+        f"p99 {percentile(timings, 0.99):>7.1f} ms  statuses {sorted(statuses)}"
+    )
+
+
+async def load(call, connections, requests):
+    """
+    Run `requests` calls of the coroutine function `call` from `connections`
+    concurrent clients and return the latencies, elapsed time and statuses.
+    """
+    remaining = iter(range(requests))
+    timings, statuses = [], set()
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            statuses.add(await call())
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return timings, time.perf_counter() - start, statuses
+
+
+def asgi_caller(application, path, query, headers):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), *headers],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+    async def call():
+        sent = False
+        disconnect = asyncio.Event()
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Django listens for a client disconnect until the response is sent.
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await application(dict(scope), receive, send)
+        return messages[0]["status"]
+
+    return call
+
+
+def wsgi_caller(application, pool, path, query, headers, method="GET", body=b""):
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": BytesIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+        **{
+            "HTTP_" + name.decode().upper().replace("-", "_"): value.decode()
+            for name, value in headers
+        },
+    }
+
+    def handle():
+        statuses = []
+        response = application(
+            {**environ, "wsgi.input": BytesIO(body)},
+            lambda status, headers: statuses.append(status),
+        )
+        b"".join(response)
+        response.close()
+        return int(statuses[0].split()[0])
+
+    async def call():
+        return await asyncio.get_running_loop().run_in_executor(pool, handle)
+
+    return call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--path", default="/task/tasks/")
+    parser.add_argument("--query", default="page_size=20")
+    parser.add_argument(
+        "--cache", action="store_true", help="Keep the task list cache enabled."
+    )
+    parser.add_argument(
+        "--db-latency", type=float, default=0, help="Milliseconds added per query."
+    )
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.test import override_settings
+
+    from user.tokens import UserRefreshToken
+
+    with utils.test_database(), override_settings(
+        TASK_LIST_CACHE={"ENABLED": args.cache},
+        ALLOWED_HOSTS=["testserver"],
+        ASGI_URLCONF="task_manager.asgi_urls",
+    ):
+        user = utils.create_user()
+        utils.seed_tasks(user, args.tasks)
+        token = UserRefreshToken.for_user(user).access_token
+        headers = [(b"authorization", f"Bearer {token}".encode())]
+        if args.db_latency:
+            add_query_latency(args.db_latency / 1000)
+
+        print(
+            f"GET {args.path}?{args.query}: {args.requests} requests, "
+            f"{args.connections} concurrent clients, WSGI with {args.threads} threads, "
+            f"{args.db_latency} ms per query"
+        )
+        call = asgi_caller(get_asgi_application(), args.path, args.query, headers)
+        report("ASGI", *asyncio.run(load(call, args.connections, args.requests)))
+
+        with ThreadPoolExecutor(args.threads) as pool:
+            call = wsgi_caller(
+                get_wsgi_application(), pool, args.path, args.query, headers
+            )
+            report("WSGI", *asyncio.run(load(call, args.connections, args.requests)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare queries and latency per request for the two JWT authentication classes.
+
+    python -m benchmarks.auth --requests 500
+
+Runs the same authenticated GET /task/tasks/ and GET /task/tasks/<id>/
+requests with simplejwt's JWTAuthentication (one user SELECT per request) and
+with StatelessJWTAuthentication (user state served from the in-process cache).
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=50)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from task.models import Task
+    from task.views import TaskCreateListView, TaskUpdateDeleteView
+    from user.authentication import StatelessJWTAuthentication
+    from user.tokens import UserRefreshToken
+
+    views = [TaskCreateListView, TaskUpdateDeleteView]
+
+    # Measure the query path, not the per-user list cache.
+    with utils.test_database(), override_settings(TASK_LIST_CACHE={"ENABLED": False}):
+        user = utils.create_user()
+        utils.seed_tasks(user, args.tasks)
+        task = Task.objects.filter(user=user).first()
+
+        client = APIClient()
+        token = UserRefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        urls = {
+            "list": reverse("task-list"),
+            "detail": reverse("task-detail", kwargs={"pk": task.pk}),
+        }
+
+        print(f"{'auth class':<28} {'endpoint':<8} {'queries/req':>11} {'p50 ms':>8}")
+        for auth_class in (JWTAuthentication, StatelessJWTAuthentication):
+            for view in views:
+                view.authentication_classes = [auth_class]
+            for name, url in urls.items():
+                client.get(url)  # warm up caches
+                with CaptureQueriesContext(connection) as queries:
+                    timings = utils.measure(
+                        lambda: client.get(url), repeat=args.requests
+                    )
+                print(
+                    f"{auth_class.__name__:<28} {name:<8}"
+                    f" {len(queries) / args.requests:>11.2f}"
+                    f" {utils.summarize(timings)['p50']:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
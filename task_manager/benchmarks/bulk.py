@@ -0,0 +1,71 @@
+"""
+Time the bulk endpoint against one-at-a-time task creation.
+
+    python -m benchmarks.bulk --tasks 10000
+
+Reports the wall time and query count of a single bulk request that creates,
+updates and deletes `--tasks` tasks, next to creating a sample of tasks one
+request at a time through the list endpoint.
+"""
+
+import argparse
+import time
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--single-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task.models import Task
+
+    with utils.test_database():
+        user = utils.create_user()
+        client = APIClient()
+        client.force_authenticate(user)
+
+        def run(label, payload, count):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.post(reverse("task-bulk"), payload, format="json")
+                elapsed = time.perf_counter() - start
+            assert response.status_code == 200, response.data
+            print(
+                f"bulk {label:<7} {count:>7} tasks {elapsed * 1000:>9.1f} ms"
+                f" {len(queries):>5} queries"
+            )
+
+        creates = [{"title": f"Bulk {i}"} for i in range(args.tasks)]
+        run("create", {"create": creates}, args.tasks)
+
+        ids = list(Task.objects.filter(user=user).values_list("id", flat=True))
+        run(
+            "update",
+            {"update": [{"id": pk, "status": "completed"} for pk in ids]},
+            len(ids),
+        )
+        run("delete", {"delete": ids}, len(ids))
+
+        start = time.perf_counter()
+        for i in range(args.single_sample):
+            client.post(reverse("task-list"), {"title": f"Single {i}"})
+        elapsed = time.perf_counter() - start
+        per_task = elapsed / args.single_sample
+        print(
+            f"single create {args.single_sample:>5} tasks {elapsed * 1000:>9.1f} ms"
+            f" ({per_task * args.tasks:.1f} s extrapolated to {args.tasks})"
+        )
+
+
+if __name__ == "__main__":
+    main()
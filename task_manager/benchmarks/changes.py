@@ -0,0 +1,80 @@
+"""
+Measure keeping a client copy in sync as a user's task count grows.
+
+    python -m benchmarks.changes --sizes 1000 100000 --edits 50 --requests 20
+
+For each size, `--edits` tasks are updated or deleted after the client's last
+sync. Fetching the deltas from GET /task/tasks/changes/?since=<cursor> is
+compared with fetching every task again through GET /task/tasks/export/,
+in time and response bytes.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task import changes
+    from task.models import Task, TaskSequence
+    from task.queries import delete_task, update_task
+
+    with utils.test_database():
+        client = APIClient()
+
+        def sync(since):
+            size, url = 0, reverse("task-changes") + f"?since={since}&limit=1000"
+            while url:
+                response = client.get(url)
+                size += len(response.content)
+                url = response.data["next"]
+            return size
+
+        def refetch():
+            response = client.get(reverse("task-export"))
+            return sum(len(chunk) for chunk in response.streaming_content)
+
+        print(
+            f"{'tasks':>9} {'changes p50 ms':>15} {'bytes':>9} "
+            f"{'export p50 ms':>14} {'bytes':>11}"
+        )
+        for size in sorted(args.sizes):
+            user = utils.create_user(f"bench-{size}@example.com")
+            # bulk_create() sends no signals; record the seeded tasks' changes.
+            utils.seed_tasks(user, size)
+            tasks = list(Task.objects.filter(user=user).only("pk"))
+            changes.record(user.pk, tasks, [], [])
+            ids = [task.pk for task in tasks]
+            client.force_authenticate(user)
+            cursor = TaskSequence.objects.get(user=user).last
+
+            # Every fifth edit is a deletion.
+            for i, pk in enumerate(ids[:: max(1, size // args.edits)][: args.edits]):
+                if i % 5 == 4:
+                    delete_task(pk, user.pk)
+                else:
+                    update_task(pk, user.pk, {"status": "completed"})
+
+            incremental = utils.summarize(
+                utils.measure(lambda: sync(cursor), args.requests)
+            )
+            full = utils.summarize(utils.measure(refetch, args.requests))
+            print(
+                f"{size:>9} {incremental['p50']:>15.2f} {sync(cursor):>9} "
+                f"{full['p50']:>14.2f} {refetch():>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Measure concurrent write throughput of the database profiles.
+
+    python -m benchmarks.db_profiles --threads 8 --clients 32 --requests 2000
+    DATABASE_PROFILE=postgresql python -m benchmarks.db_profiles
+
+POST /task/tasks/ is sent from `--clients` concurrent clients to the WSGI
+application in-process, served by `--threads` worker threads, each request
+creating a task (and updating the user's task counters) in a fresh test
+database. With the SQLite profile, the tuned settings (WAL, PRAGMAs,
+IMMEDIATE transactions, persistent connections) are compared with Django's
+defaults on the same file-backed database; the PostgreSQL profile runs as
+configured by the POSTGRES_* environment variables.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks import utils
+from benchmarks.suite import inprocess_sender, run_scenario
+
+
+def run(label, args, database_name=None):
+    from django.core.wsgi import get_wsgi_application
+
+    from user.tokens import UserRefreshToken
+
+    with utils.test_database(database_name):
+        users = [utils.create_user(f"bench-{i}@example.com") for i in range(args.users)]
+        tokens = [str(UserRefreshToken.for_user(user).access_token) for user in users]
+        requests = [
+            (
+                "POST",
+                "/task/tasks/",
+                "",
+                tokens[i % len(tokens)],
+                urlencode({"title": f"Task {i}", "description": "Benchmark"}).encode(),
+            )
+            for i in range(args.requests)
+        ]
+        application = get_wsgi_application()
+        # Requests failing on a locked database would be logged one by one.
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        logging.getLogger("task_manager.slow_queries").setLevel(logging.ERROR)
+        with ThreadPoolExecutor(args.threads) as pool:
+            result = run_scenario(
+                inprocess_sender(application, pool), requests, args.clients
+            )
+    print(
+        f"{label:<16} {result['rps']:>8.0f} {result['p50']:>8.1f} "
+        f"{result['p99']:>8.1f}  {result['statuses']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test import override_settings
+
+    print(
+        f"POST /task/tasks/: {args.requests} requests, {args.clients} clients, "
+        f"{args.threads} threads"
+    )
+    print(f"{'profile':<16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+    with override_settings(ALLOWED_HOSTS=["testserver"]):
+        if connection.vendor != "sqlite":
+            run(settings.DATABASE_PROFILE, args)
+            return
+
+        tuned = dict(connection.settings_dict)
+        with tempfile.TemporaryDirectory() as directory:
+            for label, pragmas, options, max_age in (
+                ("sqlite defaults", {}, {}, 0),
+                (
+                    "sqlite tuned",
+                    settings.SQLITE_PRAGMAS,
+                    tuned["OPTIONS"],
+                    tuned["CONN_MAX_AGE"],
+                ),
+            ):
+                # Every thread's connection reads this same settings dict.
+                connection.settings_dict.update(OPTIONS=options, CONN_MAX_AGE=max_age)
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    run(label, args, os.path.join(directory, f"{max_age}.sqlite3"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Soak test the task event stream: hold many idle SSE connections in one
+process and compare their cost with polling the task list.
+
+    python -m benchmarks.event_streams --connections 10000 --idle 30
+
+Opens `--connections` streams on GET /task/tasks/events/ (one user each) on
+the ASGI application, in-process and without sockets, and reports the time
+to open them and the memory they hold. It then keeps them idle for `--idle`
+seconds with a `--heartbeat` keep-alive and reports the CPU time used,
+pushes one write to `--writes` of the users and reports the delivery
+latency, and finally compares with the CPU time the same clients would use
+polling GET /task/tasks/ every `--poll-interval` seconds.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks import utils
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Connection:
+    def __init__(self, application, path, token):
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        self.application = application
+        self.status = None
+        self.started = asyncio.Event()
+        self.disconnected = asyncio.Event()
+        self.received = asyncio.Event()
+        self.messages = 0
+        self.heartbeats = 0
+
+    async def run(self):
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.status = message["status"]
+                self.started.set()
+            elif message.get("body", b"").startswith(b":"):
+                self.heartbeats += 1
+            elif message.get("body"):
+                self.messages += 1
+                self.received.set()
+
+        await self.application(self.scope, receive, send)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--idle", type=float, default=30)
+    parser.add_argument("--heartbeat", type=float, default=15)
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=5)
+    parser.add_argument("--poll-requests", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_CONN_MAX_AGE"] = "0"
+    utils.setup()
+
+    import logging
+    import tempfile
+
+    from asgiref.sync import sync_to_async
+    from django.test import override_settings
+
+    from task.models import Task
+    from task.queries import update_task
+    from task_manager.asgi import application
+    from user.tokens import UserRefreshToken
+
+    with tempfile.TemporaryDirectory() as directory, utils.test_database(
+        os.path.join(directory, "events.sqlite3")
+    ), override_settings(
+        REQUEST_METRICS={"ENABLED": False},
+        TASK_EVENTS={"HEARTBEAT_SECONDS": args.heartbeat},
+    ):
+        users = utils.seed_users(args.connections, prefix="stream")
+        tasks = {
+            task.user_id: task
+            for task in Task.objects.bulk_create(
+                [Task(user=user, title="Seeded") for user in users[: args.writes]]
+            )
+        }
+        tokens = [str(UserRefreshToken.for_user(user).access_token) for user in users]
+        logging.getLogger("django.request").setLevel(logging.ERROR)
+
+        async def soak():
+            connections = [
+                Connection(application, "/task/tasks/events/", token)
+                for token in tokens
+            ]
+            before = rss_mb()
+            start = time.perf_counter()
+            runners = [asyncio.create_task(c.run()) for c in connections]
+            for connection in connections:
+                await connection.started.wait()
+            opened = time.perf_counter() - start
+            held = rss_mb() - before
+            statuses = sorted({c.status for c in connections})
+            print(
+                f"opened {len(connections)} streams in {opened:.1f} s, "
+                f"statuses {statuses}, {held:.0f} MB "
+                f"({held * 1024 / len(connections):.1f} KB per stream)"
+            )
+
+            cpu = time.process_time()
+            await asyncio.sleep(args.idle)
+            idle_cpu = time.process_time() - cpu
+            heartbeats = sum(c.heartbeats for c in connections)
+            print(
+                f"idle {args.idle:.0f} s: {idle_cpu:.2f} s CPU "
+                f"({idle_cpu / args.idle * 100:.1f}% of a core), "
+                f"{heartbeats} heartbeats"
+            )
+
+            @sync_to_async
+            def write():
+                for user_id, task in tasks.items():
+                    update_task(task.pk, user_id, {"status": "completed"})
+
+            writers = connections[: args.writes]
+            start = time.perf_counter()
+            await write()
+            await asyncio.gather(*(c.received.wait() for c in writers))
+            print(
+                f"pushed {len(writers)} writes, all delivered within "
+                f"{(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+
+            for connection in connections:
+                connection.disconnected.set()
+            await asyncio.gather(*runners)
+
+            polls = [
+                Connection(application, "/task/tasks/", tokens[i % len(tokens)])
+                for i in range(args.poll_requests)
+            ]
+            cpu = time.process_time()
+            for poll in polls:
+                await poll.run()
+            per_poll = (time.process_time() - cpu) / len(polls)
+            rate = len(connections) / args.poll_interval
+            print(
+                f"polling every {args.poll_interval:.0f} s instead: {rate:.0f} req/s "
+                f"x {per_poll * 1000:.2f} ms CPU = {rate * per_poll * 100:.0f}% "
+                "of a core"
+            )
+
+        asyncio.run(soak())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Import a generated NDJSON file of tasks and report the throughput.
+
+    python -m benchmarks.import_tasks --rows 100000 --batch-size 1000
+
+Compares with creating the same tasks one request at a time through the task
+list endpoint, measured on a sample of `--sample` requests.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task.importer import TaskImporter, read_rows
+
+    with utils.test_database(), tempfile.TemporaryFile() as f:
+        for i in range(args.rows):
+            item = {"title": f"Task {i}", "description": f"Imported task {i}"}
+            f.write(json.dumps(item).encode() + b"\n")
+        f.seek(0)
+
+        user = utils.create_user()
+        importer = TaskImporter(user, batch_size=args.batch_size)
+        report = importer.run(read_rows(f, "ndjson"))
+        print(
+            f"import: {report['imported']} rows in {report['elapsed']:.1f} s, "
+            f"{report['rows_per_second']} rows/s"
+        )
+
+        client = APIClient()
+        client.force_authenticate(utils.create_user("single@example.com"))
+        start = time.perf_counter()
+        for i in range(args.sample):
+            client.post(reverse("task-list"), {"title": f"Task {i}"})
+        rate = args.sample / (time.perf_counter() - start)
+        print(
+            f"one request per task: {rate:.0f} rows/s, "
+            f"{args.rows / rate:.0f} s for {args.rows} rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure background job throughput.
+
+    python -m benchmarks.jobs --jobs 2000 --processes 1 2 4
+
+`--jobs` counter rebuild jobs ("task.rebuild_stats" for one user each) are
+queued in a SQLite file and run by `manage.py run_workers --burst` with each
+number of `--processes`, and once by a single worker in this process. The
+jobs per second are reported from the first job started to the last one
+finished (so without the time to start the worker processes), with the
+wall time of the whole run.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from io import StringIO
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--tasks", type=int, default=10)
+    args = parser.parse_args()
+
+    # Worker processes read the database and files location from the
+    # environment, like this process.
+    directory = tempfile.TemporaryDirectory()
+    os.environ["SQLITE_PATH"] = os.path.join(directory.name, "jobs.sqlite3")
+    os.environ["JOBS_FILES_DIR"] = os.path.join(directory.name, "files")
+
+    from benchmarks import utils
+
+    utils.setup()
+
+    from django.core.management import call_command
+    from django.db.models import Max, Min
+
+    from jobs.models import Job
+    from jobs.worker import Worker
+    from task.models import Task
+
+    call_command("migrate", verbosity=0)
+    users = utils.seed_users(args.jobs)
+    Task.objects.bulk_create(
+        [
+            Task(user=user, title=f"Task {i}")
+            for user in users
+            for i in range(args.tasks)
+        ],
+        batch_size=10000,
+    )
+
+    def run(label, work):
+        Job.objects.all().delete()
+        Job.objects.bulk_create(
+            [
+                Job(kind="task.rebuild_stats", payload={"user_ids": [user.pk]})
+                for user in users
+            ]
+        )
+        start = time.perf_counter()
+        work()
+        wall = time.perf_counter() - start
+        done = Job.objects.filter(status=Job.SUCCEEDED)
+        span = done.aggregate(start=Min("started_at"), end=Max("finished_at"))
+        busy = (span["end"] - span["start"]).total_seconds()
+        print(
+            f"{label:<12} {done.count():>6} {done.count() / busy:>10.0f} "
+            f"{wall:>8.1f}"
+        )
+
+    print(f"{'workers':<12} {'jobs':>6} {'jobs/s':>10} {'wall s':>8}")
+    run("in-process", lambda: Worker().run(burst=True))
+    for processes in args.processes:
+        run(
+            f"{processes} process{'es' if processes > 1 else ''}",
+            lambda: call_command(
+                "run_workers", processes=processes, burst=True, stdout=StringIO()
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
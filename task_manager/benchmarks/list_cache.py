@@ -0,0 +1,55 @@
+"""
+Compare cached and uncached task list requests.
+
+    python -m benchmarks.list_cache --tasks 1000 --page-size 100
+
+A cache hit is served without running the list query or the serializer.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task import cache
+
+    with utils.test_database():
+        user = utils.create_user()
+        utils.seed_tasks(user, args.tasks)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("task-list") + f"?page_size={args.page_size}"
+
+        print(f"{'mode':<10} {'queries/req':>11} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, enabled in (("uncached", False), ("cached", True)):
+            with override_settings(TASK_LIST_CACHE={"ENABLED": enabled}):
+                client.get(url)  # fill the cache
+                with CaptureQueriesContext(connection) as queries:
+                    timings = utils.measure(
+                        lambda: client.get(url), repeat=args.requests
+                    )
+            summary = utils.summarize(timings)
+            print(
+                f"{label:<10} {len(queries) / args.requests:>11.2f}"
+                f" {summary['p50']:>8.2f} {summary['p95']:>8.2f}"
+            )
+        print(f"cache counters: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Measure task endpoint latency during a login storm.
+
+    python -m benchmarks.login_storm --logins 200 --threads 32
+
+The WSGI application is driven in-process by a pool of `--threads` worker
+threads (like gunicorn's gthread worker). `--task-clients` clients fetch a task
+while `--logins` concurrent clients log in over and over, with real PBKDF2
+hashes. The task latency is reported without logins, with an effectively
+unbounded hashing pool (every login hashes on its own, as before the pool
+existed) and with the bounded pool from settings.PASSWORD_HASHING_POOL.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks import utils
+from benchmarks.asgi import percentile, wsgi_caller
+
+
+async def storm(task_call, login_call, task_clients, requests, logins):
+    """
+    Run `requests` task calls from `task_clients` clients while `logins`
+    clients keep logging in; return the task latencies and login statuses.
+    """
+    remaining = iter(range(requests))
+    timings, login_statuses = [], []
+    done = asyncio.Event()
+
+    async def task_client():
+        for _ in remaining:
+            start = time.perf_counter()
+            assert await task_call() == 200
+            timings.append((time.perf_counter() - start) * 1000)
+
+    async def login_client():
+        while not done.is_set():
+            status = await login_call()
+            login_statuses.append(status)
+            if status == 429:
+                # Honour Retry-After, like a well behaved client.
+                await asyncio.sleep(1)
+
+    logins = [asyncio.ensure_future(login_client()) for _ in range(logins)]
+    start = time.perf_counter()
+    await asyncio.gather(*(task_client() for _ in range(task_clients)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*logins)
+    return sorted(timings), elapsed, login_statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--task-clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    utils.setup()
+    # Every shed login would otherwise log a "Too Many Requests" warning.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.test import override_settings
+
+    from task.models import Task
+    from user import hashing
+    from user.tokens import UserRefreshToken
+
+    with utils.test_database(), override_settings(ALLOWED_HOSTS=["testserver"]):
+        user = utils.create_user()
+        task = Task.objects.create(user=user, title="Task")
+        token = UserRefreshToken.for_user(user).access_token
+        headers = [(b"authorization", f"Bearer {token}".encode())]
+        body = urlencode({"email": user.email, "password": "benchpass123"}).encode()
+        application = get_wsgi_application()
+
+        bounded = settings.PASSWORD_HASHING_POOL
+        scenarios = [
+            ("no logins", 0, bounded),
+            ("unbounded pool", args.logins, {"WORKERS": args.logins, "QUEUE_SIZE": 0}),
+            (
+                f"pool {bounded['WORKERS']}+{bounded['QUEUE_SIZE']}",
+                args.logins,
+                bounded,
+            ),
+        ]
+        print(
+            f"GET a task with {args.task_clients} clients, {args.requests} requests, "
+            f"WSGI with {args.threads} threads"
+        )
+        for label, logins, config in scenarios:
+            hashing._pool = hashing.HashingPool(
+                workers=config["WORKERS"], queue_size=config["QUEUE_SIZE"]
+            )
+            with ThreadPoolExecutor(args.threads) as pool:
+                task_call = wsgi_caller(
+                    application, pool, f"/task/tasks/{task.pk}/", "", headers
+                )
+                login_call = wsgi_caller(
+                    application, pool, "/user/login/", "", [], "POST", body
+                )
+                timings, elapsed, statuses = asyncio.run(
+                    storm(
+                        task_call,
+                        login_call,
+                        args.task_clients,
+                        args.requests,
+                        logins,
+                    )
+                )
+            print(
+                f"{label:<16} tasks {len(timings) / elapsed:>6.0f} req/s  "
+                f"p50 {percentile(timings, 0.5):>7.1f} ms  "
+                f"p99 {percentile(timings, 0.99):>7.1f} ms  "
+                f"logins {statuses.count(200)} ok, {statuses.count(429)} shed"
+            )
+
+
+if __name__ == "__main__":
+    main()
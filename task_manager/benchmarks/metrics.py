@@ -0,0 +1,101 @@
+"""
+Measure the overhead of the request metrics middleware.
+
+    python -m benchmarks.metrics --rounds 10 --requests 300
+
+The same requests are sent to a WSGI handler built with REQUEST_METRICS
+disabled and to one built with it enabled (with Server-Timing), alternating
+in rounds so drift in machine load affects both alike. Requests are
+authenticated with a real access token and the task list cache is off, so
+each request runs its queries.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks import utils
+from benchmarks.asgi import wsgi_caller
+
+
+def rate(call, requests):
+    """
+    Return the requests per second of `requests` sequential calls.
+    """
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call()
+        return requests / (time.perf_counter() - start)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.test import override_settings
+
+    from task.models import Task
+    from task_manager.middleware import install_query_timer, time_query
+    from user.tokens import UserRefreshToken
+
+    with utils.test_database(), override_settings(
+        TASK_LIST_CACHE={"ENABLED": False}, ALLOWED_HOSTS=["testserver"]
+    ):
+        user = utils.create_user()
+        utils.seed_tasks(user, args.tasks)
+        task = Task.objects.filter(user=user).first()
+        token = UserRefreshToken.for_user(user).access_token
+        headers = [(b"authorization", f"Bearer {token}".encode())]
+
+        with override_settings(REQUEST_METRICS={"ENABLED": False}):
+            plain = get_wsgi_application()
+        with override_settings(REQUEST_METRICS={"SERVER_TIMING": True}):
+            instrumented = get_wsgi_application()
+
+        endpoints = [
+            ("list", "/task/tasks/", "page_size=20"),
+            ("detail", f"/task/tasks/{task.pk}/", ""),
+        ]
+
+        def use_query_timer(enabled):
+            # The middleware's query wrapper stays on a connection once
+            # installed; take it off for the runs without the middleware.
+            if time_query in connection.execute_wrappers:
+                connection.execute_wrappers.remove(time_query)
+            if enabled:
+                install_query_timer(connection)
+
+        # One thread, so every request uses the same connection.
+        with ThreadPoolExecutor(1) as pool:
+            print(f"{'endpoint':<8} {'off req/s':>10} {'on req/s':>10} {'overhead':>9}")
+            for label, path, query in endpoints:
+                calls = {
+                    name: wsgi_caller(application, pool, path, query, headers)
+                    for name, application in (("off", plain), ("on", instrumented))
+                }
+                rates = {"off": [], "on": []}
+                for _ in range(args.rounds):
+                    for name, call in calls.items():
+                        pool.submit(use_query_timer, name == "on").result()
+                        rates[name].append(rate(call, args.requests))
+                off = statistics.median(rates["off"])
+                on = statistics.median(rates["on"])
+                print(f"{label:<8} {off:>10.0f} {on:>10.0f} {(off - on) / off:>9.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare keyset pagination with OFFSET paging on a large task list.
+
+    python -m benchmarks.pagination --tasks 1000000 --pages 1,100,1000,10000
+
+Keyset latency should stay flat as the page number grows, while OFFSET latency
+grows with the number of skipped rows.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", default="1,10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.test import override_settings
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task.models import Task
+    from task.pagination import TaskCursorPagination
+
+    # Measure the query path, not the per-user list cache.
+    with utils.test_database(), override_settings(TASK_LIST_CACHE={"ENABLED": False}):
+        user = utils.create_user()
+        print(f"Seeding {args.tasks} tasks...")
+        utils.seed_tasks(user, args.tasks)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        paginator = TaskCursorPagination()
+        ordered = Task.objects.filter(user=user).order_by(*paginator.ordering)
+        url = reverse("task-list")
+
+        print(f"{'page':>8} {'keyset endpoint p50 ms':>24} {'OFFSET query p50 ms':>22}")
+        for page in (int(p) for p in args.pages.split(",")):
+            offset = (page - 1) * args.page_size
+            if offset >= args.tasks:
+                continue
+
+            params = {"page_size": args.page_size}
+            if offset:
+                # The cursor for page N points at the last row of page N - 1.
+                last = ordered[offset - 1]
+                position = [
+                    getattr(last, field.lstrip("-")) for field in paginator.ordering
+                ]
+                params["cursor"] = paginator.encode_cursor(position)
+
+            keyset = utils.measure(lambda: client.get(url, params), repeat=args.repeat)
+            paged = utils.measure(
+                lambda: list(ordered[offset : offset + args.page_size]),
+                repeat=args.repeat,
+            )
+            print(
+                f"{page:>8} {utils.summarize(keyset)['p50']:>24.2f}"
+                f" {utils.summarize(paged)['p50']:>22.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measure task traffic while a user with many tasks is deleted.
+
+    python -m benchmarks.purge --tasks 200000 --batch-size 1000 --pause-ms 50
+
+A user with `--tasks` tasks (and their changes feed rows) is deleted once
+with Django's cascade, user.delete(), and once by marking them for deletion
+and running the batched purge, on a file-backed SQLite database. Meanwhile
+another user's client alternates GET /task/tasks/ and PATCH
+/task/tasks/<id>/ from a second thread; the latency of those requests
+during each deletion is reported, with the time the deletion took and the
+time the deleting request (the cascade, or marking the user) took.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks import utils
+
+
+class Traffic(threading.Thread):
+    """
+    Send requests as `user` until stopped, recording their latency.
+    """
+
+    def __init__(self, user, task_ids):
+        super().__init__()
+        self.user = user
+        self.task_ids = task_ids
+        self.timings = []
+        self.statuses = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        i = 0
+        try:
+            while not self.stopped.is_set():
+                start = time.perf_counter()
+                if i % 2:
+                    pk = self.task_ids[i % len(self.task_ids)]
+                    response = client.patch(
+                        reverse("task-detail", args=[pk]), {"description": f"{i}"}
+                    )
+                else:
+                    response = client.get(reverse("task-list"))
+                self.timings.append((time.perf_counter() - start) * 1000)
+                status = response.status_code
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                i += 1
+        finally:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.test import override_settings
+
+    from task import changes
+    from task.models import Task
+    from user import purge
+
+    # Requests failing on a locked database would be logged one by one.
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    logging.getLogger("task_manager.slow_queries").setLevel(logging.ERROR)
+
+    def cascade(user):
+        user.delete()
+
+    def batched(user):
+        (user_purge,) = purge.schedule([user])
+        marked.append(time.perf_counter())
+        purge.run(user_purge, args.batch_size, args.pause_ms / 1000)
+
+    print(f"deleting a user with {args.tasks} tasks")
+    print(
+        f"{'deletion':<9} {'request ms':>10} {'total s':>8} {'traffic p50 ms':>15} "
+        f"{'p95':>8} {'max':>8}  statuses"
+    )
+    with tempfile.TemporaryDirectory() as directory, utils.test_database(
+        os.path.join(directory, "purge.sqlite3")
+    ), override_settings(TASK_LIST_CACHE={"ENABLED": False}):
+        other = utils.create_user("traffic@example.com")
+        utils.seed_tasks(other, 100)
+        task_ids = list(
+            Task.objects.filter(user=other).values_list("pk", flat=True)[:50]
+        )
+        for label, delete in (("cascade", cascade), ("batched", batched)):
+            user = utils.create_user(f"{label}@example.com")
+            utils.seed_tasks(user, args.tasks)
+            # bulk_create() sends no signals; record the seeded tasks' changes.
+            changes.record(user.pk, list(Task.objects.filter(user=user)), [], [])
+
+            marked = []
+            traffic = Traffic(other, task_ids)
+            traffic.start()
+            # Warm up, then only count what runs during the deletion.
+            time.sleep(1)
+            traffic.timings.clear()
+            traffic.statuses.clear()
+            start = time.perf_counter()
+            delete(user)
+            total = time.perf_counter() - start
+            traffic.stopped.set()
+            traffic.join()
+            request = (marked[0] - start) * 1000 if marked else total * 1000
+            timings = utils.summarize(traffic.timings)
+            print(
+                f"{label:<9} {request:>10.0f} {total:>8.1f} {timings['p50']:>15.1f} "
+                f"{timings['p95']:>8.1f} {timings['max']:>8.0f}  "
+                f"{dict(sorted(traffic.statuses.items()))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Check read-replica routing against two SQLite files.
+
+    python -m benchmarks.replicas --sticky-seconds 1 --requests 500
+
+A primary and a replica file are created in a temporary directory
+(SQLITE_PATH and SQLITE_REPLICA) and the replica is refreshed only by
+`manage.py sync_replica`, so it lags like a real one. The harness then
+checks that a user reads their own writes from the primary through the
+cookie and through the token claim, that once the sticky window has passed
+reads go to the stale replica, and that they see the write after a sync.
+It exits with status 1 if any check fails, then reports the task list
+throughput served by the replica and by the primary.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sticky-seconds", type=float, default=1)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    os.environ["SQLITE_PATH"] = os.path.join(directory.name, "primary.sqlite3")
+    os.environ["SQLITE_REPLICA"] = os.path.join(directory.name, "replica.sqlite3")
+
+    from benchmarks import utils
+
+    utils.setup()
+
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from task_manager import routers
+    from user.tokens import UserRefreshToken
+
+    # The stale read's 404 would be logged.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+    call_command("migrate", verbosity=0)
+    user = utils.create_user()
+    utils.seed_tasks(user, args.tasks)
+    call_command("sync_replica", stdout=StringIO())
+    token = UserRefreshToken.for_user(user).access_token
+    headers = {"Authorization": f"Bearer {token}"}
+
+    failures = []
+
+    def check(label, response, expected):
+        ok = response.status_code == expected
+        print(f"{'ok' if ok else 'FAILED':<7} {label}: {response.status_code}")
+        if not ok:
+            failures.append(label)
+
+    config = {**routers.get_config(), "STICKY_SECONDS": args.sticky_seconds}
+    with override_settings(
+        ALLOWED_HOSTS=["testserver"],
+        REPLICA_ROUTING=config,
+        TASK_LIST_CACHE={"ENABLED": False},
+    ):
+        browser = Client(headers=headers)
+        response = browser.post(reverse("task-list"), {"title": "Fresh task"})
+        check("create on the primary", response, 201)
+        detail = reverse("task-detail", kwargs={"pk": response.data["id"]})
+        check("read back with the cookie", browser.get(detail), 200)
+        check(
+            "read back with the token claim", Client(headers=headers).get(detail), 200
+        )
+
+        time.sleep(args.sticky_seconds + 0.1)
+        check("read after the window, stale replica", browser.get(detail), 404)
+        call_command("sync_replica", stdout=StringIO())
+        check("read after sync_replica", browser.get(detail), 200)
+
+        url = reverse("task-list") + "?page_size=20"
+        print(f"GET {url}: {args.requests} requests")
+        for label, replicas in (("replica", config["REPLICAS"]), ("primary", [])):
+            with override_settings(REPLICA_ROUTING={**config, "REPLICAS": replicas}):
+                client = Client(headers=headers)
+                summary = utils.summarize(
+                    utils.measure(lambda: client.get(url), args.requests)
+                )
+            print(
+                f"{label:<8} p50 {summary['p50']:.2f} ms  p95 {summary['p95']:.2f} ms"
+            )
+
+    directory.cleanup()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the TaskSerializer list path with the TaskRowSerializer fast path.
+
+    python -m benchmarks.serialization --rows 10000
+
+Both paths fetch the same rows, build the representation and render JSON; the
+output bytes are checked to be identical.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from task.models import Task
+    from task.renderers import FastJSONRenderer, orjson
+    from task.serializers import TaskRowSerializer, TaskSerializer
+
+    with utils.test_database():
+        user = utils.create_user()
+        utils.seed_tasks(user, args.rows)
+        queryset = Task.objects.filter(user=user).order_by("-updated_at", "-id")
+
+        def serializer_path():
+            data = TaskSerializer(queryset.all(), many=True).data
+            return JSONRenderer().render({"next": None, "results": data})
+
+        def fast_path():
+            row_serializer = TaskRowSerializer()
+            rows = queryset.values(*row_serializer.fields)
+            data = row_serializer.to_representation(rows)
+            return FastJSONRenderer().render({"next": None, "results": data})
+
+        assert serializer_path() == fast_path(), "outputs differ"
+
+        print(f"{args.rows} rows, orjson {'enabled' if orjson else 'not installed'}")
+        print(f"{'path':<16} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, func in (
+            ("TaskSerializer", serializer_path),
+            ("fast path", fast_path),
+        ):
+            summary = utils.summarize(utils.measure(func, repeat=args.repeat))
+            print(f"{label:<16} {summary['p50']:>8.1f} {summary['p95']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
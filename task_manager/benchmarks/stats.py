@@ -0,0 +1,76 @@
+"""
+Measure the task stats endpoint as a user's task count grows.
+
+    python -m benchmarks.stats --sizes 1000 100000 1000000 --requests 50
+
+For each size, GET /task/tasks/stats/ (read from the counters) is compared
+with computing the same numbers from the task table: a COUNT ... GROUP BY
+status and per-day counts of the tasks created and completed over the window.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def aggregate(user, days):
+    import datetime
+
+    from django.db.models import Count
+
+    from task.models import Task
+
+    first_day = datetime.date.today() - datetime.timedelta(days=days - 1)
+    tasks = Task.objects.filter(user=user)
+    list(tasks.values_list("status").annotate(Count("id")))
+    list(
+        tasks.filter(created_at__gte=first_day)
+        .values_list("created_at")
+        .annotate(Count("id"))
+    )
+    list(
+        tasks.filter(status="completed", completed_at__gte=first_day)
+        .values_list("completed_at")
+        .annotate(Count("id"))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from task import stats
+
+    with utils.test_database():
+        client = APIClient()
+        url = reverse("task-stats")
+
+        print(f"{'tasks':>9} {'counters p50 ms':>16} {'aggregate p50 ms':>17}")
+        for size in sorted(args.sizes):
+            user = utils.create_user(f"bench-{size}@example.com")
+            # bulk_create() sends no signals; rebuild the counters afterwards.
+            utils.seed_tasks(user, size)
+            stats.rebuild(user.pk)
+            client.force_authenticate(user)
+
+            counters = utils.summarize(
+                utils.measure(
+                    lambda: client.get(url, {"days": args.days}), args.requests
+                )
+            )
+            computed = utils.summarize(
+                utils.measure(lambda: aggregate(user, args.days), args.requests)
+            )
+            print(f"{size:>9} {counters['p50']:>16.2f} {computed['p50']:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Load test the task and user endpoints and check for regressions.
+
+    python -m benchmarks.suite --users 10 --tasks-per-user 1000 --output run.json
+    python -m benchmarks.suite --transport server
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.2
+
+Seeds `--users` users with `--tasks-per-user` tasks each, then sends
+`--requests` requests to each endpoint (list, detail, create, update,
+delete, login and refresh) from `--clients` concurrent clients. Requests go
+to the WSGI application in-process (`--transport inprocess`) or over HTTP to
+a threaded server started on a local port (`--transport server`); both use
+`--threads` worker threads and a throwaway file-backed SQLite database.
+Every request carries a real access token, and the data and the order of
+requests are the same on every run with the same `--seed`. The list pages
+are cached before the run, so the list scenario measures cache hits unless
+`--no-list-cache` turns the cache off.
+
+For each endpoint the suite reports requests per second, p50/p95/p99
+latency and SQL queries per request (from the request metrics middleware).
+With `--baseline`, a run whose throughput drops or whose p95 latency rises
+by more than `--threshold`, or whose queries per request grow by more than
+0.05 (periodic work such as the revocation filter's sync), exits with
+status 1. Write a baseline with `--output` from a run on the same machine.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from benchmarks import utils
+from benchmarks.asgi import load, percentile, wsgi_caller
+
+SCENARIOS = ("list", "detail", "create", "update", "delete", "login", "refresh")
+
+# The status each scenario's requests are expected to get.
+EXPECTED_STATUS = {
+    "list": 200,
+    "detail": 200,
+    "create": 201,
+    "update": 200,
+    "delete": 200,
+    "login": 200,
+    "refresh": 200,
+}
+
+
+def build_requests(name, count, users, tokens, task_ids, rng):
+    """
+    Return `count` requests for scenario `name` as (method, path, query,
+    access token, body) tuples, spread round robin over `users`.
+    """
+    from task.models import Task
+    from user.tokens import UserRefreshToken
+
+    requests = []
+    for i in range(count):
+        user = users[i % len(users)]
+        token = tokens[user.pk]
+        if name == "list":
+            requests.append(("GET", "/task/tasks/", "page_size=20", token, b""))
+        elif name == "detail":
+            pk = rng.choice(task_ids[user.pk])
+            requests.append(("GET", f"/task/tasks/{pk}/", "", token, b""))
+        elif name == "create":
+            body = urlencode({"title": f"Created {i}", "description": "Benchmark"})
+            requests.append(("POST", "/task/tasks/", "", token, body.encode()))
+        elif name == "update":
+            pk = rng.choice(task_ids[user.pk])
+            body = urlencode({"status": ("in_progress", "completed", "pending")[i % 3]})
+            requests.append(("PATCH", f"/task/tasks/{pk}/", "", token, body.encode()))
+        elif name == "delete":
+            task = Task.objects.create(user=user, title=f"Delete {i}")
+            requests.append(("DELETE", f"/task/tasks/{task.pk}/", "", token, b""))
+        elif name == "login":
+            body = urlencode({"email": user.email, "password": "benchpass123"})
+            requests.append(("POST", "/user/login/", "", None, body.encode()))
+        elif name == "refresh":
+            body = urlencode({"refresh": str(UserRefreshToken.for_user(user))})
+            requests.append(("POST", "/user/token/refresh/", "", None, body.encode()))
+    return requests
+
+
+def inprocess_sender(application, pool):
+    def send(method, path, query, token, body):
+        headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+        return wsgi_caller(application, pool, path, query, headers, method, body)()
+
+    return send
+
+
+def server_sender(address, pool):
+    host, port = address
+
+    def request(method, path, query, token, body):
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        try:
+            connection.request(
+                method, f"{path}?{query}" if query else path, body, headers
+            )
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    async def send(*args):
+        return await asyncio.get_running_loop().run_in_executor(pool, request, *args)
+
+    return send
+
+
+def start_server(application, threads):
+    """
+    Serve `application` on a free local port from a background thread.
+    """
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class Server(ThreadedWSGIServer):
+        # Handle at most `threads` requests at once, like the in-process pool.
+        slots = threading.BoundedSemaphore(threads)
+
+        def process_request(self, request, client_address):
+            self.slots.acquire()
+            super().process_request(request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            try:
+                super().process_request_thread(request, client_address)
+            finally:
+                self.slots.release()
+
+    server = Server(("127.0.0.1", 0), WSGIRequestHandler, allow_reuse_address=True)
+    server.set_app(application)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(send, requests, clients):
+    """
+    Send `requests` from `clients` concurrent clients and summarize them.
+    """
+    from task_manager.metrics import registry
+
+    remaining = iter(requests)
+    statuses = []
+
+    async def call():
+        status = await send(*next(remaining))
+        statuses.append(status)
+        return status
+
+    registry.clear()
+    timings, elapsed, _ = asyncio.run(load(call, clients, len(requests)))
+    timings.sort()
+    queries = sum(total for _, total in registry.queries.series.values())
+    return {
+        "requests": len(timings),
+        "rps": len(timings) / elapsed,
+        "p50": percentile(timings, 0.5),
+        "p95": percentile(timings, 0.95),
+        "p99": percentile(timings, 0.99),
+        "queries_per_request": queries / len(timings),
+        "statuses": sorted(set(statuses)),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the regressions of `results` against `baseline`, as messages.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['rps']:.0f} req/s, baseline {base['rps']:.0f}"
+            )
+        if result["p95"] > base["p95"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {result['p95']:.1f} ms, baseline {base['p95']:.1f}"
+            )
+        if result["queries_per_request"] > base["queries_per_request"] + 0.05:
+            regressions.append(
+                f"{name}: {result['queries_per_request']:.2f} queries per request, "
+                f"baseline {base['queries_per_request']:.2f}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks-per-user", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--login-requests",
+        type=int,
+        default=50,
+        help="Requests for the login scenario, which hashes a password each.",
+    )
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument(
+        "--transport", choices=("inprocess", "server"), default="inprocess"
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--no-list-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with this results JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config = {
+        name: getattr(args, name)
+        for name in (
+            "users",
+            "tasks_per_user",
+            "requests",
+            "login_requests",
+            "clients",
+            "threads",
+            "transport",
+            "no_list_cache",
+        )
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            parser.error(
+                f"{args.baseline} was recorded with {baseline['config']}, "
+                f"not {config}"
+            )
+
+    utils.setup()
+
+    from django.core.wsgi import get_wsgi_application
+    from django.test import override_settings
+
+    from task import stats
+    from task.models import Task
+    from user.tokens import UserRefreshToken
+
+    rng = random.Random(args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, utils.test_database(
+        os.path.join(directory, "suite.sqlite3")
+    ), override_settings(
+        ALLOWED_HOSTS=["testserver", "127.0.0.1"],
+        REQUEST_METRICS={"ENABLED": True},
+        TASK_LIST_CACHE={"ENABLED": not args.no_list_cache},
+    ):
+        users = utils.seed_users(args.users)
+        for user in users:
+            utils.seed_tasks(user, args.tasks_per_user)
+            stats.rebuild(user.pk)
+        tokens = {
+            user.pk: str(UserRefreshToken.for_user(user).access_token) for user in users
+        }
+        task_ids = {
+            user.pk: list(Task.objects.filter(user=user).values_list("pk", flat=True))
+            for user in users
+        }
+        application = get_wsgi_application()
+        # After get_wsgi_application(), which configures logging again: the
+        # server's access log and slow queries (lock waits count) would
+        # otherwise be printed request by request.
+        for name in ("django.request", "django.server", "task_manager.slow_queries"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+        with ThreadPoolExecutor(args.threads) as pool:
+            if args.transport == "server":
+                server = start_server(application, args.threads)
+                send = server_sender(server.server_address, pool)
+            else:
+                server = None
+                send = inprocess_sender(application, pool)
+            print(
+                f"{args.users} users x {args.tasks_per_user} tasks, "
+                f"{args.clients} clients, {args.threads} threads, {args.transport}"
+            )
+            print(
+                f"{'scenario':<8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                f"{'p99 ms':>8} {'queries':>8}  statuses"
+            )
+            try:
+                # Fill the per-process caches (user state, list pages) first,
+                # so that concurrent misses don't make query counts vary.
+                for user in users:
+                    asyncio.run(
+                        send(
+                            "GET", "/task/tasks/", "page_size=20", tokens[user.pk], b""
+                        )
+                    )
+                for name in args.scenarios:
+                    count = args.login_requests if name == "login" else args.requests
+                    requests = build_requests(name, count, users, tokens, task_ids, rng)
+                    result = results[name] = run_scenario(send, requests, args.clients)
+                    print(
+                        f"{name:<8} {result['rps']:>8.0f} {result['p50']:>8.1f} "
+                        f"{result['p95']:>8.1f} {result['p99']:>8.1f} "
+                        f"{result['queries_per_request']:>8.2f}  {result['statuses']}"
+                    )
+            finally:
+                if server is not None:
+                    server.shutdown()
+                    server.server_close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+            f.write("\n")
+
+    failures = [
+        f"{name}: unexpected statuses {result['statuses']}"
+        for name, result in results.items()
+        if result["statuses"] != [EXPECTED_STATUS[name]]
+    ]
+    if baseline is not None:
+        failures += compare(results, baseline, args.threshold)
+    if failures:
+        print("\n".join(["FAILED", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure refresh latency as the revoked token table grows.
+
+    python -m benchmarks.token_refresh --sizes 0 100000 1000000 --requests 500
+
+For each table size, RevokedToken is filled with unexpired revocations and
+POST /user/token/refresh/ is called with fresh refresh tokens. Every refresh
+rotates the token, so it checks the token against the revocation store
+(Bloom filter, then an indexed lookup on a possible match) and inserts the
+old `jti`.
+"""
+
+import argparse
+
+from benchmarks import utils
+
+
+def seed_revoked(start, stop, batch_size=10000):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from user.models import RevokedToken
+
+    expires_at = timezone.now() + timedelta(days=1)
+    for batch_start in range(start, stop, batch_size):
+        RevokedToken.objects.bulk_create(
+            [
+                RevokedToken(jti=f"seeded-{i:032x}", expires_at=expires_at)
+                for i in range(batch_start, min(batch_start + batch_size, stop))
+            ],
+            batch_size=batch_size,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 100000, 1000000])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    from user.revocation import revocation_store
+    from user.tokens import UserRefreshToken
+
+    with utils.test_database():
+        user = utils.create_user()
+        client = APIClient()
+        url = reverse("token_refresh")
+        seeded = 0
+
+        print(f"{'revoked rows':>12} {'p50 ms':>8} {'p95 ms':>8} {'SELECTs/req':>12}")
+        for size in sorted(args.sizes):
+            seed_revoked(seeded, size)
+            seeded = size
+            revocation_store.clear()
+            revocation_store.sync(force=True)
+
+            tokens = iter(
+                [str(UserRefreshToken.for_user(user)) for _ in range(args.requests)]
+            )
+            with CaptureQueriesContext(connection) as queries:
+                timings = utils.measure(
+                    lambda: client.post(url, {"refresh": next(tokens)}),
+                    repeat=args.requests,
+                )
+            selects = sum(query["sql"].startswith("SELECT") for query in queries)
+            summary = utils.summarize(timings)
+            print(
+                f"{size:>12} {summary['p50']:>8.2f} {summary['p95']:>8.2f} "
+                f"{selects / args.requests:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
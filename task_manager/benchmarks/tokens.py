@@ -0,0 +1,147 @@
+"""
+Compare token issue and verify throughput: simplejwt's TokenBackend (PyJWT's
+jwt.encode()/jwt.decode() on every call) against CachedTokenBackend.
+
+    python -m benchmarks.tokens --algorithms HS256 RS256 EdDSA --seconds 2
+
+Issuing is what UserLoginView does per login: a refresh token for the user,
+its access token, and both encoded. Verifying is what StatelessJWTAuthentication
+does per request: decode and check an access token. RS256 and EdDSA use a key
+pair generated for the run and need the cryptography package.
+"""
+
+import argparse
+import time
+
+from benchmarks import utils
+
+
+def generate_keys(algorithm):
+    """
+    Return a (signing key, verifying key) pair of PEM strings for `algorithm`.
+    """
+    if algorithm.startswith("HS"):
+        from django.conf import settings
+
+        return settings.SECRET_KEY, ""
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem.decode(), public_pem.decode()
+
+
+def token_classes(backend, cached):
+    """
+    Return (refresh, access) token classes that sign with `backend`: the
+    user.tokens classes if `cached`, otherwise simplejwt's classes with the
+    same claims.
+    """
+    from rest_framework_simplejwt import tokens
+
+    from user.tokens import UserAccessToken, UserRefreshToken
+
+    if cached:
+        base_refresh, base_access = UserRefreshToken, UserAccessToken
+    else:
+        base_refresh, base_access = tokens.RefreshToken, tokens.AccessToken
+
+    class AccessToken(base_access):
+        def get_token_backend(self):
+            return backend
+
+    class RefreshToken(base_refresh):
+        access_token_class = AccessToken
+
+        def get_token_backend(self):
+            return backend
+
+        @classmethod
+        def for_user(cls, user):
+            token = super().for_user(user)
+            token["email"] = user.email
+            token["is_active"] = user.is_active
+            return token
+
+    return RefreshToken, AccessToken
+
+
+def rate(func, seconds):
+    """
+    Call `func` for about `seconds` and return the calls per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while (now := time.perf_counter()) < deadline or not calls:
+        func()
+        calls += 1
+    return calls / (now - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--algorithms", nargs="+", default=["HS256", "RS256", "EdDSA"])
+    parser.add_argument(
+        "--seconds", type=float, default=2, help="Time spent on each measurement."
+    )
+    args = parser.parse_args()
+
+    utils.setup()
+
+    from jwt.algorithms import has_crypto
+    from rest_framework_simplejwt.backends import TokenBackend
+
+    from user.models import CustomUser
+    from user.token_backend import CachedTokenBackend
+
+    user = CustomUser(pk=1, email="bench@example.com", is_active=True)
+
+    print(f"{'algorithm':<9} {'backend':<20} {'issue/s':>9} {'verify/s':>9}")
+    for algorithm in args.algorithms:
+        if algorithm != "HS256" and not has_crypto:
+            print(f"{algorithm:<9} skipped, cryptography is not installed")
+            continue
+        signing_key, verifying_key = generate_keys(algorithm)
+
+        # simplejwt doesn't accept EdDSA, though PyJWT signs it the same way.
+        baseline = TokenBackend("HS256", signing_key, verifying_key)
+        baseline.algorithm = algorithm
+        backends = [
+            ("TokenBackend", baseline, False),
+            (
+                "CachedTokenBackend",
+                CachedTokenBackend(algorithm, signing_key, verifying_key),
+                True,
+            ),
+        ]
+        for name, backend, cached in backends:
+            refresh_class, access_class = token_classes(backend, cached)
+
+            def issue():
+                refresh = refresh_class.for_user(user)
+                return str(refresh), str(refresh.access_token)
+
+            access = issue()[1]
+            assert access_class(access)["user_id"] == 1
+            print(
+                f"{algorithm:<9} {name:<20} "
+                f"{rate(issue, args.seconds):>9.0f} "
+                f"{rate(lambda: access_class(access), args.seconds):>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """
+    Configure Django for a benchmark run.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Create a migrated test database for the duration of the block.
+
+    SQLite test databases live in memory unless `name` gives a file, which
+    lets concurrent writers wait for each other's locks instead of failing.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def create_user(email="bench@example.com"):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        email=email, first_name="Bench", last_name="User", password="benchpass123"
+    )
+
+
+def seed_users(count, prefix="bench"):
+    """
+    Insert `count` users sharing the password "benchpass123", hashed once.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    password = make_password("benchpass123")
+    User.objects.bulk_create(
+        [
+            User(
+                email=f"{prefix}-{i}@example.com",
+                first_name="Bench",
+                last_name=f"User {i}",
+                password=password,
+            )
+            for i in range(count)
+        ]
+    )
+    return list(User.objects.filter(email__startswith=f"{prefix}-").order_by("pk"))
+
+
+def seed_tasks(user, count, batch_size=10000):
+    """
+    Insert `count` tasks for `user` with batched bulk inserts.
+    """
+    from task.models import Task
+
+    for start in range(0, count, batch_size):
+        stop = min(start + batch_size, count)
+        Task.objects.bulk_create(
+            [
+                Task(user=user, title=f"Task {i}", description=f"Seeded task {i}")
+                for i in range(start, stop)
+            ],
+            batch_size=batch_size,
+        )
+
+
+def measure(func, repeat=20):
+    """
+    Call `func` `repeat` times and return the timings in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1],
+        "max": timings[-1],
+    }
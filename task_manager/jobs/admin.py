@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "kind",
+        "user",
+        "status",
+        "attempts",
+        "run_at",
+        "finished_at",
+        "worker",
+    ]
+    list_filter = ["status", "kind"]
+    readonly_fields = ["heartbeat_at", "lease_expires_at", "worker"]
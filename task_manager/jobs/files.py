@@ -0,0 +1,20 @@
+from django.core.files.storage import storages
+
+
+def get_storage():
+    """
+    Return the storage of the files jobs read and write (uploads to import,
+    exports), the "jobs" alias of STORAGES.
+    """
+    return storages["jobs"]
+
+
+def delete_files(job):
+    """
+    Delete the input file of `job` (payload["file"]) and its result file
+    (result["file"]), if any.
+    """
+    storage = get_storage()
+    for data in (job.payload, job.result):
+        if isinstance(data, dict) and data.get("file"):
+            storage.delete(data["file"])
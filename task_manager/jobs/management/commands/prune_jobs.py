@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.files import delete_files
+from jobs.models import Job
+from jobs.queue import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the jobs that finished more than --days days ago "
+        '(JOBS["KEEP_DAYS"] by default), and their files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Age of the oldest job kept.")
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days is None:
+            days = get_config()["KEEP_DAYS"]
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        jobs = Job.objects.filter(finished_at__lt=cutoff)
+        for job in jobs.iterator():
+            delete_files(job)
+        deleted = jobs.delete()[0]
+        self.stdout.write(f"Deleted {deleted} finished jobs.")
@@ -0,0 +1,87 @@
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs import queue
+from jobs.process import run_process
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs in a pool of --processes worker processes "
+        '(JOBS["PROCESSES"] by default). Workers that exit unexpectedly are '
+        "restarted; SIGTERM or Ctrl+C lets the running jobs finish, then "
+        "stops. With --burst, every worker exits once no job is left to claim."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, help="Worker processes.")
+        parser.add_argument(
+            "--kind", action="append", help="Only run jobs of this kind; repeatable."
+        )
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once no job is left."
+        )
+
+    def handle(self, *args, **options):
+        kinds = options["kind"] or sorted(queue.registry)
+        unknown = set(kinds) - set(queue.registry)
+        if unknown:
+            raise CommandError(f"Unknown job kind: {', '.join(sorted(unknown))}.")
+        processes = options["processes"] or queue.get_config()["PROCESSES"]
+        burst = options["burst"]
+
+        # Spawned rather than forked, so no worker inherits a database
+        # connection or a lock held by another thread.
+        context = multiprocessing.get_context("spawn")
+        connections.close_all()
+        stopping = False
+
+        def stop(*args):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        def start():
+            process = context.Process(target=run_process, args=(kinds, burst))
+            process.start()
+            process.started_at = time.monotonic()
+            return process
+
+        pool = [start() for _ in range(processes)]
+        self.stdout.write(f"Started {processes} workers for {', '.join(kinds)}.")
+        while pool and not stopping:
+            time.sleep(0.5)
+            for i, process in enumerate(pool):
+                if process.is_alive():
+                    continue
+                if burst and process.exitcode == 0:
+                    pool[i] = None
+                elif time.monotonic() - process.started_at < 5:
+                    # Crashing at startup (e.g. a configuration error);
+                    # restarting it would only crash again.
+                    for other in pool:
+                        if other is not None:
+                            other.terminate()
+                    raise CommandError(
+                        f"Worker {process.pid} exited with {process.exitcode} "
+                        "right after starting."
+                    )
+                else:
+                    self.stderr.write(
+                        f"Worker {process.pid} exited with {process.exitcode}; "
+                        "restarting it."
+                    )
+                    pool[i] = start()
+            pool = [process for process in pool if process is not None]
+
+        for process in pool:
+            process.terminate()  # SIGTERM: finish the current job.
+        for process in pool:
+            process.join()
+        self.stdout.write("Workers stopped.")
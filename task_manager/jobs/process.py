@@ -0,0 +1,20 @@
+import signal
+
+
+def run_process(kinds, burst):
+    """
+    Entry point of the worker processes started by run_workers. Django is
+    set up before anything that needs it is imported, as the process is
+    spawned rather than forked.
+    """
+    import django
+
+    django.setup()
+
+    from .worker import Worker
+
+    worker = Worker(kinds)
+    signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+    # Ctrl+C reaches the whole process group; the parent stops its workers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker.run(burst=burst)
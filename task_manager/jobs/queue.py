@@ -0,0 +1,254 @@
+import datetime
+import random
+import zlib
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Job
+
+
+def get_config():
+    config = {
+        "PROCESSES": 2,
+        "POLL_SECONDS": 1,
+        "LEASE_SECONDS": 60,
+        "HEARTBEAT_SECONDS": 15,
+        "RETRY_DELAY_SECONDS": 10,
+        "MAX_RETRY_DELAY_SECONDS": 3600,
+        # Finished jobs are kept this long by prune_jobs.
+        "KEEP_DAYS": 7,
+        # Most jobs of each kind running at once, over every worker;
+        # overrides the limit a kind is registered with.
+        "CONCURRENCY": {},
+    }
+    config.update(getattr(settings, "JOBS", {}))
+    return config
+
+
+class UnknownJobKind(ValueError):
+    pass
+
+
+class JobFailed(Exception):
+    """
+    Raised by a handler for a failure that trying again won't fix (e.g. an
+    invalid input file); the job fails without further attempts.
+    """
+
+
+class JobType:
+    """
+    A registered kind of job: `handler(job)` does the work and returns the
+    job's result, anything JSON serializable.
+    """
+
+    def __init__(self, kind, handler, concurrency=None, max_attempts=3):
+        self.kind = kind
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+    def get_concurrency(self):
+        return get_config()["CONCURRENCY"].get(self.kind, self.concurrency)
+
+
+registry = {}
+
+
+def register(kind, concurrency=None, max_attempts=3):
+    """
+    Register the decorated function as the handler of `kind` jobs, run by at
+    most `concurrency` workers at once (None for no limit) and tried at most
+    `max_attempts` times.
+    """
+
+    def decorator(handler):
+        registry[kind] = JobType(kind, handler, concurrency, max_attempts)
+        return handler
+
+    return decorator
+
+
+def get_job_type(kind):
+    try:
+        return registry[kind]
+    except KeyError:
+        raise UnknownJobKind(kind)
+
+
+def enqueue(kind, payload=None, user_id=None, run_at=None, using=None):
+    """
+    Queue a `kind` job, due now or at `run_at`.
+
+    Raises:
+        UnknownJobKind: If no job type is registered for `kind`.
+    """
+    job_type = get_job_type(kind)
+    using = using or router.db_for_write(Job)
+    return Job.objects.using(using).create(
+        kind=kind,
+        user_id=user_id,
+        payload=payload or {},
+        max_attempts=job_type.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def claimable(now):
+    """
+    Jobs a worker may claim: queued ones that are due, and running ones
+    whose worker stopped renewing their lease.
+    """
+    return Q(status=Job.QUEUED, run_at__lte=now) | Q(
+        status=Job.RUNNING, lease_expires_at__lt=now
+    )
+
+
+def lock_kind(connection, kind):
+    """
+    Serialize the claims of `kind` jobs until the end of the transaction, so
+    that two workers can't both take the last free slot of a limited kind.
+    SQLite transactions are serialized already.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s)", [zlib.crc32(kind.encode())]
+            )
+
+
+def claim(worker, kinds, using=None):
+    """
+    Claim the oldest due job of one of `kinds` for `worker`, leaving out
+    kinds that have as many jobs running as their concurrency allows.
+
+    On PostgreSQL the candidate row is locked with SELECT ... FOR UPDATE
+    SKIP LOCKED, so concurrent workers pass over each other's candidates
+    instead of waiting. Elsewhere (SQLite) the claim is a conditional
+    UPDATE that only succeeds if the job is still claimable, so of two
+    workers picking the same job one gets it and the other nothing.
+
+    Returns:
+        Job: The claimed job, with its attempt counted, or None.
+    """
+    using = using or router.db_for_write(Job)
+    connection = connections[using]
+    config = get_config()
+    now = timezone.now()
+    jobs = Job.objects.using(using)
+
+    limits = {}
+    for kind in kinds:
+        limit = get_job_type(kind).get_concurrency()
+        if limit is not None:
+            limits[kind] = limit
+    running = dict(
+        jobs.filter(status=Job.RUNNING, lease_expires_at__gte=now, kind__in=limits)
+        .values_list("kind")
+        .annotate(Count("pk"))
+    )
+    kinds = [
+        kind
+        for kind in kinds
+        if kind not in limits or running.get(kind, 0) < limits[kind]
+    ]
+    if not kinds:
+        return None
+
+    with transaction.atomic(using):
+        candidates = (
+            jobs.filter(claimable(now), kind__in=kinds)
+            .order_by("run_at", "pk")
+            .only("pk", "kind")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        job = candidates.first()
+        if job is None:
+            return None
+        if job.kind in limits:
+            lock_kind(connection, job.kind)
+            busy = jobs.filter(
+                status=Job.RUNNING, lease_expires_at__gte=now, kind=job.kind
+            ).count()
+            if busy >= limits[job.kind]:
+                return None
+        claimed = jobs.filter(claimable(now), pk=job.pk).update(
+            status=Job.RUNNING,
+            attempts=F("attempts") + 1,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            lease_expires_at=now + datetime.timedelta(seconds=config["LEASE_SECONDS"]),
+        )
+        if not claimed:
+            return None
+    return jobs.get(pk=job.pk)
+
+
+def owned(job, using=None):
+    """
+    The job's row as long as the worker that claimed it still holds it, i.e.
+    no other worker has claimed it after its lease expired.
+    """
+    return Job.objects.using(using or router.db_for_write(Job)).filter(
+        pk=job.pk, status=Job.RUNNING, worker=job.worker, attempts=job.attempts
+    )
+
+
+def renew(job, using=None):
+    """
+    Extend the lease on `job`.
+
+    Returns:
+        bool: Whether the worker still holds the job.
+    """
+    now = timezone.now()
+    lease = datetime.timedelta(seconds=get_config()["LEASE_SECONDS"])
+    return bool(
+        owned(job, using).update(heartbeat_at=now, lease_expires_at=now + lease)
+    )
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before trying a job again after its `attempts`-th
+    failure: exponential backoff with jitter.
+    """
+    config = get_config()
+    delay = min(
+        config["RETRY_DELAY_SECONDS"] * 2 ** (attempts - 1),
+        config["MAX_RETRY_DELAY_SECONDS"],
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def succeed(job, result, using=None):
+    return bool(
+        owned(job, using).update(
+            status=Job.SUCCEEDED,
+            result=result,
+            error="",
+            finished_at=timezone.now(),
+            lease_expires_at=None,
+        )
+    )
+
+
+def fail(job, error, retry=True, using=None):
+    """
+    Record a failed attempt: the job is queued again after a backoff delay,
+    or fails for good once it has been tried `max_attempts` times.
+    """
+    now = timezone.now()
+    if retry and job.attempts < job.max_attempts:
+        changes = {
+            "status": Job.QUEUED,
+            "run_at": now + datetime.timedelta(seconds=retry_delay(job.attempts)),
+        }
+    else:
+        changes = {"status": Job.FAILED, "finished_at": now}
+    return bool(owned(job, using).update(error=error, lease_expires_at=None, **changes))
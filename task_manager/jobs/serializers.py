@@ -0,0 +1,50 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    result = serializers.SerializerMethodField()
+    result_url = serializers.SerializerMethodField()
+    error = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "attempts",
+            "max_attempts",
+            "created_at",
+            "run_at",
+            "started_at",
+            "finished_at",
+            "result",
+            "result_url",
+            "error",
+        ]
+        read_only_fields = fields
+
+    def get_result(self, job):
+        """
+        The result, or the progress so far of a job that reports it. File
+        results are downloaded from `result_url` instead.
+        """
+        if isinstance(job.result, dict) and "file" in job.result:
+            return None
+        return job.result
+
+    def get_result_url(self, job):
+        if job.status != Job.SUCCEEDED:
+            return None
+        url = reverse("job-result", args=[job.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def get_error(self, job):
+        # The traceback is for the logs and the admin; clients get its last
+        # line, the exception.
+        lines = job.error.strip().splitlines()
+        return lines[-1] if lines else None
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import JobDetailView, JobResultView
+
+urlpatterns = [
+    path("<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+    path("<int:pk>/result/", JobResultView.as_view(), name="job-result"),
+]
@@ -0,0 +1,105 @@
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import generics, status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from user.authentication import StatelessJWTAuthentication
+
+from .files import get_storage
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobNotFinished(APIException):
+    """
+    Raised when the result of a job that has not succeeded (yet) is asked
+    for. DRF answers it with 409 Conflict.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("The job has not succeeded.")
+    default_code = "job_not_finished"
+
+
+def prefers_async(request):
+    """
+    Whether the client asked for the request to run in the background with
+    `Prefer: respond-async` (RFC 7240).
+    """
+    preferences = request.headers.get("Prefer", "").split(",")
+    return any(p.split(";")[0].strip() == "respond-async" for p in preferences)
+
+
+def accepted_response(request, job):
+    """
+    The 202 Accepted response to a request queued as `job`, pointing to the
+    job's status.
+    """
+    url = request.build_absolute_uri(reverse("job-detail", args=[job.pk]))
+    response = Response(
+        JobSerializer(job, context={"request": request}).data,
+        status=status.HTTP_202_ACCEPTED,
+    )
+    response["Location"] = url
+    response["Preference-Applied"] = "respond-async"
+    return response
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """
+    Background job status view
+
+    This view returns the status of one of the authenticated user's background
+    jobs (e.g. an export or import sent with `Prefer: respond-async`): queued,
+    running, succeeded or failed, its attempts, its result or progress, and
+    the last error.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        """
+        Restrict the lookup to the authenticated user's jobs.
+        """
+        return Job.objects.filter(user_id=self.request.user.pk)
+
+
+class JobResultView(JobDetailView):
+    """
+    Background job result view
+
+    This view returns the result of one of the authenticated user's
+    succeeded background jobs: the file it produced as an attachment (e.g. an
+    export), or its JSON result.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the job's result.
+
+        Returns:
+            FileResponse | Response: The result file, or the JSON result.
+
+        Raises:
+            NotFound: If the user has no such job.
+            JobNotFinished: If the job has not succeeded.
+        """
+        job = self.get_object()
+        if job.status != Job.SUCCEEDED:
+            raise JobNotFinished()
+        result = job.result
+        if isinstance(result, dict) and "file" in result:
+            return FileResponse(
+                get_storage().open(result["file"], "rb"),
+                as_attachment=True,
+                filename=result.get("filename"),
+                content_type=result.get("content_type"),
+            )
+        return Response(result)
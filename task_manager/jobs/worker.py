@@ -0,0 +1,104 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+
+from django.db import DatabaseError, connections
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Claim and run jobs one at a time until stopped.
+
+    While a job runs, a heartbeat thread renews its lease every
+    JOBS["HEARTBEAT_SECONDS"], so the job is only claimed again by another
+    worker if this one dies (or hangs past the lease). A handler that raises
+    gets its job retried with backoff (see queue.fail()).
+    """
+
+    def __init__(self, kinds=None, name=None):
+        self.kinds = kinds or sorted(queue.registry)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.config = queue.get_config()
+        self.job = None
+        self.stopping = threading.Event()
+        # Set once the last job is done: the lease outlives stop().
+        self._heartbeat_stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """
+        Stop once the current job, if any, is done.
+        """
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """
+        Run jobs until stop() is called or, with `burst`, until there is
+        none to claim.
+
+        Returns:
+            int: The number of jobs run.
+        """
+        heartbeat = threading.Thread(target=self.heartbeat, daemon=True)
+        heartbeat.start()
+        count = 0
+        try:
+            while not self.stopping.is_set():
+                try:
+                    job = queue.claim(self.name, self.kinds)
+                except DatabaseError:
+                    # E.g. SQLite busy; try again at the next poll.
+                    logger.warning("Claiming a job failed", exc_info=True)
+                    job = None
+                if job is None:
+                    if burst:
+                        break
+                    self.stopping.wait(self.config["POLL_SECONDS"])
+                    continue
+                self.execute(job)
+                count += 1
+        finally:
+            self.stopping.set()
+            self._heartbeat_stopping.set()
+            heartbeat.join()
+        return count
+
+    def execute(self, job):
+        if job.attempts > job.max_attempts:
+            # Its last worker died with it.
+            queue.fail(job, "The worker running the job stopped.", retry=False)
+            return
+        with self._lock:
+            self.job = job
+        try:
+            result = queue.get_job_type(job.kind).handler(job)
+        except queue.JobFailed as exc:
+            queue.fail(job, str(exc), retry=False)
+        except Exception:
+            logger.exception("Job %s failed", job.pk)
+            queue.fail(job, traceback.format_exc(limit=5))
+        else:
+            if not queue.succeed(job, result):
+                logger.warning("Job %s finished after its lease was lost", job.pk)
+        finally:
+            with self._lock:
+                self.job = None
+
+    def heartbeat(self):
+        try:
+            while not self._heartbeat_stopping.wait(self.config["HEARTBEAT_SECONDS"]):
+                with self._lock:
+                    job = self.job
+                if job is not None:
+                    try:
+                        queue.renew(job)
+                    except DatabaseError:
+                        logger.warning("Renewing job %s failed", job.pk, exc_info=True)
+        finally:
+            connections.close_all()
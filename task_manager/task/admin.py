@@ -1,9 +1,21 @@
 from django.contrib import admin
 
-from .models import Task
+from .models import Task, TaskArchive
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "user", "status", "created_at", "updated_at")
     search_fields = ("title", "description", "user__email")
+
+
+@admin.register(TaskArchive)
+class TaskArchiveAdmin(admin.ModelAdmin):
+    list_display = ("id", "title", "user", "status", "updated_at", "archived_at")
+    search_fields = ("title", "description", "user__email")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,167 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import cache, changes, search
+from .models import Task, TaskArchive
+
+
+def get_config():
+    config = {
+        "AFTER_DAYS": 90,
+        "BATCH_SIZE": 1000,
+        "PAUSE_MS": 50,
+    }
+    config.update(getattr(settings, "TASK_ARCHIVE", {}))
+    return config
+
+
+def move_rows(source, target, ids, using, **values):
+    """
+    Copy the rows `ids` of `source` into `target` with one INSERT ... SELECT
+    and delete them from `source`, in the caller's transaction. Every column
+    is kept as is (auto_now and auto_now_add don't apply); `values` fill the
+    columns only `target` has. No model signals are sent.
+    """
+    if not ids:
+        return
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    columns = [qn(field.column) for field in Task._meta.concrete_fields]
+    extra = [target._meta.get_field(name) for name in values]
+    params = [
+        field.get_db_prep_value(values[field.name], connection) for field in extra
+    ]
+    placeholders = ", ".join(["%s"] * len(ids))
+    pk = qn(source._meta.pk.column)
+    source_table = qn(source._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(target._meta.db_table)} "
+            f"({', '.join(columns + [qn(field.column) for field in extra])}) "
+            f"SELECT {', '.join(columns + ['%s'] * len(extra))} "
+            f"FROM {source_table} WHERE {pk} IN ({placeholders})",
+            params + list(ids),
+        )
+        cursor.execute(
+            f"DELETE FROM {source_table} WHERE {pk} IN ({placeholders})", ids
+        )
+
+
+def archive_batch(cutoff, after, batch_size, using):
+    """
+    Move up to `batch_size` completed tasks last updated before `cutoff`,
+    with ids above `after`, to the archive in one transaction.
+
+    Returns:
+        list: The ids of the archived tasks, in order.
+    """
+    connection = connections[using]
+    with transaction.atomic(using):
+        candidates = (
+            Task.objects.using(using)
+            .filter(status="completed", updated_at__lt=cutoff, pk__gt=after)
+            .order_by("pk")
+            .values_list("pk", "user_id")
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            # Leave tasks being written to right now for the next run.
+            candidates = candidates.select_for_update(skip_locked=True)
+        rows = list(candidates[:batch_size])
+        ids = [pk for pk, _ in rows]
+        move_rows(Task, TaskArchive, ids, using, archived_at=timezone.now())
+        search.unindex_tasks(ids, using)
+        for user_id in {user_id for _, user_id in rows}:
+            cache.bump_generation(user_id)
+    return ids
+
+
+def archive(older_than_days=None, batch_size=None, pause=None, using=None):
+    """
+    Move the completed tasks not updated for `older_than_days` days
+    (TASK_ARCHIVE["AFTER_DAYS"] by default) from the task table to
+    TaskArchive.
+
+    The table is walked in id order, one transaction per `batch_size`
+    tasks with `pause` seconds in between, so other writers get the database
+    in between and each batch resumes the scan where the last one stopped.
+    The status counters (task.stats) and the changes feed are left alone:
+    archived tasks are still part of the user's tasks, they are only kept
+    out of the table (and indexes) the task list and detail queries use.
+
+    Returns:
+        int: The number of tasks archived.
+    """
+    config = get_config()
+    days = config["AFTER_DAYS"] if older_than_days is None else older_than_days
+    batch_size = batch_size or config["BATCH_SIZE"]
+    pause = config["PAUSE_MS"] / 1000 if pause is None else pause
+    using = using or router.db_for_write(Task)
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+
+    archived = 0
+    after = 0
+    while True:
+        ids = archive_batch(cutoff, after, batch_size, using)
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+        after = ids[-1]
+        time.sleep(pause)
+
+
+def restore(user_id, task_ids=None, batch_size=None, using=None):
+    """
+    Move the user's archived tasks `task_ids` (all of them by default) back
+    to the task table, unchanged, one transaction per `batch_size` tasks.
+
+    A task whose title has been taken by another task since it was archived
+    is left in the archive. Restored tasks are indexed for search again and
+    announced on the changes feed as updated.
+
+    Returns:
+        tuple: (the restored Tasks, the ids of the tasks left archived
+        because of their title).
+    """
+    batch_size = batch_size or get_config()["BATCH_SIZE"]
+    using = using or router.db_for_write(Task)
+    archived = TaskArchive.objects.using(using).filter(user_id=user_id)
+    if task_ids is not None:
+        archived = archived.filter(pk__in=task_ids)
+
+    restored = []
+    conflicts = []
+    after = 0
+    while True:
+        with transaction.atomic(using):
+            rows = list(
+                archived.filter(pk__gt=after)
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", "title")[:batch_size]
+            )
+            titles = set(
+                Task.objects.using(using)
+                .filter(user_id=user_id, title__in={title for _, title in rows})
+                .values_list("title", flat=True)
+            )
+            ids = []
+            for pk, title in rows:
+                if title in titles:
+                    conflicts.append(pk)
+                else:
+                    titles.add(title)
+                    ids.append(pk)
+            move_rows(TaskArchive, Task, ids, using)
+            tasks = list(Task.objects.using(using).filter(pk__in=ids).order_by("pk"))
+            search.index_tasks(tasks, using)
+            changes.record(user_id, [], tasks, [], using)
+            if tasks:
+                cache.bump_generation(user_id)
+        restored += tasks
+        if len(rows) < batch_size:
+            return restored, conflicts
+        after = rows[-1][0]
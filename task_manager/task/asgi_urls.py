@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .async_views import AsyncTaskCreateListView, AsyncTaskUpdateDeleteView
+
+# Async views that take over these URLs under ASGI, see task_manager.asgi_urls.
+urlpatterns = [
+    path("tasks/", AsyncTaskCreateListView.as_view(), name="task-list"),
+    path("tasks/<int:pk>/", AsyncTaskUpdateDeleteView.as_view(), name="task-detail"),
+]
@@ -0,0 +1,224 @@
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+from task_manager.async_api import AsyncAPIView
+
+from . import cache, conditional
+from .filters import include_archived
+from .models import Task, TaskArchive
+from .pagination import TaskCursorPagination
+from .queries import delete_task
+from .serializers import TaskRowSerializer, TaskSerializer
+from .views import TaskCreateListView, TaskUpdateDeleteView
+
+
+class AsyncTaskCreateListView(AsyncAPIView):
+    """
+    Async variant of TaskCreateListView, served under ASGI.
+
+    Lists are read with async iteration and the cache and validator lookups
+    are awaited, so a request holds no thread while it waits on the database
+    or cache. Responses are identical to TaskCreateListView's.
+    """
+
+    filter_backends = TaskCreateListView.filter_backends
+    ordering_fields = TaskCreateListView.ordering_fields
+    ordering = TaskCreateListView.ordering
+
+    def get_queryset(self):
+        return Task.objects.filter(user_id=self.request.user.pk)
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def get(self, request, *args, **kwargs):
+        """
+        List the user's tasks, see TaskCreateListView.list().
+        """
+        use_cache = cache.get_config()["ENABLED"]
+        key = await cache.apage_key(request.user.pk, request) if use_cache else None
+        entry = await cache.aget_page(key) if use_cache else None
+
+        if entry is not None:
+            etag, last_modified = entry["etag"], entry["last_modified"]
+        else:
+            etag, last_modified = await conditional.alist_validators(
+                request.user.pk, request
+            )
+
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        if entry is not None:
+            response = Response(entry["data"], headers={"X-Cache": "HIT"})
+        else:
+            response = await self.list_rows(request)
+            if use_cache:
+                await cache.aset_page(
+                    key,
+                    {
+                        "data": response.data,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                    },
+                )
+                response["X-Cache"] = "MISS"
+
+        conditional.set_validators(response, etag, last_modified)
+        return response
+
+    async def list_rows(self, request):
+        row_serializer = TaskRowSerializer()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *row_serializer.fields
+        )
+        paginator = TaskCursorPagination()
+        if include_archived(request):
+            archived = self.filter_queryset(
+                TaskArchive.objects.filter(user_id=request.user.pk)
+            ).values(*row_serializer.fields)
+            page = await paginator.apaginate_querysets(
+                [queryset, archived], request, view=self
+            )
+        else:
+            page = await paginator.apaginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(row_serializer.to_representation(page))
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Create a task owned by the authenticated user.
+
+        Raises:
+            ValidationError: If the data is invalid or the title is taken.
+        """
+        serializer = TaskSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            # TaskSerializer.create() inserts the task and runs its receivers
+            # in one transaction, which the async ORM has no way to open.
+            task = await sync_to_async(serializer.save)(user_id=request.user.pk)
+        except ValidationError as exc:
+            # Same body as TaskCreateListView.perform_create().
+            raise ValidationError(
+                {"error": "Invalid data provided.", "details": str(exc)}
+            )
+        return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
+
+
+class AsyncTaskUpdateDeleteView(AsyncAPIView):
+    """
+    Async variant of TaskUpdateDeleteView, served under ASGI.
+
+    Reads use the async ORM. Writes still run update_task()/delete_task() in
+    a thread: they are single UPDATE/DELETE ... RETURNING statements, which
+    the async ORM (itself a thread wrapper around the sync ORM for writes)
+    can't express.
+    """
+
+    get_queryset = TaskUpdateDeleteView.get_queryset
+    perform_scoped_update = TaskUpdateDeleteView.perform_scoped_update
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Return the task, or 304 Not Modified if the client's copy is current.
+
+        Raises:
+            NotFound: If the task does not exist or belongs to another user.
+        """
+        try:
+            task = await self.get_queryset().aget(pk=self.kwargs["pk"])
+        except Task.DoesNotExist:
+            raise NotFound({"error": "The requested task does not exist"})
+        etag, last_modified = conditional.task_validators(task)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(TaskSerializer(task).data)
+            conditional.set_validators(response, etag, last_modified)
+        return response
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, partial=False)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.update(request, partial=True)
+
+    async def update(self, request, partial):
+        """
+        Update the task, see TaskUpdateDeleteView.update().
+        """
+        try:
+            serializer = TaskSerializer(data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            expected = conditional.parse_if_match(request, self.kwargs["pk"])
+            task = await sync_to_async(self.perform_scoped_update)(
+                serializer.validated_data, expected
+            )
+            if task is None:
+                return await self.missing_task_response(expected)
+            response = Response(TaskSerializer(task).data)
+            conditional.set_validators(response, *conditional.task_validators(task))
+            return response
+        except ValidationError as e:
+            return Response(
+                {"error": "Validation error occurred.", "details": e.detail},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "error": "An error occurred while updating the task.",
+                    "details": str(e),
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    async def missing_task_response(self, expected_updated_at):
+        """
+        Explain why a conditional write matched no row: 412 if the task exists
+        but failed the If-Match precondition, 404 otherwise.
+        """
+        if (
+            expected_updated_at is not None
+            and await self.get_queryset().filter(pk=self.kwargs["pk"]).aexists()
+        ):
+            return Response(
+                {"error": "The task has been modified since it was retrieved."},
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            )
+        return Response(
+            {"error": "The requested task does not exist"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    async def delete(self, request, *args, **kwargs):
+        """
+        Delete the task, see TaskUpdateDeleteView.destroy().
+        """
+        try:
+            expected = conditional.parse_if_match(request, self.kwargs["pk"])
+            deleted = await sync_to_async(delete_task)(
+                self.kwargs["pk"], request.user.pk, expected
+            )
+            if deleted is None:
+                if expected is not None:
+                    return await self.missing_task_response(expected)
+                return Response(
+                    {"error": "The task does not exist."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            return Response(
+                {"message": "Task deleted successfully."}, status=status.HTTP_200_OK
+            )
+        except Exception as e:
+            return Response(
+                {
+                    "error": "An error occurred while deleting the task.",
+                    "details": str(e),
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
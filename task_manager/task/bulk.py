@@ -0,0 +1,282 @@
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+
+from .models import Task
+from .serializers import DUPLICATE_TITLE_ERROR, TaskSerializer
+from .signals import tasks_changed
+from .stats import status_change_expressions
+
+
+def get_bulk_settings():
+    config = getattr(settings, "TASK_BULK", {})
+    return config.get("MAX_OPERATIONS", 10000), config.get("BATCH_SIZE", 1000)
+
+
+def parse_operations(data):
+    """
+    Split a bulk payload into its create, update and delete lists.
+
+    Raises:
+        ValidationError: If the payload is not shaped like
+            {"create": [...], "update": [...], "delete": [...]} or is too large.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError({"error": "Expected an object with operation lists."})
+
+    operations = {}
+    for key in ("create", "update", "delete"):
+        items = data.get(key, [])
+        if not isinstance(items, list):
+            raise ValidationError({key: ["Expected a list."]})
+        operations[key] = items
+
+    max_operations, _ = get_bulk_settings()
+    if sum(len(items) for items in operations.values()) > max_operations:
+        raise ValidationError(
+            {
+                "error": f"A bulk request may contain at most {max_operations} operations."
+            }
+        )
+    return operations
+
+
+def apply_bulk_operations(user, data):
+    """
+    Validate and apply a batch of task operations for `user`.
+
+    Every item is validated up front: title uniqueness is checked for the
+    whole batch with a single query, and the valid operations are written in
+    one transaction (deletes, then updates, then creates) with batched
+    statements. Invalid items are skipped and reported.
+
+    Returns:
+        dict: Per-item results for each operation list, in request order.
+    """
+    operations = parse_operations(data)
+    _, batch_size = get_bulk_settings()
+    results = {"create": [], "update": [], "delete": []}
+
+    # Load every task touched by an update or delete with a single query.
+    delete_ids = [pk for pk in operations["delete"] if is_task_id(pk)]
+    update_ids = [
+        item.get("id")
+        for item in operations["update"]
+        if isinstance(item, dict) and is_task_id(item.get("id"))
+    ]
+    tasks = Task.objects.filter(user_id=user.pk).in_bulk(delete_ids + update_ids)
+
+    to_delete = {}
+    for pk in operations["delete"]:
+        if not is_task_id(pk):
+            results["delete"].append(invalid_id(pk))
+        elif pk in tasks and pk not in to_delete:
+            to_delete[pk] = tasks[pk]
+            results["delete"].append({"id": pk, "status": status.HTTP_204_NO_CONTENT})
+        else:
+            results["delete"].append(not_found(pk))
+
+    create_serializer = TaskSerializer()
+    update_serializer = TaskSerializer(partial=True)
+    valid_creates = validate_items(
+        operations["create"], create_serializer, results["create"]
+    )
+    valid_updates = []
+    for item in operations["update"]:
+        pk = item.get("id") if isinstance(item, dict) else None
+        if not is_task_id(pk):
+            results["update"].append(invalid_id(pk))
+            continue
+        if pk not in tasks or pk in to_delete:
+            results["update"].append(not_found(pk))
+            continue
+        attrs, errors = validate_item(item, update_serializer)
+        if errors:
+            results["update"].append({"id": pk, **errors})
+            continue
+        results["update"].append({"id": pk, "status": status.HTTP_200_OK})
+        valid_updates.append((len(results["update"]) - 1, tasks[pk], attrs))
+
+    # Titles held by tasks deleted in this batch become free; everything else
+    # is checked against the user's existing titles in one query.
+    titles = {attrs["title"] for _, attrs in valid_creates if "title" in attrs}
+    titles |= {attrs["title"] for _, _, attrs in valid_updates if "title" in attrs}
+    taken = {
+        title: pk
+        for title, pk in Task.objects.filter(
+            user_id=user.pk, title__in=titles
+        ).values_list("title", "id")
+        if pk not in to_delete
+    }
+
+    updated = []
+    for index, task, attrs in valid_updates:
+        title = attrs.get("title")
+        if title is not None and taken.get(title, task.pk) != task.pk:
+            results["update"][index] = duplicate_title(task.pk)
+            continue
+        if title is not None:
+            taken[title] = task.pk
+        for field, value in attrs.items():
+            if field == "status":
+                task.set_status(value)
+            else:
+                setattr(task, field, value)
+        updated.append((task, attrs))
+
+    created = []
+    for index, attrs in valid_creates:
+        if attrs["title"] in taken:
+            results["create"][index] = duplicate_title()
+            continue
+        taken[attrs["title"]] = None
+        task = Task(user_id=user.pk, **attrs)
+        if task.status == "completed":
+            # bulk_create() skips Task.save().
+            task.completed_at = datetime.date.today()
+        created.append((index, task))
+
+    deleted_tasks = list(to_delete.values())
+    updated_tasks = [task for task, _ in updated]
+    created_tasks = [task for _, task in created]
+    try:
+        with transaction.atomic():
+            delete_tasks(deleted_tasks, batch_size)
+            update_tasks(updated, batch_size)
+            Task.objects.bulk_create(created_tasks, batch_size=batch_size)
+            tasks_changed.send(
+                sender=Task,
+                user_id=user.pk,
+                created=created_tasks,
+                updated=updated_tasks,
+                deleted=deleted_tasks,
+                fields={field for _, attrs in updated for field in attrs},
+                using=Task.objects.db,
+            )
+    except IntegrityError:
+        # A concurrent request took one of the titles after the batch check.
+        raise ValidationError(
+            {"error": "The batch conflicts with a concurrent change. Please retry."}
+        )
+
+    for index, task in created:
+        results["create"][index]["id"] = task.pk
+    return results
+
+
+def delete_tasks(tasks, batch_size):
+    """
+    Delete `tasks` with one DELETE per batch.
+
+    QuerySet.delete() would send post_delete once per row because receivers
+    are connected; the batch is announced through tasks_changed instead.
+    """
+    pks = [task.pk for task in tasks]
+    for start in range(0, len(pks), batch_size):
+        queryset = Task.objects.filter(pk__in=pks[start : start + batch_size])
+        queryset._raw_delete(queryset.db)
+
+
+def update_tasks(updated, batch_size):
+    """
+    Write `(task, changed attrs)` pairs with as few UPDATE statements as possible.
+
+    Tasks receiving identical changes (e.g. marking many tasks completed) share
+    one UPDATE ... WHERE id IN (...) per batch; the rest go through bulk_update,
+    whose CASE expressions grow with the batch size.
+    """
+    updated_at = Task._meta.get_field("updated_at")
+    groups = defaultdict(list)
+    for task, attrs in updated:
+        updated_at.pre_save(task, add=False)
+        groups[tuple(sorted(attrs.items()))].append(task)
+
+    singles, fields = [], set()
+    for changes, tasks in groups.items():
+        if len(tasks) == 1:
+            singles += tasks
+            fields.update(field for field, _ in changes)
+            continue
+        changes = dict(changes)
+        if "status" in changes:
+            changes.update(status_change_expressions(changes["status"]))
+        pks = [task.pk for task in tasks]
+        for start in range(0, len(pks), batch_size):
+            Task.objects.filter(pk__in=pks[start : start + batch_size]).update(
+                updated_at=tasks[0].updated_at, **changes
+            )
+
+    if singles:
+        if "status" in fields:
+            # Set on the loaded tasks by Task.set_status().
+            fields |= {"previous_status", "completed_at"}
+        Task.objects.bulk_update(
+            singles, sorted(fields) + ["updated_at"], batch_size=batch_size
+        )
+
+
+def validate_items(items, serializer, results):
+    """
+    Validate create items, appending a result per item.
+
+    Returns:
+        list: (result index, validated attrs) for the valid items.
+    """
+    valid = []
+    for item in items:
+        attrs, errors = validate_item(item, serializer)
+        if errors:
+            results.append(errors)
+            continue
+        results.append({"status": status.HTTP_201_CREATED})
+        valid.append((len(results) - 1, attrs))
+    return valid
+
+
+def validate_item(item, serializer):
+    """
+    Run the serializer's field validation for one item.
+
+    Returns:
+        tuple: (validated attrs, None), or (None, error result).
+    """
+    try:
+        return serializer.run_validation(item), None
+    except serializers.ValidationError as e:
+        return None, {"status": status.HTTP_400_BAD_REQUEST, "errors": e.detail}
+
+
+def is_task_id(value):
+    # Ids come from parsed JSON; anything but an integer (e.g. a list, which
+    # isn't even hashable) is rejected before it is looked up.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def invalid_id(pk):
+    return {
+        "id": pk,
+        "status": status.HTTP_400_BAD_REQUEST,
+        "errors": {"id": ["A valid integer is required."]},
+    }
+
+
+def not_found(pk):
+    return {
+        "id": pk,
+        "status": status.HTTP_404_NOT_FOUND,
+        "errors": {"error": "The requested task does not exist"},
+    }
+
+
+def duplicate_title(pk=None):
+    result = {
+        "status": status.HTTP_400_BAD_REQUEST,
+        "errors": {"title": [DUPLICATE_TITLE_ERROR]},
+    }
+    if pk is not None:
+        result = {"id": pk, **result}
+    return result
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+def get_config():
+    config = {"ENABLED": True, "ALIAS": "default", "TIMEOUT": 300}
+    config.update(getattr(settings, "TASK_LIST_CACHE", {}))
+    return config
+
+
+def get_cache():
+    return caches[get_config()["ALIAS"]]
+
+
+def generation_key(user_id):
+    return f"task-list:generation:{user_id}"
+
+
+def get_generation(user_id):
+    """
+    Return the user's list generation, starting a new one if it is missing.
+
+    A fresh generation starts from the current time rather than 1, so a counter
+    that was evicted can never come back to a value that old pages were cached
+    under.
+    """
+    return get_cache().get_or_set(generation_key(user_id), time.time_ns, timeout=None)
+
+
+async def aget_generation(user_id):
+    return await get_cache().aget_or_set(
+        generation_key(user_id), time.time_ns, timeout=None
+    )
+
+
+def bump_generation(user_id):
+    """
+    Invalidate every cached list page of the user.
+
+    The bump happens right away and again once the surrounding transaction
+    commits, so a read that raced the transaction cannot keep pre-commit data
+    cached under the new generation.
+    """
+
+    def bump():
+        cache = get_cache()
+        try:
+            cache.incr(generation_key(user_id))
+        except ValueError:
+            cache.set(generation_key(user_id), time.time_ns(), timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def page_key(user_id, request):
+    """
+    Return the cache key of the list page requested by `request`.
+    """
+    return build_page_key(user_id, get_generation(user_id), request)
+
+
+async def apage_key(user_id, request):
+    return build_page_key(user_id, await aget_generation(user_id), request)
+
+
+def build_page_key(user_id, generation, request):
+    url = hashlib.md5(request.build_absolute_uri().encode("utf-8")).hexdigest()
+    return f"task-list:page:{user_id}:{generation}:{url}"
+
+
+def get_page(key):
+    """
+    Return the cached page data for `key`, counting the hit or miss.
+    """
+    return count_lookup(get_cache().get(key))
+
+
+async def aget_page(key):
+    return count_lookup(await get_cache().aget(key))
+
+
+def count_lookup(data):
+    with _stats_lock:
+        _stats["hits" if data is not None else "misses"] += 1
+    return data
+
+
+def set_page(key, data):
+    get_cache().set(key, data, timeout=get_config()["TIMEOUT"])
+
+
+async def aset_page(key, data):
+    await get_cache().aset(key, data, timeout=get_config()["TIMEOUT"])
+
+
+def stats():
+    """
+    Return the hit and miss counters of this process.
+    """
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,189 @@
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import events
+from .models import Task, TaskArchive, TaskChange, TaskSequence
+
+
+class ChangesCompacted(APIException):
+    """
+    Raised when a client asks for the changes since a sequence number older
+    than the tombstones that are still kept: it may have missed deletions
+    and has to sync from scratch (since=0). DRF answers it with 410 Gone.
+    """
+
+    status_code = status.HTTP_410_GONE
+    default_detail = _("Changes this old have been compacted. Sync again from since=0.")
+    default_code = "changes_compacted"
+
+
+def get_changes_settings():
+    config = getattr(settings, "TASK_CHANGES", {})
+    return {
+        "PAGE_SIZE": config.get("PAGE_SIZE", 100),
+        "MAX_PAGE_SIZE": config.get("MAX_PAGE_SIZE", 1000),
+        "TOMBSTONE_DAYS": config.get("TOMBSTONE_DAYS", 30),
+    }
+
+
+def allocate(user_id, count, using):
+    """
+    Reserve `count` sequence numbers for the user's next changes and return
+    the last one.
+
+    The UPDATE locks the user's TaskSequence row until the caller's
+    transaction ends, so concurrent writers of the same user get their
+    numbers, and commit their changes, one after the other: a client never
+    sees a change before an earlier-numbered one has been committed.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.features.can_return_columns_from_insert:
+            # One statement where UPDATE ... RETURNING exists.
+            cursor.execute(
+                f"UPDATE {qn(TaskSequence._meta.db_table)} "
+                f"SET {qn('last')} = {qn('last')} + %s WHERE {qn('user_id')} = %s "
+                f"RETURNING {qn('last')}",
+                [count, user_id],
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0]
+        else:
+            sequence = TaskSequence.objects.using(using).filter(user_id=user_id)
+            if sequence.update(last=F("last") + count):
+                return sequence.values_list("last", flat=True).get()
+    try:
+        with transaction.atomic(using=using):
+            TaskSequence.objects.using(using).create(user_id=user_id, last=count)
+        return count
+    except IntegrityError:
+        # Created concurrently; the row exists now.
+        return allocate(user_id, count, using)
+
+
+def record(user_id, created, updated, deleted, using=None):
+    """
+    Give each task in `created`, `updated` and `deleted` the next sequence
+    number of the user, with one upsert of their TaskChange rows; deleted
+    tasks become tombstones. The changes are then published to the user's
+    event streams (see task.events).
+    """
+    changes = {}
+    for kind, tasks in (
+        ("created", created),
+        ("updated", updated),
+        ("deleted", deleted),
+    ):
+        for task in tasks:
+            changes[task.pk] = (kind, task)
+    if not changes:
+        return
+    using = using or router.db_for_write(TaskChange)
+    # The write's own transaction when there is one, without a savepoint.
+    with transaction.atomic(using=using, savepoint=False):
+        last = allocate(user_id, len(changes), using)
+        numbered = list(enumerate(changes.values(), start=last - len(changes) + 1))
+        now = timezone.now()
+        TaskChange.objects.using(using).bulk_create(
+            [
+                TaskChange(
+                    user_id=user_id,
+                    task_id=task.pk,
+                    seq=seq,
+                    deleted=kind == "deleted",
+                    changed_at=now,
+                )
+                for seq, (kind, task) in numbered
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "task_id"],
+            update_fields=["seq", "deleted", "changed_at"],
+        )
+        events.publish(
+            user_id, [(seq, kind, task) for seq, (kind, task) in numbered], using
+        )
+
+
+def get_changes(user_id, since, limit):
+    """
+    Return the user's tasks changed after sequence number `since`, oldest
+    change first, at most `limit` of them.
+
+    Returns:
+        tuple: ([(TaskChange, Task or None), ...], whether more changes
+        follow). A change whose task no longer exists, in the task table or
+        the archive, is a deletion, even if its tombstone isn't recorded yet.
+
+    Raises:
+        ChangesCompacted: If tombstones after `since` have been compacted.
+    """
+    using = router.db_for_read(TaskChange)
+    if since:
+        compacted = (
+            TaskSequence.objects.using(using)
+            .filter(user_id=user_id)
+            .values_list("compacted", flat=True)
+            .first()
+        )
+        if compacted and since < compacted:
+            raise ChangesCompacted()
+    # One extra row to find out whether more changes follow.
+    rows = list(
+        TaskChange.objects.using(using)
+        .filter(user_id=user_id, seq__gt=since)
+        .order_by("seq")[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # Read from the same database as the changes, not a lagging replica.
+    task_ids = [change.task_id for change in rows if not change.deleted]
+    tasks = Task.objects.using(using).in_bulk(task_ids)
+    # Archived tasks (task.archive) still exist for the client.
+    missing = [task_id for task_id in task_ids if task_id not in tasks]
+    if missing:
+        for archived in TaskArchive.objects.using(using).filter(pk__in=missing):
+            tasks[archived.pk] = archived.as_task()
+    return [(change, tasks.get(change.task_id)) for change in rows], has_more
+
+
+def compact(older_than_days=None, using=None):
+    """
+    Delete the tombstones recorded more than `older_than_days` days ago
+    (TASK_CHANGES["TOMBSTONE_DAYS"] by default) and move each affected
+    user's compaction horizon past them.
+
+    Returns:
+        int: The number of tombstones deleted.
+    """
+    if older_than_days is None:
+        older_than_days = get_changes_settings()["TOMBSTONE_DAYS"]
+    using = using or router.db_for_write(TaskChange)
+    cutoff = timezone.now() - datetime.timedelta(days=older_than_days)
+    horizons = (
+        TaskChange.objects.using(using)
+        .filter(deleted=True, changed_at__lt=cutoff)
+        .values_list("user_id")
+        .annotate(Max("seq"))
+    )
+    deleted = 0
+    for user_id, horizon in list(horizons):
+        with transaction.atomic(using=using):
+            # Clients whose cursor is behind the horizon get ChangesCompacted.
+            TaskSequence.objects.using(using).filter(
+                user_id=user_id, compacted__lt=horizon
+            ).update(compacted=horizon)
+            deleted += (
+                TaskChange.objects.using(using)
+                .filter(user_id=user_id, deleted=True, seq__lte=horizon)
+                .delete()[0]
+            )
+    return deleted
@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from .filters import include_archived
+from .models import Task, TaskArchive
+
+TASK_AGGREGATES = {"count": Count("id"), "last_modified": Max("updated_at")}
+ARCHIVE_AGGREGATES = {
+    "archived_count": Count("id"),
+    "last_archived": Max("archived_at"),
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def list_validators(user_id, request):
+    """
+    Return the (ETag, Last-Modified timestamp) of a task list page.
+
+    Both come from one aggregate over the user's tasks: any create or update
+    moves the newest `updated_at` and any delete changes the count, so the
+    ETag changes whenever a page could. Pages that include archived tasks
+    also aggregate the archive's count and newest `archived_at`. The page
+    URL is part of the ETag because each page and filter combination is a
+    different representation.
+    """
+    stats = Task.objects.filter(user_id=user_id).aggregate(**TASK_AGGREGATES)
+    if include_archived(request):
+        stats.update(
+            TaskArchive.objects.filter(user_id=user_id).aggregate(**ARCHIVE_AGGREGATES)
+        )
+    return build_list_validators(user_id, stats, request)
+
+
+async def alist_validators(user_id, request):
+    stats = await Task.objects.filter(user_id=user_id).aaggregate(**TASK_AGGREGATES)
+    if include_archived(request):
+        stats.update(
+            await TaskArchive.objects.filter(user_id=user_id).aaggregate(
+                **ARCHIVE_AGGREGATES
+            )
+        )
+    return build_list_validators(user_id, stats, request)
+
+
+def build_list_validators(user_id, stats, request):
+    last_modified = max(
+        filter(None, [stats["last_modified"], stats.get("last_archived")]),
+        default=None,
+    )
+    version = ":".join(
+        str(value.isoformat() if hasattr(value, "isoformat") else value)
+        for value in (
+            stats["count"],
+            stats["last_modified"],
+            stats.get("archived_count"),
+            stats.get("last_archived"),
+        )
+    )
+    digest = hashlib.sha1(
+        f"{user_id}:{version}:{request.build_absolute_uri()}".encode()
+    ).hexdigest()
+    return quote_etag(digest), last_modified.timestamp() if last_modified else None
+
+
+def task_etag(task):
+    """
+    Return the strong ETag of a task: its id and `updated_at` in microseconds.
+    """
+    return quote_etag(f"{task.pk}-{(task.updated_at - EPOCH) // MICROSECOND}")
+
+
+def task_validators(task):
+    return task_etag(task), task.updated_at.timestamp()
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Return a 304 response if the client's cached copy is current, else None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+
+
+def parse_if_match(request, pk):
+    """
+    Return the `updated_at` values an If-Match header allows for task `pk`.
+
+    Returns:
+        None if there is no precondition (no header, or `*`), otherwise a
+        possibly empty list of datetimes. Weak ETags never match, as required
+        by the strong comparison If-Match uses.
+    """
+    header = request.META.get("HTTP_IF_MATCH")
+    if header is None:
+        return None
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+
+    allowed = []
+    for etag in etags:
+        if etag.startswith("W/"):
+            continue
+        task_pk, _, micros = etag.strip('"').partition("-")
+        if task_pk == str(pk) and micros.isdigit():
+            allowed.append(EPOCH + int(micros) * MICROSECOND)
+    return allowed
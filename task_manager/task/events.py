@@ -0,0 +1,271 @@
+import asyncio
+import json
+import threading
+from collections import OrderedDict, deque
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def get_config():
+    config = {
+        "BROKER": "task.events.InProcessBroker",
+        "COALESCE_MS": 50,
+        "MAX_BATCH": 500,
+        "MAX_PENDING": 1000,
+        "REPLAY_SIZE": 1000,
+        "REPLAY_USERS": 10000,
+        "HEARTBEAT_SECONDS": 15,
+    }
+    config.update(getattr(settings, "TASK_EVENTS", {}))
+    return config
+
+
+class Subscription:
+    """
+    One open event stream of a user, fed by the broker from any thread and
+    read on the event loop it was created on.
+
+    Events wait in `pending` until the stream takes them. A consumer that
+    falls more than `max_pending` events behind is cut off: its pending
+    events are dropped and `overflowed` is set, and the stream tells the
+    client to catch up through the changes feed instead. The same goes
+    when an event never arrives (e.g. a write made by another process with
+    the in-process broker): the user's sequence numbers are contiguous, so
+    get() sets `missed` when one after `last_id` is skipped.
+    """
+
+    def __init__(self, user_id, max_pending):
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.loop = asyncio.get_running_loop()
+        self.pending = deque()
+        self.overflowed = False
+        self.missed = False
+        self.closed = False
+        # The id of the last event the client has; set by the stream.
+        self.last_id = None
+        self._ready = asyncio.Event()
+
+    def deliver(self, events):
+        """
+        Queue `events`; runs on the subscription's event loop.
+        """
+        if self.overflowed:
+            return
+        if len(self.pending) + len(events) > self.max_pending:
+            self.overflowed = True
+            self.pending.clear()
+        else:
+            self.pending.extend(events)
+        self._ready.set()
+
+    def close(self):
+        """
+        Wake up the stream waiting in get(), e.g. once its client is gone.
+        """
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout, coalesce, max_batch):
+        """
+        Wait up to `timeout` seconds for events, then `coalesce` more seconds
+        for the events that follow, and return at most `max_batch` of them,
+        keeping only the latest event of each task (so the ids of the events
+        returned can skip those of the updates they superseded). Events up to
+        `last_id` are dropped; a skipped id sets `missed`.
+
+        Returns:
+            list: The events, oldest first; empty if none came in time or the
+            subscription overflowed, missed events or was closed.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        if coalesce and not self.closed:
+            await asyncio.sleep(coalesce)
+        batch = [
+            self.pending.popleft() for _ in range(min(max_batch, len(self.pending)))
+        ]
+        if not self.pending:
+            self._ready.clear()
+        # Concurrent writes can be published slightly out of order; the
+        # coalescing delay lets them line up again.
+        batch.sort(key=lambda event: event["id"])
+        if self.last_id is not None:
+            batch = [event for event in batch if event["id"] > self.last_id]
+            for event in batch:
+                if event["id"] != self.last_id + 1:
+                    self.missed = True
+                    self.pending.clear()
+                    return []
+                self.last_id = event["id"]
+        latest = {event["task_id"]: event for event in batch}
+        return sorted(latest.values(), key=lambda event: event["id"])
+
+
+class InProcessBroker:
+    """
+    Publish task events to the subscriptions of this process.
+
+    Only writes made by this process reach its subscribers, so it suits a
+    single ASGI server process. Deployments with several processes set
+    TASK_EVENTS["BROKER"] to a class with the same methods backed by a
+    local broker (e.g. Redis pub/sub); a stream that misses an event
+    notices the skipped sequence number and tells its client to resync
+    from the changes feed.
+
+    The last `replay_size` events of the `replay_users` users who most
+    recently subscribed are kept, so a client that reconnects with
+    Last-Event-ID gets what it missed without querying the database. Users
+    with an open stream are never evicted, so there can be more of them.
+    """
+
+    def __init__(self, replay_size=1000, replay_users=10000):
+        self.replay_size = replay_size
+        self.replay_users = replay_users
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._replay = OrderedDict()
+
+    def wants(self, user_id):
+        """
+        Whether events for `user_id` have anywhere to go, so that publishers
+        can skip building them.
+        """
+        return user_id in self._replay or user_id in self._subscriptions
+
+    def subscribe(self, subscription, last_event_id=None):
+        """
+        Register `subscription` and return the buffered events after
+        `last_event_id`, oldest first.
+
+        Returns:
+            list: The events to replay, or None if the buffer doesn't reach
+            back to `last_event_id` and some may be missing.
+        """
+        user_id = subscription.user_id
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+            buffer = self._replay.get(user_id)
+            if buffer is None:
+                buffer = self._replay[user_id] = deque(maxlen=self.replay_size)
+                self._evict(len(self._replay) - self.replay_users)
+            self._replay.move_to_end(user_id)
+            if last_event_id is None:
+                return []
+            events = sorted(
+                (event for event in buffer if event["id"] > last_event_id),
+                key=lambda event: event["id"],
+            )
+        ids = [event["id"] for event in events]
+        if ids != list(range(last_event_id + 1, last_event_id + 1 + len(ids))):
+            return None
+        return events
+
+    def _evict(self, count):
+        """
+        Drop the buffers of up to `count` of the least recently subscribed
+        users without an open stream; called with the lock held.
+        """
+        stale = []
+        for user_id in self._replay:
+            if len(stale) >= count:
+                break
+            if user_id not in self._subscriptions:
+                stale.append(user_id)
+        for user_id in stale:
+            del self._replay[user_id]
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, user_id, events):
+        with self._lock:
+            buffer = self._replay.get(user_id)
+            if buffer is not None:
+                buffer.extend(events)
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, events)
+            except RuntimeError:
+                # The subscription's event loop has been closed.
+                self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscriptions": sum(map(len, self._subscriptions.values())),
+                "replay_users": len(self._replay),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._subscriptions.clear()
+            self._replay.clear()
+
+
+def build_broker():
+    config = get_config()
+    return import_string(config["BROKER"])(
+        replay_size=config["REPLAY_SIZE"], replay_users=config["REPLAY_USERS"]
+    )
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Return the process-wide broker, creating it on first use.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = build_broker()
+    return _broker
+
+
+def publish(user_id, changes, using):
+    """
+    Publish `changes`, (sequence number, kind, task) tuples with kind
+    "created", "updated" or "deleted", once the write's transaction commits.
+    """
+    from .serializers import TaskSerializer
+
+    broker = get_broker()
+    if not changes or not broker.wants(user_id):
+        return
+    events = [
+        {
+            "id": seq,
+            "type": kind,
+            "task_id": task.pk,
+            **({"task": TaskSerializer(task).data} if kind != "deleted" else {}),
+        }
+        for seq, kind, task in changes
+    ]
+    transaction.on_commit(partial(broker.publish, user_id, events), using=using)
+
+
+def format_event(data, event=None, id=None):
+    """
+    Encode one Server-Sent Events message.
+    """
+    lines = []
+    if id is not None:
+        lines.append(f"id: {id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return ("\n".join(lines) + "\n\n").encode()
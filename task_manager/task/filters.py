@@ -0,0 +1,99 @@
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from . import search
+from .models import Task
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filter the task list by status and by created/updated date ranges.
+
+    Query parameters:
+        status: One or more comma separated statuses, e.g. `pending,completed`.
+        created_after, created_before: Inclusive `YYYY-MM-DD` bounds on created_at.
+        updated_after, updated_before: Inclusive `YYYY-MM-DD` bounds on updated_at,
+            in the server time zone.
+    """
+
+    date_filters = {
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lte",
+        "updated_after": "updated_at__gte",
+        "updated_before": "updated_at__lt",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get("status"):
+            statuses = params["status"].split(",")
+            valid = {choice for choice, _ in Task.STATUS_CHOICE}
+            invalid = [value for value in statuses if value not in valid]
+            if invalid:
+                raise ValidationError(
+                    {"status": [f"Invalid status: {', '.join(invalid)}."]}
+                )
+            queryset = queryset.filter(status__in=statuses)
+
+        for param, lookup in self.date_filters.items():
+            if not params.get(param):
+                continue
+            try:
+                value = parse_date(params[param])
+            except ValueError:
+                value = None
+            if value is None:
+                raise ValidationError({param: ["Enter a date in YYYY-MM-DD format."]})
+            if param.startswith("updated_"):
+                value = self.day_start(value, next_day=param == "updated_before")
+            queryset = queryset.filter(**{lookup: value})
+
+        return queryset
+
+    def day_start(self, day, next_day=False):
+        """
+        Return the aware datetime at which `day` (or the day after) starts.
+
+        Comparing updated_at against day boundaries, rather than its date,
+        keeps the (user, updated_at, id) index usable.
+        """
+        if next_day:
+            day += timedelta(days=1)
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over task title and description with `?search=`.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return search.search_tasks(queryset, query)
+
+
+def include_archived(request):
+    """
+    Return whether the task list should include archived tasks
+    (see task.archive), asked for with `?include_archived=true`.
+
+    Raises:
+        ValidationError: If the parameter isn't a boolean.
+    """
+    value = request.query_params.get("include_archived")
+    if not value:
+        return False
+    try:
+        return serializers.BooleanField().to_internal_value(value)
+    except ValidationError as exc:
+        raise ValidationError({"include_archived": exc.detail})
@@ -0,0 +1,205 @@
+import csv
+import datetime
+import io
+import json
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .bulk import validate_item
+from .models import Task
+from .serializers import DUPLICATE_TITLE_ERROR, TaskSerializer
+from .signals import tasks_changed
+
+FORMATS = ("ndjson", "csv")
+
+
+def get_import_settings():
+    config = getattr(settings, "TASK_IMPORT", {})
+    return config.get("BATCH_SIZE", 1000), config.get("MAX_REJECTED", 1000)
+
+
+def detect_format(name, requested=None):
+    """
+    Return the import format, from `requested` or the file extension of `name`.
+
+    Raises:
+        ValidationError: If the requested format is not supported.
+    """
+    if requested:
+        if requested not in FORMATS:
+            raise ValidationError(
+                {"format": [f"Expected one of: {', '.join(FORMATS)}."]}
+            )
+        return requested
+    return "csv" if (name or "").lower().endswith(".csv") else "ndjson"
+
+
+def read_rows(file, format):
+    """
+    Lazily parse a binary file of tasks, yielding (row number, item).
+
+    Row numbers count data rows from 1, not lines, so a CSV header or blank
+    NDJSON lines don't shift them. Unparseable NDJSON lines are yielded as
+    None and rejected by the importer.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if format == "csv":
+        yield from enumerate(csv.DictReader(text), start=1)
+        return
+
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            yield row, None
+
+
+class TaskImporter:
+    """
+    Import tasks for one user from an iterable of (row number, item) pairs.
+
+    Items are validated like a create through TaskSerializer, titles are
+    de-duplicated against the user's existing tasks and earlier rows with an
+    in-memory set, and valid tasks are written with bulk_create in batches of
+    `batch_size`, each in its own transaction. After every batch the row
+    number of the last committed row (the checkpoint) is reported to
+    `on_batch`; passing it back as `resume_from` skips the rows already
+    imported.
+    """
+
+    def __init__(self, user, batch_size=None, resume_from=0, on_batch=None):
+        default_batch_size, self.max_rejected = get_import_settings()
+        self.user = user
+        self.batch_size = batch_size or default_batch_size
+        self.resume_from = resume_from
+        self.on_batch = on_batch
+        self.serializer = TaskSerializer()
+
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejected_rows = []
+        self.checkpoint = resume_from
+        self.last_row = resume_from
+        self.started = None
+
+    def run(self, rows):
+        """
+        Import `rows` and return the report (see `report()`).
+
+        Raises:
+            ValidationError: If the upload is not valid UTF-8 text.
+        """
+        self.started = time.perf_counter()
+        self.titles = set(
+            Task.objects.filter(user_id=self.user.pk).values_list("title", flat=True)
+        )
+        batch = []
+        try:
+            for row, item in rows:
+                if row <= self.resume_from:
+                    continue
+                self.rows += 1
+                # Rejected rows move the checkpoint forward too.
+                self.last_row = row
+                task = self.build_task(row, item)
+                if task is not None:
+                    batch.append(task)
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch, row)
+                    batch = []
+        except UnicodeDecodeError:
+            raise ValidationError({"file": ["The file is not valid UTF-8."]})
+        if self.last_row > self.checkpoint:
+            self.write_batch(batch, self.last_row)
+        return self.report()
+
+    def build_task(self, row, item):
+        if item is None:
+            return self.reject(row, {"non_field_errors": ["Invalid JSON."]})
+        attrs, errors = validate_item(item, self.serializer)
+        if errors:
+            return self.reject(row, errors["errors"])
+        if attrs["title"] in self.titles:
+            return self.reject(row, {"title": [DUPLICATE_TITLE_ERROR]})
+        self.titles.add(attrs["title"])
+        task = Task(user_id=self.user.pk, **attrs)
+        if task.status == "completed":
+            # bulk_create() skips Task.save().
+            task.completed_at = datetime.date.today()
+        task.import_row = row
+        return task
+
+    def reject(self, row, errors):
+        self.rejected += 1
+        if len(self.rejected_rows) < self.max_rejected:
+            self.rejected_rows.append({"row": row, "errors": errors})
+        return None
+
+    def write_batch(self, batch, row):
+        """
+        Insert `batch` in one transaction and move the checkpoint to `row`.
+
+        A title taken by a concurrent request since the titles were loaded
+        fails the whole INSERT; the conflicting rows are then rejected and the
+        rest of the batch retried.
+        """
+        try:
+            self.insert(batch)
+        except IntegrityError:
+            taken = set(
+                Task.objects.filter(
+                    user_id=self.user.pk, title__in=[task.title for task in batch]
+                ).values_list("title", flat=True)
+            )
+            for task in batch:
+                if task.title in taken:
+                    self.reject(task.import_row, {"title": [DUPLICATE_TITLE_ERROR]})
+            batch = [task for task in batch if task.title not in taken]
+            self.insert(batch)
+
+        self.imported += len(batch)
+        self.checkpoint = row
+        if self.on_batch is not None:
+            self.on_batch(self.report())
+
+    def insert(self, batch):
+        if not batch:
+            return
+        with transaction.atomic():
+            Task.objects.bulk_create(batch, batch_size=self.batch_size)
+            tasks_changed.send(
+                sender=Task,
+                user_id=self.user.pk,
+                created=batch,
+                updated=[],
+                deleted=[],
+                using=Task.objects.db,
+            )
+
+    def report(self):
+        """
+        Return the progress so far.
+
+        Returns:
+            dict: Counts of rows read, imported and rejected, the checkpoint,
+            the elapsed time, the throughput and the first rejected rows
+            with their errors.
+        """
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "checkpoint": self.checkpoint,
+            "elapsed": round(elapsed, 3),
+            "rows_per_second": round(self.rows / elapsed) if elapsed else 0,
+            "rejected_rows": self.rejected_rows,
+        }
@@ -0,0 +1,106 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from jobs.files import get_storage
+from jobs.queue import JobFailed, owned, register
+
+from . import archive, stats
+from .importer import TaskImporter, read_rows
+from .renderers import CSVRenderer, NDJSONRenderer
+
+
+@register("task.export", concurrency=2)
+def export_tasks(job):
+    """
+    Write the user's tasks to a file in the jobs storage, filtered and
+    ordered by the query string of the GET /task/tasks/export/ request that
+    queued the job.
+    """
+    from .views import TaskExportView
+
+    request = Request(
+        RequestFactory().get(reverse("task-export"), job.payload.get("query", {}))
+    )
+    request.user = job.user
+    view = TaskExportView(request=request, format_kwarg=None, args=(), kwargs={})
+    renderer = {"ndjson": NDJSONRenderer, "csv": CSVRenderer}[job.payload["format"]]()
+    try:
+        rows, chunk_size = view.get_rows()
+    except ValidationError as exc:
+        raise JobFailed(exc.detail)
+
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for count, row in enumerate(rows, start=1):
+            yield row
+
+    with tempfile.TemporaryFile() as f:
+        for chunk in renderer.stream(counted(rows), chunk_size):
+            f.write(chunk)
+        f.seek(0)
+        name = get_storage().save(f"exports/{job.pk}.{renderer.format}", File(f))
+    return {
+        "file": name,
+        "filename": f"tasks.{renderer.format}",
+        "content_type": f"{renderer.media_type}; charset={renderer.charset}",
+        "rows": count,
+    }
+
+
+@register("task.import", concurrency=2)
+def import_tasks(job):
+    """
+    Import the file uploaded to POST /task/tasks/import/ for the user.
+
+    The import report is saved as the job's result after every batch, so
+    the status endpoint shows the progress, and a retry resumes from its
+    checkpoint.
+    """
+    payload = job.payload
+    progress = job.result or {}
+    importer = TaskImporter(
+        job.user,
+        batch_size=payload.get("batch_size") or None,
+        resume_from=progress.get("checkpoint", payload.get("resume_from", 0)),
+        on_batch=lambda report: owned(job).update(result=report),
+    )
+    storage = get_storage()
+    with storage.open(payload["file"], "rb") as f:
+        try:
+            report = importer.run(read_rows(f, payload["format"]))
+        except ValidationError as exc:
+            raise JobFailed(exc.detail)
+    storage.delete(payload["file"])
+    return report
+
+
+@register("task.rebuild_stats")
+def rebuild_stats(job):
+    """
+    Rebuild the task counters of the users in payload["user_ids"], or of
+    every user (see the reconcile_task_stats command).
+    """
+    user_ids = job.payload.get("user_ids")
+    if user_ids is None:
+        user_ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+    checked = rebuilt = 0
+    for user_id in user_ids:
+        checked += 1
+        rebuilt += stats.rebuild(user_id)
+    return {"checked": checked, "rebuilt": rebuilt}
+
+
+@register("task.archive", concurrency=1)
+def archive_tasks(job):
+    """
+    Move old completed tasks to the archive (see the archive_tasks command).
+    """
+    return {"archived": archive.archive(job.payload.get("days"))}
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import enqueue
+from task import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the tasks completed and not updated for more than --days days "
+        '(TASK_ARCHIVE["AFTER_DAYS"] by default) from the task table to the '
+        "archive, in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Age of the newest task moved.")
+        parser.add_argument("--batch-size", type=int, help="Tasks per transaction.")
+        parser.add_argument("--pause-ms", type=int, help="Pause between transactions.")
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue a job for the workers (run_workers) instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = enqueue("task.archive", {"days": options["days"]})
+            self.stdout.write(f"Queued job {job.pk}.")
+            return
+        pause = options["pause_ms"]
+        archived = archive.archive(
+            options["days"],
+            batch_size=options["batch_size"],
+            pause=None if pause is None else pause / 1000,
+        )
+        self.stdout.write(f"Archived {archived} tasks.")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from task import changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the tombstones of tasks deleted more than --days days ago "
+        '(TASK_CHANGES["TOMBSTONE_DAYS"] by default) from the changes feed. '
+        "Clients that last synced before them have to sync from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="Age of the oldest tombstone kept."
+        )
+
+    def handle(self, *args, **options):
+        deleted = changes.compact(options["days"])
+        self.stdout.write(f"Deleted {deleted} tombstones.")
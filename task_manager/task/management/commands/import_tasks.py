@@ -0,0 +1,80 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from task.importer import FORMATS, TaskImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks for a user from an NDJSON or CSV file. Progress is saved "
+        "to a checkpoint file after every batch, and an interrupted import "
+        "resumes from it when run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON or CSV file to import.")
+        parser.add_argument("--user", required=True, help="Email of the owner.")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file, by default the import file with .checkpoint appended.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the first row.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+
+        checkpoint_path = options["checkpoint"] or f"{options['path']}.checkpoint"
+        resume_from = 0
+        if not options["restart"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                resume_from = json.load(f)["checkpoint"]
+            self.stdout.write(f"Resuming after row {resume_from}.")
+
+        def on_batch(report):
+            with open(checkpoint_path, "w") as f:
+                json.dump({"checkpoint": report["checkpoint"]}, f)
+            self.stdout.write(
+                f"{report['checkpoint']} rows processed, {report['imported']} "
+                f"imported, {report['rejected']} rejected "
+                f"({report['rows_per_second']} rows/s)"
+            )
+
+        importer = TaskImporter(
+            user,
+            batch_size=options["batch_size"],
+            resume_from=resume_from,
+            on_batch=on_batch,
+        )
+        try:
+            with open(options["path"], "rb") as f:
+                format = detect_format(options["path"], options["format"])
+                report = importer.run(read_rows(f, format))
+        except (OSError, ValidationError) as e:
+            raise CommandError(str(e))
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        for rejected in report["rejected_rows"]:
+            self.stderr.write(
+                f"Row {rejected['row']}: {json.dumps(rejected['errors'])}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} of {report['rows']} rows "
+                f"({report['rejected']} rejected) in {report['elapsed']} s, "
+                f"{report['rows_per_second']} rows/s."
+            )
+        )
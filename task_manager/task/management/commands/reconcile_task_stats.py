@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queue import enqueue
+from task import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the task status and per-day counters from the task and task "
+        "archive tables, for every user or the given ones, and report the "
+        "users whose counters had drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", action="append", help="Email of a user; repeatable."
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue a job for the workers (run_workers) instead.",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(email__in=options["user"])
+            if len(users) != len(set(options["user"])):
+                raise CommandError("Unknown user email.")
+        if options["background"]:
+            user_ids = (
+                list(users.values_list("pk", flat=True)) if options["user"] else None
+            )
+            job = enqueue("task.rebuild_stats", {"user_ids": user_ids})
+            self.stdout.write(f"Queued job {job.pk}.")
+            return
+
+        checked = fixed = 0
+        for user_id, email in users.values_list("pk", "email").iterator():
+            checked += 1
+            if stats.rebuild(user_id):
+                fixed += 1
+                self.stdout.write(f"Rebuilt the counters of {email}.")
+        self.stdout.write(f"Checked {checked} users, {fixed} had drifted.")
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from task import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a user's archived tasks, all of them or the given ids, back to "
+        "the task table. Tasks whose title has been taken since are left "
+        "archived and listed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user.")
+        parser.add_argument("ids", nargs="*", type=int, help="Task ids.")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError("Unknown user email.")
+        restored, conflicts = archive.restore(user.pk, options["ids"] or None)
+        self.stdout.write(f"Restored {len(restored)} tasks.")
+        if conflicts:
+            self.stdout.write(
+                "Left archived, title taken: " + ", ".join(str(pk) for pk in conflicts)
+            )
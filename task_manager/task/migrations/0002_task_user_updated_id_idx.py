@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "updated_at", "id"], name="task_user_updated_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+FTS_TABLE = "task_task_fts"
+SEARCH_INDEX = "task_search_vector_idx"
+
+
+def search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(
+        SearchVector("title", "description", config="english"), name=SEARCH_INDEX
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "title, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+            "SELECT id, title, COALESCE(description, '') FROM task_task"
+        )
+    elif vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("task", "Task"), search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("task", "Task"), search_index())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0002_task_user_updated_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
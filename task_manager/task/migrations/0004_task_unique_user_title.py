@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+FTS_TABLE = "task_task_fts"
+
+
+def deduplicate_titles(apps, schema_editor):
+    """
+    Rename duplicate (user, title) rows so the unique constraint can be added.
+
+    The oldest task keeps its title; later duplicates get their id appended,
+    e.g. "Groceries (42)". No task is deleted.
+    """
+    Task = apps.get_model("task", "Task")
+    db_alias = schema_editor.connection.alias
+    duplicates = (
+        Task.objects.using(db_alias)
+        .values("user_id", "title")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        titles = set(
+            Task.objects.using(db_alias)
+            .filter(user_id=duplicate["user_id"])
+            .values_list("title", flat=True)
+        )
+        tasks = (
+            Task.objects.using(db_alias)
+            .filter(user_id=duplicate["user_id"], title=duplicate["title"])
+            .order_by("id")[1:]
+        )
+        for task in tasks:
+            suffix = f" ({task.id})"
+            title = task.title[: 100 - len(suffix)] + suffix
+            while title in titles:
+                suffix = f" ({task.id}){suffix}"
+                title = task.title[: 100 - len(suffix)] + suffix
+            titles.add(title)
+            Task.objects.using(db_alias).filter(id=task.id).update(title=title)
+            if schema_editor.connection.vendor == "sqlite":
+                schema_editor.execute(
+                    f"UPDATE {FTS_TABLE} SET title = %s WHERE rowid = %s",
+                    [title, task.id],
+                )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0003_task_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_titles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="task",
+            constraint=models.UniqueConstraint(
+                fields=("user", "title"), name="task_unique_user_title"
+            ),
+        ),
+    ]
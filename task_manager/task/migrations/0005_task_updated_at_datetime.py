@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:47
+
+from django.db import migrations, models
+
+
+def date_to_datetime(apps, schema_editor):
+    # SQLite keeps the old "YYYY-MM-DD" text when the column type changes,
+    # which the datetime converter can't parse; PostgreSQL casts on its own.
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            "UPDATE task_task SET updated_at = updated_at || ' 00:00:00' "
+            "WHERE length(updated_at) = 10"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0004_task_unique_user_title"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(date_to_datetime, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Date existing completed tasks by their last update and count every
+    user's tasks, like `manage.py reconcile_task_stats`.
+    """
+    Task = apps.get_model("task", "Task")
+    TaskCounts = apps.get_model("task", "TaskCounts")
+    TaskDailyCount = apps.get_model("task", "TaskDailyCount")
+
+    Task.objects.filter(status="completed").update(completed_at=TruncDate("updated_at"))
+    counts = {}
+    for user_id, status, count in Task.objects.values_list(
+        "user_id", "status"
+    ).annotate(Count("id")):
+        counts.setdefault(user_id, {})[status] = count
+    TaskCounts.objects.bulk_create(
+        [TaskCounts(user_id=user_id, **values) for user_id, values in counts.items()],
+        batch_size=1000,
+    )
+
+    daily = {}
+    for user_id, day, count in Task.objects.values_list(
+        "user_id", "created_at"
+    ).annotate(Count("id")):
+        daily.setdefault((user_id, day), {})["created"] = count
+    for user_id, day, count in (
+        Task.objects.filter(status="completed")
+        .values_list("user_id", "completed_at")
+        .annotate(Count("id"))
+    ):
+        daily.setdefault((user_id, day), {})["completed"] = count
+    TaskDailyCount.objects.bulk_create(
+        [
+            TaskDailyCount(user_id=user_id, day=day, **values)
+            for (user_id, day), values in daily.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0005_task_updated_at_datetime"),
+        ("user", "0003_revokedtoken"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounts",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_counts",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("pending", models.IntegerField(default=0)),
+                ("in_progress", models.IntegerField(default=0)),
+                ("completed", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="completed_at",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="previous_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("pending", "Pending"),
+                    ("in_progress", "In Progress"),
+                    ("completed", "Completed"),
+                ],
+                editable=False,
+                max_length=15,
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="TaskDailyCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("created", models.IntegerField(default=0)),
+                ("completed", models.IntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_daily_counts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "day"), name="task_daily_count_user_day"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_changes(apps, schema_editor):
+    """
+    Give every existing task a change, numbered per user in the order the
+    tasks were last updated, so a first sync (since=0) returns them all.
+    """
+    Task = apps.get_model("task", "Task")
+    TaskChange = apps.get_model("task", "TaskChange")
+    TaskSequence = apps.get_model("task", "TaskSequence")
+
+    now = timezone.now()
+    last = {}
+    batch = []
+    for user_id, task_id in Task.objects.order_by(
+        "user_id", "updated_at", "id"
+    ).values_list("user_id", "id"):
+        last[user_id] = seq = last.get(user_id, 0) + 1
+        batch.append(
+            TaskChange(user_id=user_id, task_id=task_id, seq=seq, changed_at=now)
+        )
+        if len(batch) == 1000:
+            TaskChange.objects.bulk_create(batch)
+            batch = []
+    TaskChange.objects.bulk_create(batch)
+    TaskSequence.objects.bulk_create(
+        [TaskSequence(user_id=user_id, last=seq) for user_id, seq in last.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("task", "0006_task_stats"),
+        ("user", "0003_revokedtoken"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskSequence",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_sequence",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("last", models.BigIntegerField(default=0)),
+                ("compacted", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_id", models.BigIntegerField()),
+                ("seq", models.BigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                ("changed_at", models.DateTimeField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="task_changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "task_id"), name="task_change_user_task"
+                    ),
+                    models.UniqueConstraint(
+                        fields=("user", "seq"), name="task_change_user_seq"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_changes, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import datetime
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
@@ -16,7 +18,191 @@ class Task(models.Model):
     description = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=15, choices=STATUS_CHOICE, default="pending")
     created_at = models.DateField(auto_now_add=True)
-    updated_at = models.DateField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # The day the task was last marked completed; kept if it is reopened.
+    completed_at = models.DateField(null=True, blank=True, editable=False)
+    # The status before the last write to `status`. Write paths that don't
+    # load the task (task.queries, bulk UPDATEs) set it from the old row in
+    # the same statement, which tells the status counters (task.stats) what
+    # the transition was.
+    previous_status = models.CharField(
+        max_length=15, choices=STATUS_CHOICE, null=True, blank=True, editable=False
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "title"], name="task_unique_user_title"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "updated_at", "id"], name="task_user_updated_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        task._loaded_status = task.__dict__.get("status")
+        return task
+
+    def set_status(self, status):
+        """
+        Change the status of a loaded task, recording `previous_status` and
+        `completed_at` like save() and task.queries.update_task() do.
+        """
+        self.previous_status = self.status
+        if status == "completed" and self.status != "completed":
+            self.completed_at = datetime.date.today()
+        self.status = status
+
+    def save(self, *args, **kwargs):
+        loaded_status = getattr(self, "_loaded_status", None)
+        update_fields = kwargs.get("update_fields")
+        writes_status = update_fields is None or "status" in update_fields
+        if self._state.adding:
+            if self.status == "completed" and self.completed_at is None:
+                self.completed_at = datetime.date.today()
+        elif writes_status and loaded_status is not None:
+            self.previous_status = loaded_status
+            if self.status == "completed" and loaded_status != "completed":
+                self.completed_at = datetime.date.today()
+        if update_fields is not None and "status" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "previous_status",
+                "completed_at",
+            }
+        super().save(*args, **kwargs)
+        self._loaded_status = self.status
+
+
+class TaskCounts(models.Model):
+    """
+    Number of tasks per status for one user, kept up to date by task.stats.
+    """
+
+    user = models.OneToOneField(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_counts",
+    )
+    pending = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+
+class TaskDailyCount(models.Model):
+    """
+    Number of one user's tasks created on `day`, and completed on `day` and
+    still completed, kept up to date by task.stats.
+    """
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="task_daily_counts"
+    )
+    day = models.DateField()
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day"], name="task_daily_count_user_day"
+            ),
+        ]
+
+
+class TaskSequence(models.Model):
+    """
+    The last change sequence number given to one of a user's tasks, and the
+    highest sequence number up to which their tombstones have been
+    compacted, kept by task.changes.
+    """
+
+    user = models.OneToOneField(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_sequence",
+    )
+    last = models.BigIntegerField(default=0)
+    compacted = models.BigIntegerField(default=0)
+
+
+class TaskChange(models.Model):
+    """
+    The latest change to one of a user's tasks: the sequence number of the
+    last write to it, and whether that write deleted it (a tombstone).
+    `task_id` is not a foreign key, so tombstones outlive their task.
+    """
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="task_changes"
+    )
+    task_id = models.BigIntegerField()
+    seq = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "task_id"], name="task_change_user_task"
+            ),
+            # Also the index the changes feed reads in order.
+            models.UniqueConstraint(
+                fields=["user", "seq"], name="task_change_user_seq"
+            ),
+        ]
+
+
+class TaskArchive(models.Model):
+    """
+    A completed task moved out of the task table by task.archive, keeping
+    its id and every column, so the indexes of the hot table only cover the
+    tasks still in use. Titles are only unique among the hot tasks; a task
+    is restored as long as its title is still free.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="archived_tasks"
+    )
+    title = models.CharField(max_length=100)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICE)
+    created_at = models.DateField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateField(null=True, blank=True)
+    previous_status = models.CharField(
+        max_length=15, choices=Task.STATUS_CHOICE, null=True, blank=True
+    )
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "updated_at", "id"],
+                name="task_archive_user_updated_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.status}, archived)"
+
+    def as_task(self):
+        """
+        Return the archived task as an unsaved Task, to be serialized like one.
+        """
+        return Task(
+            **{
+                field.attname: getattr(self, field.attname)
+                for field in Task._meta.concrete_fields
+            }
+        )
@@ -0,0 +1,288 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Field, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowValue(Func):
+    """
+    SQL row value, e.g. ("updated_at", "id"), for tuple comparisons.
+    """
+
+    function = ""
+    template = "(%(expressions)s)"
+    output_field = Field()
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for the task list.
+
+    Rows are ordered on a unique composite key and each page starts right after
+    the ordering values of the last row of the previous page. The position is
+    handed to the client as an opaque cursor token, so fetching page N is an
+    index seek on (user, updated_at, id) instead of an OFFSET that has to skip
+    over every earlier row.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-updated_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        config = getattr(settings, "TASK_PAGINATION", {})
+        self.default_page_size = config.get("PAGE_SIZE", 50)
+        self.max_page_size = config.get("MAX_PAGE_SIZE", 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        segments = self.get_page_segments(queryset, request, view)
+        return self.set_page(self.read_segments(segments))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async paginate_queryset() for async views.
+        """
+        segments = self.get_page_segments(queryset, request, view)
+        return self.set_page(await self.aread_segments(segments))
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate the rows of several querysets with the same fields (e.g. the
+        tasks and the archived tasks of a user) as one list.
+
+        Each queryset is read on its own, with the same index seeks as
+        paginate_queryset(), for at most one page past the cursor, and the
+        rows are merged in the database's order: with one UNION ALL of those
+        reads under a single ORDER BY where the backend allows a LIMIT on
+        each part (PostgreSQL), and in Python on SQLite, whose default
+        (BINARY) collation orders text by code point like Python does.
+        """
+        segments = [self.get_page_segments(qs, request, view) for qs in querysets]
+        union = self.get_union(segments, querysets[0].db)
+        if union is not None:
+            return self.set_page(list(union))
+        rows = []
+        for group in segments:
+            rows += self.read_segments(group)
+        return self.set_page(self.merge(rows))
+
+    async def apaginate_querysets(self, querysets, request, view=None):
+        """
+        Async paginate_querysets() for async views.
+        """
+        segments = [self.get_page_segments(qs, request, view) for qs in querysets]
+        union = self.get_union(segments, querysets[0].db)
+        if union is not None:
+            return self.set_page([row async for row in union])
+        rows = []
+        for group in segments:
+            rows += await self.aread_segments(group)
+        return self.set_page(self.merge(rows))
+
+    def get_union(self, segments, using):
+        """
+        Return the first page_size + 1 rows of every segment of `segments`
+        (lists of segments, see get_segments) as one ordered queryset, or
+        None if the backend can't limit the parts of a UNION.
+        """
+        if not connections[using].features.supports_slicing_ordering_in_compound:
+            return None
+        limit = self.page_size + 1
+        parts = [segment[:limit] for group in segments for segment in group]
+        return parts[0].union(*parts[1:], all=True).order_by(*self.ordering)[:limit]
+
+    def read_segments(self, segments):
+        # Fetch one extra row to find out whether a next page exists.
+        limit = self.page_size + 1
+        rows = []
+        for segment in segments:
+            rows += segment[: limit - len(rows)]
+            if len(rows) >= limit:
+                break
+        return rows
+
+    async def aread_segments(self, segments):
+        limit = self.page_size + 1
+        rows = []
+        for segment in segments:
+            rows += [row async for row in segment[: limit - len(rows)]]
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def merge(self, rows):
+        """
+        Sort `rows` read from several querysets by the page ordering.
+        """
+        # One stable sort per field, least significant first, so each field
+        # keeps its own direction.
+        for field in reversed(self.ordering):
+            rows.sort(
+                key=lambda row: self.get_field_value(row, field),
+                reverse=field.startswith("-"),
+            )
+        return rows
+
+    def get_page_segments(self, queryset, request, view):
+        """
+        Resolve the page size, ordering and cursor of the request, and return
+        the segments to read the page from (see get_segments).
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        return self.get_segments(queryset, position)
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, capped at the configured maximum.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        if page_size <= 0:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the ordering for the page, ending with `id` as a unique tiebreaker.
+
+        The ordering requested through the view's OrderingFilter is honoured
+        when there is one, including the direction of an `id` term in it
+        (fields after it can't change the order and are dropped). Without
+        one, the tiebreaker follows the direction of the first field so the
+        key stays seekable.
+        """
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = list(ordering or self.ordering)
+        for index, field in enumerate(ordering):
+            if field.lstrip("-") == "id":
+                return tuple(ordering[: index + 1])
+        prefix = "-" if ordering and ordering[0].startswith("-") else ""
+        return tuple(ordering) + (f"{prefix}id",)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [self.get_field_value(last, field) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position)
+        )
+
+    def get_field_value(self, row, field):
+        # Rows are model instances or dicts from .values().
+        if isinstance(row, dict):
+            return row[field.lstrip("-")]
+        return getattr(row, field.lstrip("-"))
+
+    def get_segments(self, queryset, position):
+        """
+        Return the querysets that, read in order, yield the rows after `position`.
+
+        On PostgreSQL a uniform-direction ordering is a single row value
+        comparison, (a, b, c) < (x, y, z), answered with one index range seek.
+        Elsewhere the range is split per key prefix:
+        (a = x AND b = y AND c < z), then (a = x AND b < y), then (a < x).
+        Each segment is an exact seek on the composite index, so a page costs
+        at most one short query per ordering field no matter how deep it is.
+        """
+        if position is None:
+            return [queryset]
+
+        names = [field.lstrip("-") for field in self.ordering]
+        descending = [field.startswith("-") for field in self.ordering]
+
+        if (
+            connections[queryset.db].vendor == "postgresql"
+            and len(set(descending)) == 1
+        ):
+            lookup = LessThan if descending[0] else GreaterThan
+            values = [
+                Value(value, output_field=queryset.model._meta.get_field(name))
+                for name, value in zip(names, position)
+            ]
+            return [
+                queryset.filter(lookup(RowValue(*map(F, names)), RowValue(*values)))
+            ]
+
+        segments = []
+        for level in reversed(range(len(names))):
+            lookup = "lt" if descending[level] else "gt"
+            filters = dict(zip(names[:level], position[:level]))
+            filters[f"{names[level]}__{lookup}"] = position[level]
+            segments.append(queryset.filter(**filters))
+        return segments
+
+    def encode_cursor(self, position):
+        values = [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in position
+        ]
+        payload = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return urlsafe_b64encode(payload).decode("ascii")
+
+    def decode_cursor(self, request, model):
+        """
+        Return the position encoded in the request cursor, or None.
+
+        Raises:
+            NotFound: If the cursor is malformed or does not match the ordering.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError("Cursor does not match the ordering")
+            return [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (
+            binascii.Error,
+            DjangoValidationError,
+            TypeError,
+            UnicodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
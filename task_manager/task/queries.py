@@ -0,0 +1,161 @@
+import datetime
+
+from django.db import connections, router, transaction
+
+from .models import Task
+from .signals import tasks_changed
+from .stats import status_change_expressions
+
+
+def supports_returning(using):
+    # RETURNING on INSERT, UPDATE and DELETE ships together (SQLite 3.35+,
+    # PostgreSQL, MariaDB 10.5+).
+    return connections[using].features.can_return_columns_from_insert
+
+
+def returning_statement(using, sql, params):
+    """
+    Run a single UPDATE/DELETE ... RETURNING statement and return the Task row.
+
+    A raw queryset maps the returned columns back onto a Task with the same
+    type conversions as a regular SELECT.
+    """
+    return next(iter(Task.objects.db_manager(using).raw(sql, params)), None)
+
+
+def precondition_sql(connection, expected_updated_at):
+    """
+    Return the extra WHERE clause and params for an If-Match precondition.
+    """
+    if expected_updated_at is None:
+        return "", []
+    if not expected_updated_at:
+        return " AND 1 = 0", []
+    field = Task._meta.get_field("updated_at")
+    placeholders = ", ".join(["%s"] * len(expected_updated_at))
+    return (
+        f" AND {connection.ops.quote_name(field.column)} IN ({placeholders})",
+        [field.get_db_prep_value(value, connection) for value in expected_updated_at],
+    )
+
+
+def update_task(pk, user_id, changes, expected_updated_at=None, using=None):
+    """
+    Apply `changes` to the user's task with a single conditional UPDATE.
+
+    The ownership check, and the If-Match precondition when
+    `expected_updated_at` is given, are part of the WHERE clause, so no SELECT
+    is needed before the write. `updated_at` is refreshed like Model.save()
+    would. A new status also sets `previous_status` (and `completed_at`) from
+    the old row in the same statement, for the status counters.
+
+    Returns:
+        Task: The updated task, or None if no task matched.
+    """
+    using = using or router.db_for_write(Task)
+    connection = connections[using]
+    meta = Task._meta
+    changes = dict(changes)
+    changes["updated_at"] = meta.get_field("updated_at").pre_save(Task(), add=False)
+
+    # The write and the tasks_changed receivers (counters, changes feed,
+    # search index) commit or roll back together.
+    with transaction.atomic(using=using):
+        if supports_returning(using):
+            qn = connection.ops.quote_name
+            fields = [meta.get_field(name) for name in changes]
+            assignments = [f"{qn(field.column)} = %s" for field in fields]
+            params = [
+                field.get_db_prep_save(changes[field.name], connection)
+                for field in fields
+            ]
+            if "status" in changes:
+                # Assignments see the row's old values.
+                assignments.append(f"{qn('previous_status')} = {qn('status')}")
+                if changes["status"] == "completed":
+                    assignments.append(
+                        f"{qn('completed_at')} = CASE WHEN {qn('status')} = %s "
+                        f"THEN {qn('completed_at')} ELSE %s END"
+                    )
+                    params += [
+                        "completed",
+                        meta.get_field("completed_at").get_db_prep_save(
+                            datetime.date.today(), connection
+                        ),
+                    ]
+            columns = ", ".join(qn(field.column) for field in meta.concrete_fields)
+            condition, condition_params = precondition_sql(
+                connection, expected_updated_at
+            )
+            task = returning_statement(
+                using,
+                f"UPDATE {qn(meta.db_table)} SET {', '.join(assignments)} "
+                f"WHERE {qn('id')} = %s AND {qn('user_id')} = %s{condition} "
+                f"RETURNING {columns}",
+                params + [pk, user_id] + condition_params,
+            )
+        else:
+            queryset = Task.objects.using(using).filter(pk=pk, user_id=user_id)
+            if expected_updated_at is not None:
+                queryset = queryset.filter(updated_at__in=expected_updated_at)
+            extra = (
+                status_change_expressions(changes["status"])
+                if "status" in changes
+                else {}
+            )
+            task = queryset.first() if queryset.update(**changes, **extra) else None
+
+        if task is not None:
+            tasks_changed.send(
+                sender=Task,
+                user_id=user_id,
+                created=[],
+                updated=[task],
+                deleted=[],
+                fields=set(changes),
+                using=using,
+            )
+    return task
+
+
+def delete_task(pk, user_id, expected_updated_at=None, using=None):
+    """
+    Delete the user's task with a single conditional DELETE.
+
+    Returns:
+        Task: The deleted task, or None if no task matched.
+    """
+    using = using or router.db_for_write(Task)
+    connection = connections[using]
+    meta = Task._meta
+
+    if not supports_returning(using):
+        queryset = Task.objects.using(using).filter(pk=pk, user_id=user_id)
+        if expected_updated_at is not None:
+            queryset = queryset.filter(updated_at__in=expected_updated_at)
+        task = queryset.first()
+        if task is not None:
+            task.delete()
+        return task
+
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(field.column) for field in meta.concrete_fields)
+    condition, condition_params = precondition_sql(connection, expected_updated_at)
+    with transaction.atomic(using=using):
+        task = returning_statement(
+            using,
+            f"DELETE FROM {qn(meta.db_table)} "
+            f"WHERE {qn('id')} = %s AND {qn('user_id')} = %s{condition} "
+            f"RETURNING {columns}",
+            [pk, user_id] + condition_params,
+        )
+        if task is not None:
+            tasks_changed.send(
+                sender=Task,
+                user_id=user_id,
+                created=[],
+                updated=[],
+                deleted=[task],
+                using=using,
+            )
+    return task
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    The output is byte-for-byte what JSONRenderer produces with the default
+    settings (compact separators, raw UTF-8, U+2028/U+2029 escaped). Anything
+    orjson can't encode natively, such as lazy translation strings, and
+    indented output fall back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes these so the output is also valid
+        # JavaScript.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline delimited JSON: one object per line.
+
+    `stream()` encodes an iterable of rows lazily, `chunk_size` rows per
+    yielded chunk, so it can feed a StreamingHttpResponse.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"".join(self.stream(data))
+
+    def stream(self, rows, chunk_size=1000):
+        chunk = []
+        for row in rows:
+            chunk.append(self.dumps(row))
+            if len(chunk) >= chunk_size:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+
+    def dumps(self, row):
+        if orjson is not None:
+            return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+        return (
+            json.dumps(
+                row,
+                cls=encoders.JSONEncoder,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode("utf-8")
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV with a header row taken from the keys of the first row.
+
+    Like NDJSONRenderer, `stream()` encodes lazily in chunks of `chunk_size`
+    rows. None is written as an empty field.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"".join(self.stream(data))
+
+    def stream(self, rows, chunk_size=1000):
+        buffer = io.StringIO()
+        writer = None
+        count = 0
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+            if count % chunk_size == 0:
+                yield self.flush(buffer)
+        if buffer.tell():
+            yield self.flush(buffer)
+
+    def flush(self, buffer):
+        value = buffer.getvalue().encode(self.charset)
+        buffer.seek(0)
+        buffer.truncate()
+        return value
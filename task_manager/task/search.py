@@ -0,0 +1,93 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Task
+
+FTS_TABLE = "task_task_fts"
+SEARCH_CONFIG = "english"
+
+
+def search_vector():
+    """
+    Return the tsvector expression indexed by `task_search_vector_idx`.
+
+    The query must use exactly this expression for PostgreSQL to pick the
+    GIN index.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("title", "description", config=SEARCH_CONFIG)
+
+
+def search_tasks(queryset, query):
+    """
+    Restrict `queryset` to tasks whose title or description match `query`.
+
+    SQLite is served from the FTS5 table kept in sync by the task signals and
+    PostgreSQL from the GIN expression index; any other backend, and archived
+    tasks on SQLite (which aren't in the FTS5 table), fall back to a plain
+    `icontains` scan.
+    """
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "sqlite" and queryset.model is Task:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return queryset.none()
+        # Quote every term so user input can't inject FTS5 query syntax, and
+        # match on prefixes so partially typed words still hit.
+        match = " ".join('"{}"*'.format(term) for term in terms)
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        )
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery
+
+        return queryset.alias(search_vector=search_vector()).filter(
+            search_vector=SearchQuery(
+                query, config=SEARCH_CONFIG, search_type="websearch"
+            )
+        )
+
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+
+
+def affects_index(fields):
+    """
+    Return whether writing `fields` (None meaning unknown) changes indexed text.
+    """
+    return fields is None or bool({"title", "description"} & set(fields))
+
+
+def index_tasks(tasks, using="default"):
+    """
+    Add or refresh `tasks` in the SQLite full-text index.
+    """
+    if connections[using].vendor != "sqlite" or not tasks:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(task.pk,) for task in tasks]
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description) VALUES (%s, %s, %s)",
+            [(task.pk, task.title, task.description or "") for task in tasks],
+        )
+
+
+def unindex_tasks(task_ids, using="default"):
+    """
+    Remove the given task ids from the SQLite full-text index.
+    """
+    if connections[using].vendor != "sqlite" or not task_ids:
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in task_ids]
+        )
@@ -1,7 +1,29 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from .models import Task
 
+DUPLICATE_TITLE_ERROR = "A task with this title already exists for the user."
+
+
+def is_duplicate_title(error):
+    """
+    Return whether the IntegrityError `error` is a violation of the
+    `task_unique_user_title` constraint, rather than e.g. of a foreign key or
+    NOT NULL constraint.
+    """
+    message = str(error)
+    # PostgreSQL and MySQL name the constraint; SQLite lists its columns.
+    table = Task._meta.db_table
+    columns = ", ".join(
+        f"{table}.{Task._meta.get_field(name).column}" for name in ("user", "title")
+    )
+    return (
+        "task_unique_user_title" in message
+        or f"UNIQUE constraint failed: {columns}" in message
+    )
+
 
 class TaskSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,29 +39,93 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["user", "created_at", "update_at"]
 
-    def validate_title(self, value):
+    def create(self, validated_data):
         """
-        Validate that the title is unique for the authenticated user.
+        Create the task, reporting a duplicate title as a validation error.
         """
         try:
-            request = self.context.get("request")
-            user = request.user if request else None
-
-            if user:
-                task_id = self.instance.id if self.instance else None
-                existing_task = (
-                    Task.objects.filter(user=user, title=value)
-                    .exclude(id=task_id)
-                    .first()
-                )
-
-                if existing_task:
-                    raise serializers.ValidationError(
-                        "A task with this title already exists for the user."
-                    )
-        except Exception as e:
-            raise serializers.ValidationError(
-                {"error": "An error occurred during validation.", "details": str(e)}
-            )
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as exc:
+            if not is_duplicate_title(exc):
+                raise
+            raise serializers.ValidationError({"title": [DUPLICATE_TITLE_ERROR]})
+
+    def update(self, instance, validated_data):
+        """
+        Update the task, reporting a duplicate title as a validation error.
+
+        Title uniqueness per user is enforced by the `task_unique_user_title`
+        constraint rather than a query before every write, so it also holds
+        under concurrent requests.
+        """
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as exc:
+            if not is_duplicate_title(exc):
+                raise
+            raise serializers.ValidationError({"title": [DUPLICATE_TITLE_ERROR]})
+
+
+class TaskRowSerializer:
+    """
+    Read-only fast path producing the same output as TaskSerializer(many=True).
+
+    Works on plain rows from `.values(*TaskRowSerializer.fields)` instead of
+    model instances and skips DRF's per-field machinery: each field is either
+    passed through or converted by one plain function picked up front from the
+    corresponding TaskSerializer field.
+    """
 
+    fields = TaskSerializer.Meta.fields
+    converters = None
+
+    def __init__(self):
+        # Binding TaskSerializer's fields is comparatively costly and the
+        # converters only depend on the class, so they are picked once.
+        if self.converters is None:
+            declared = TaskSerializer().fields
+            type(self).converters = [
+                (name, self.get_converter(declared[name])) for name in self.fields
+            ]
+
+    @classmethod
+    def get_converter(cls, field):
+        if isinstance(field, serializers.DateTimeField):
+            return cls.datetime_to_string
+        if isinstance(field, serializers.DateField):
+            return cls.date_to_string
+        return None
+
+    @staticmethod
+    def datetime_to_string(value):
+        # Same as serializers.DateTimeField.to_representation with the default
+        # ISO 8601 format: convert to the current time zone, "Z" for UTC.
+        if value is None:
+            return None
+        value = value.astimezone(timezone.get_current_timezone()).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
         return value
+
+    @staticmethod
+    def date_to_string(value):
+        return None if value is None else value.isoformat()
+
+    def to_representation(self, rows):
+        """
+        Return a list of plain dicts, keyed in TaskSerializer field order.
+        """
+        return list(self.iter_representation(rows))
+
+    def iter_representation(self, rows):
+        """
+        Lazily convert `rows`, e.g. a `.iterator()`, one dict at a time.
+        """
+        converters = self.converters
+        for row in rows:
+            yield {
+                name: row[name] if convert is None else convert(row[name])
+                for name, convert in converters
+            }
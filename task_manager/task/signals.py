@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from user.purge import rows_purged
+
+from . import cache, changes, search, stats
+from .models import Task
+
+# Sent by write paths that bypass Model.save() and Model.delete() (bulk
+# writes and the single-statement update/delete in task.queries), so anything
+# derived from tasks can stay in sync with them. Arguments: user_id, created,
+# updated and deleted (lists of Task), using, and optionally fields, the names
+# of the fields written on the updated tasks when known. Updated tasks whose
+# status was written carry the old one in `previous_status`.
+tasks_changed = Signal()
+
+
+def deleted_with_owner(origin):
+    """
+    Whether a post_delete comes from deleting the task's owner, whose
+    derived rows (counters, changes feed) are deleted along with the tasks.
+    `origin` is the instance or queryset whose delete() cascaded here.
+    """
+    User = get_user_model()
+    return isinstance(origin, User) or getattr(origin, "model", None) is User
+
+
+@receiver(post_save, sender=Task)
+def index_saved_task(sender, instance, using, update_fields=None, **kwargs):
+    """
+    Keep the full-text index in sync with created and updated tasks.
+    """
+    if search.affects_index(update_fields):
+        search.index_tasks([instance], using=using)
+
+
+@receiver(post_delete, sender=Task)
+def unindex_deleted_task(sender, instance, using, **kwargs):
+    """
+    Drop deleted tasks from the full-text index.
+    """
+    search.unindex_tasks([instance.pk], using=using)
+
+
+@receiver(tasks_changed, sender=Task)
+def index_changed_tasks(sender, created, updated, deleted, using, **kwargs):
+    """
+    Keep the full-text index in sync with bulk writes.
+    """
+    search.unindex_tasks([task.pk for task in deleted], using=using)
+    if not search.affects_index(kwargs.get("fields")):
+        updated = []
+    search.index_tasks(created + updated, using=using)
+
+
+@receiver(rows_purged, sender=Task)
+def unindex_purged_tasks(sender, ids, using, **kwargs):
+    """
+    Drop the tasks of deleted users, purged in batches, from the full-text index.
+    """
+    search.unindex_tasks(ids, using=using)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_list_cache(sender, instance, **kwargs):
+    """
+    Invalidate the owner's cached list pages on every task write.
+    """
+    cache.bump_generation(instance.user_id)
+
+
+@receiver(tasks_changed, sender=Task)
+def invalidate_changed_task_list_cache(sender, user_id, **kwargs):
+    """
+    Invalidate the owner's cached list pages after bulk and single-statement writes.
+    """
+    cache.bump_generation(user_id)
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, using, update_fields=None, **kwargs):
+    """
+    Keep the owner's status and per-day counters in sync with saved tasks.
+    """
+    stats.record_saved(instance, created, update_fields, using)
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, using, origin=None, **kwargs):
+    if not deleted_with_owner(origin):
+        stats.record_deleted(instance, using)
+
+
+@receiver(tasks_changed, sender=Task)
+def count_changed_tasks(sender, user_id, created, updated, deleted, using, **kwargs):
+    """
+    Keep the owner's counters in sync with bulk and single-statement writes.
+    """
+    stats.record_changes(
+        user_id, created, updated, deleted, kwargs.get("fields"), using
+    )
+
+
+@receiver(post_save, sender=Task)
+def sequence_saved_task(sender, instance, created, using, **kwargs):
+    """
+    Give created and updated tasks the next change sequence number of their
+    owner, for the changes feed and event streams.
+    """
+    if created:
+        changes.record(instance.user_id, [instance], [], [], using)
+    else:
+        changes.record(instance.user_id, [], [instance], [], using)
+
+
+@receiver(post_delete, sender=Task)
+def sequence_deleted_task(sender, instance, using, origin=None, **kwargs):
+    """
+    Leave a tombstone for deleted tasks, unless their owner is being deleted
+    along with the rest of their feed.
+    """
+    if not deleted_with_owner(origin):
+        changes.record(instance.user_id, [], [], [instance], using)
+
+
+@receiver(tasks_changed, sender=Task)
+def sequence_changed_tasks(sender, user_id, created, updated, deleted, using, **kwargs):
+    """
+    Keep the changes feed in sync with bulk and single-statement writes.
+    """
+    changes.record(user_id, created, updated, deleted, using)
@@ -0,0 +1,218 @@
+import datetime
+from collections import Counter
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Case, Count, F, Value, When
+
+from .models import Task, TaskArchive, TaskCounts, TaskDailyCount
+
+STATUSES = [value for value, _ in Task.STATUS_CHOICE]
+
+
+class CounterDelta:
+    """
+    Changes to one user's counters, accumulated over a write and applied
+    with apply().
+    """
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.created = Counter()
+        self.completed = Counter()
+
+    def add(self, task, sign=1):
+        """
+        Count `task` in (sign=1) or out of (sign=-1) the counters.
+        """
+        self.statuses[task.status] += sign
+        if task.created_at is not None:
+            self.created[task.created_at] += sign
+        if task.status == "completed" and task.completed_at is not None:
+            self.completed[task.completed_at] += sign
+
+    def transition(self, task):
+        """
+        Count the change of `task` from `previous_status` to `status`.
+        """
+        if task.previous_status is None or task.previous_status == task.status:
+            return
+        self.statuses[task.previous_status] -= 1
+        self.statuses[task.status] += 1
+        if task.completed_at is not None:
+            if task.status == "completed":
+                self.completed[task.completed_at] += 1
+            elif task.previous_status == "completed":
+                self.completed[task.completed_at] -= 1
+
+
+def status_change_expressions(status):
+    """
+    Extra assignments for a queryset.update() that sets `status` on tasks
+    that weren't loaded: `previous_status` and `completed_at` computed from
+    each row's old values, like Task.set_status().
+    """
+    expressions = {"previous_status": F("status")}
+    if status == "completed":
+        expressions["completed_at"] = Case(
+            When(status="completed", then=F("completed_at")),
+            default=Value(datetime.date.today()),
+        )
+    return expressions
+
+
+def increment(queryset, lookup, changes):
+    """
+    Add `changes` ({field: delta}) to the row matching `lookup` with a single
+    UPDATE ... SET field = field + delta, creating the row on first use.
+    """
+    changes = {field: delta for field, delta in changes.items() if delta}
+    if not changes:
+        return
+    expressions = {field: F(field) + delta for field, delta in changes.items()}
+    if queryset.filter(**lookup).update(**expressions):
+        return
+    try:
+        with transaction.atomic(using=queryset.db):
+            queryset.create(**lookup, **changes)
+    except IntegrityError:
+        # Created concurrently; the row exists now.
+        queryset.filter(**lookup).update(**expressions)
+
+
+def apply(user_id, delta, using=None):
+    """
+    Apply `delta` to the counters of `user_id`: one UPDATE of the user's
+    TaskCounts row and one per day whose counts changed.
+    """
+    using = using or router.db_for_write(TaskCounts)
+    increment(
+        TaskCounts.objects.using(using),
+        {"user_id": user_id},
+        {status: delta.statuses[status] for status in STATUSES},
+    )
+    for day in sorted(set(delta.created) | set(delta.completed)):
+        increment(
+            TaskDailyCount.objects.using(using),
+            {"user_id": user_id, "day": day},
+            {"created": delta.created[day], "completed": delta.completed[day]},
+        )
+
+
+def record_saved(task, created, update_fields, using):
+    delta = CounterDelta()
+    if created:
+        delta.add(task)
+    elif update_fields is None or "status" in update_fields:
+        delta.transition(task)
+    apply(task.user_id, delta, using)
+
+
+def record_deleted(task, using):
+    delta = CounterDelta()
+    delta.add(task, sign=-1)
+    apply(task.user_id, delta, using)
+
+
+def record_changes(user_id, created, updated, deleted, fields, using):
+    """
+    Count a batch announced through tasks_changed. Updated tasks only count
+    when `fields` says their status was written.
+    """
+    delta = CounterDelta()
+    for task in created:
+        delta.add(task)
+    for task in deleted:
+        delta.add(task, sign=-1)
+    if fields is not None and "status" in fields:
+        for task in updated:
+            delta.transition(task)
+    apply(user_id, delta, using)
+
+
+def get_stats(user_id, days):
+    """
+    Return the user's task counts by status and the number of tasks created
+    and completed on each of the last `days` days, read from the counters.
+    """
+    counts = TaskCounts.objects.filter(user_id=user_id).values(
+        *STATUSES
+    ).first() or dict.fromkeys(STATUSES, 0)
+    today = datetime.date.today()
+    first_day = today - datetime.timedelta(days=days - 1)
+    daily = {
+        row["day"]: row
+        for row in TaskDailyCount.objects.filter(
+            user_id=user_id, day__gte=first_day, day__lte=today
+        ).values("day", "created", "completed")
+    }
+    series = {"created": [], "completed": []}
+    for offset in range(days):
+        day = first_day + datetime.timedelta(days=offset)
+        row = daily.get(day, {})
+        for name, points in series.items():
+            points.append({"day": day.isoformat(), "count": row.get(name, 0)})
+    return {
+        "counts": {**counts, "total": sum(counts.values())},
+        "created_per_day": series["created"],
+        "completed_per_day": series["completed"],
+    }
+
+
+def rebuild(user_id, using=None):
+    """
+    Recompute the counters of `user_id` from the task and task archive tables.
+
+    Returns:
+        bool: Whether the stored counters were out of date.
+    """
+    using = using or router.db_for_write(TaskCounts)
+    tasks = Task.objects.using(using).filter(user_id=user_id)
+    archived = TaskArchive.objects.using(using).filter(user_id=user_id)
+    with transaction.atomic(using=using):
+        # Lock the user's counters so concurrent writes wait for the rebuild.
+        stored = (
+            TaskCounts.objects.using(using)
+            .select_for_update()
+            .filter(user_id=user_id)
+            .values(*STATUSES)
+            .first()
+        )
+        counts = dict.fromkeys(STATUSES, 0)
+        daily = {}
+        # Archived tasks (task.archive) are still part of the user's history.
+        for rows in (tasks, archived):
+            for status, count in rows.values_list("status").annotate(Count("id")):
+                counts[status] += count
+            for day, count in rows.values_list("created_at").annotate(Count("id")):
+                daily.setdefault(day, {"created": 0, "completed": 0})[
+                    "created"
+                ] += count
+            completed = rows.filter(status="completed", completed_at__isnull=False)
+            for day, count in completed.values_list("completed_at").annotate(
+                Count("id")
+            ):
+                daily.setdefault(day, {"created": 0, "completed": 0})[
+                    "completed"
+                ] += count
+
+        stored_daily = {
+            day: {"created": created, "completed": completed}
+            for day, created, completed in TaskDailyCount.objects.using(using)
+            .filter(user_id=user_id)
+            .values_list("day", "created", "completed")
+            if created or completed
+        }
+        if stored == counts and stored_daily == daily:
+            return False
+
+        TaskCounts.objects.using(using).update_or_create(
+            user_id=user_id, defaults=counts
+        )
+        TaskDailyCount.objects.using(using).filter(user_id=user_id).delete()
+        TaskDailyCount.objects.using(using).bulk_create(
+            [
+                TaskDailyCount(user_id=user_id, day=day, **values)
+                for day, values in daily.items()
+            ]
+        )
+        return True
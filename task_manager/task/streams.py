@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from rest_framework import exceptions
+
+from user.authentication import StatelessJWTAuthentication
+
+from . import events
+from .models import TaskSequence
+
+
+class EventStreamApplication:
+    """
+    ASGI application serving `path` as the authenticated user's task event
+    stream (Server-Sent Events), and passing every other request on to
+    `application`, Django's handler.
+
+    The stream is answered outside Django's handler on purpose: that runs
+    each request in its own thread-sensitive context, which gives the request
+    a thread (and a database connection) of its own for as long as it is
+    open, so 10k idle streams would hold 10k threads. Here the token is
+    checked with StatelessJWTAuthentication, the two lookups a stream needs
+    go through the async ORM's shared thread, and an idle stream is a
+    coroutine waiting on its Subscription.
+
+    Each `tasks` message carries a list of {"id": n, "type": "created" |
+    "updated" | "deleted", "task_id": id, "task": {...}} and has the last
+    event's id. Event ids are the changes feed's sequence numbers, always
+    increasing but not contiguous: updates coalesced into a later event of
+    the same task leave their ids out. Events are only lost when the stream
+    sends a `resync` message ({"since": n}, after which the stream ends),
+    on which the client catches up with GET /task/tasks/changes/?since=n;
+    the stream sends one itself when it notices a sequence number it never
+    got (see Subscription). Reconnects
+    send the last id as Last-Event-ID (or `?last_event_id=`) and get the
+    events missed meanwhile from the broker's replay buffer. Idle streams
+    get a comment every TASK_EVENTS["HEARTBEAT_SECONDS"], and a stream ends
+    when its access token expires.
+    """
+
+    def __init__(self, application, path="/task/tasks/events/"):
+        self.application = application
+        self.path = path
+        self.authenticator = StatelessJWTAuthentication()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.application(scope, receive, send)
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        try:
+            if scope["method"] != "GET":
+                raise exceptions.MethodNotAllowed(scope["method"])
+            validated_token = await self.authenticate(headers)
+            last_event_id = self.get_last_event_id(scope, headers)
+        except exceptions.APIException as exc:
+            return await self.send_error(send, exc)
+        await self.stream(receive, send, validated_token, last_event_id)
+
+    async def authenticate(self, headers):
+        """
+        Return the validated access token of the request.
+
+        Raises:
+            NotAuthenticated: If there is no bearer token.
+            AuthenticationFailed: If the token is invalid or expired, or its
+                user no longer exists or is inactive.
+        """
+        header = headers.get("authorization", "").encode("latin-1")
+        raw_token = self.authenticator.get_raw_token(header) if header else None
+        if raw_token is None:
+            raise exceptions.NotAuthenticated()
+        validated_token = self.authenticator.get_validated_token(raw_token)
+        await self.authenticator.aget_user(validated_token)
+        return validated_token
+
+    def get_last_event_id(self, scope, headers):
+        """
+        Return the id of the last event a reconnecting client received.
+
+        Raises:
+            ValidationError: If the last event id is not an integer.
+        """
+        last_event_id = headers.get("last-event-id")
+        if last_event_id is None:
+            query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            last_event_id = query.get("last_event_id", [None])[-1]
+        if last_event_id is None:
+            return None
+        try:
+            return int(last_event_id)
+        except ValueError:
+            raise exceptions.ValidationError({"last_event_id": ["Must be an integer."]})
+
+    async def send_error(self, send, exc):
+        # The response DRF's exception handler would give.
+        data = (
+            exc.detail
+            if isinstance(exc.detail, (list, dict))
+            else {"detail": exc.detail}
+        )
+        status_code = exc.status_code
+        headers = [(b"content-type", b"application/json")]
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            status_code = 401
+            realm = self.authenticator.authenticate_header(None)
+            headers.append((b"www-authenticate", realm.encode()))
+        await send(
+            {"type": "http.response.start", "status": status_code, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": json.dumps(data).encode()})
+
+    async def stream(self, receive, send, validated_token, last_event_id):
+        config = events.get_config()
+        broker = events.get_broker()
+        user_id = self.authenticator.get_user_id(validated_token)
+        subscription = events.Subscription(user_id, config["MAX_PENDING"])
+        replay = broker.subscribe(subscription, last_event_id)
+
+        async def listen_for_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            subscription.close()
+
+        listener = asyncio.create_task(listen_for_disconnect())
+        try:
+            current = (
+                await TaskSequence.objects.filter(user_id=user_id)
+                .values_list("last", flat=True)
+                .afirst()
+            ) or 0
+            if last_event_id is None:
+                last_event_id = current
+            elif replay == [] and current > last_event_id:
+                # Missed while no stream buffered this user's events. A change
+                # committed since subscribe() is pending instead, or is
+                # noticed as missing by the subscription.
+                if not any(e["id"] == last_event_id + 1 for e in subscription.pending):
+                    replay = None
+            subscription.last_id = replay[-1]["id"] if replay else last_event_id
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        # Stop nginx from buffering the stream.
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            async for body in self.messages(
+                subscription, replay, last_event_id, validated_token["exp"], config
+            ):
+                # Waits while the server's send buffer is full, so a slow
+                # client leaves its events pending until it overflows.
+                await send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            broker.unsubscribe(subscription)
+            listener.cancel()
+
+    async def messages(self, subscription, replay, last_event_id, expires, config):
+        if replay is None:
+            yield events.format_event({"since": last_event_id}, "resync")
+            return
+        for start in range(0, len(replay), config["MAX_BATCH"]):
+            batch = replay[start : start + config["MAX_BATCH"]]
+            last_event_id = batch[-1]["id"]
+            yield events.format_event(batch, "tasks", last_event_id)
+        while (remaining := expires - time.time()) > 0:
+            batch = await subscription.get(
+                min(config["HEARTBEAT_SECONDS"], remaining),
+                config["COALESCE_MS"] / 1000,
+                config["MAX_BATCH"],
+            )
+            if subscription.closed:
+                return
+            if subscription.overflowed or subscription.missed:
+                # Too slow to keep up, or an event never arrived; the changes
+                # feed has the rest.
+                yield events.format_event({"since": last_event_id}, "resync")
+                return
+            if batch:
+                last_event_id = batch[-1]["id"]
+                yield events.format_event(batch, "tasks", last_event_id)
+            else:
+                yield b": keep-alive\n\n"
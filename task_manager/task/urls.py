@@ -1,8 +1,23 @@
 from django.urls import path
 
-from .views import TaskCreateListView, TaskUpdateDeleteView
+from .views import (
+    TaskBulkView,
+    TaskChangesView,
+    TaskCreateListView,
+    TaskExportView,
+    TaskImportView,
+    TaskRestoreView,
+    TaskStatsView,
+    TaskUpdateDeleteView,
+)
 
 urlpatterns = [
     path("tasks/", TaskCreateListView.as_view(), name="task-list"),
+    path("tasks/export/", TaskExportView.as_view(), name="task-export"),
+    path("tasks/import/", TaskImportView.as_view(), name="task-import"),
+    path("tasks/bulk/", TaskBulkView.as_view(), name="task-bulk"),
+    path("tasks/stats/", TaskStatsView.as_view(), name="task-stats"),
+    path("tasks/changes/", TaskChangesView.as_view(), name="task-changes"),
     path("tasks/<int:pk>/", TaskUpdateDeleteView.as_view(), name="task-detail"),
+    path("tasks/<int:pk>/restore/", TaskRestoreView.as_view(), name="task-restore"),
 ]
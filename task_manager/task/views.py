@@ -1,11 +1,36 @@
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import Http404, StreamingHttpResponse
 from rest_framework import generics, status
 from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.utils.urls import replace_query_param
+
+from jobs.files import get_storage
+from jobs.queue import enqueue
+from jobs.views import accepted_response, prefers_async
+from user.authentication import StatelessJWTAuthentication
 
-from .models import Task
-from .serializers import TaskSerializer
+from . import archive, cache, changes, conditional, stats
+from .bulk import apply_bulk_operations
+from .filters import TaskFilterBackend, TaskSearchFilter, include_archived
+from .importer import TaskImporter, detect_format, read_rows
+from .models import Task, TaskArchive
+from .pagination import TaskCursorPagination
+from .queries import delete_task, update_task
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .serializers import (
+    DUPLICATE_TITLE_ERROR,
+    TaskRowSerializer,
+    TaskSerializer,
+    is_duplicate_title,
+)
 
 
 class TaskCreateListView(generics.ListCreateAPIView):
@@ -13,13 +38,25 @@ class TaskCreateListView(generics.ListCreateAPIView):
     User Task creation and listing view
 
     This view allows authenticated users to create new tasks and list their existing tasks.
+    The list is cursor paginated, newest first (see TaskCursorPagination), and can be
+    narrowed with `status`, `created_after`/`created_before`, `updated_after`/`updated_before`
+    and `search`, and sorted with `ordering`; `include_archived=true` lists archived tasks
+    too (see task.archive). Pages are read as plain rows and encoded
+    without going through TaskSerializer (see TaskRowSerializer), are cached per user until
+    one of the user's tasks changes (see task.cache), and carry an ETag and
+    Last-Modified so unchanged pages can be answered with 304 Not Modified.
     The user must be authenticated using JWT tokens to access these functionalities.
     """
 
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [StatelessJWTAuthentication]
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = TaskCursorPagination
+    filter_backends = [TaskFilterBackend, TaskSearchFilter, OrderingFilter]
+    ordering_fields = ["created_at", "updated_at", "title", "status", "id"]
+    ordering = ["-updated_at", "-id"]
 
     def get_queryset(self):
         """
@@ -32,12 +69,81 @@ class TaskCreateListView(generics.ListCreateAPIView):
             ValidationError: If unable to fetch tasks, raises an error with a custom message.
         """
         try:
-            return Task.objects.filter(user=self.request.user)
+            return Task.objects.filter(user_id=self.request.user.pk)
         except Exception:
             raise ValidationError(
                 {"error": "Unable to fetch tasks. Please try again later."}
             )
 
+    def list(self, request, *args, **kwargs):
+        """
+        List the user's tasks, serving unchanged pages from the cache or as a 304.
+
+        The ETag of a cached page is stored with it, so a conditional request
+        for a cached page is answered without touching the database.
+
+        Returns:
+            Response: The requested page, with `ETag`, `Last-Modified` and
+            `X-Cache: HIT` or `MISS` headers, or 304 Not Modified.
+        """
+        use_cache = cache.get_config()["ENABLED"]
+        key = cache.page_key(request.user.pk, request) if use_cache else None
+        entry = cache.get_page(key) if use_cache else None
+
+        if entry is not None:
+            etag, last_modified = entry["etag"], entry["last_modified"]
+        else:
+            etag, last_modified = conditional.list_validators(request.user.pk, request)
+
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        if entry is not None:
+            response = Response(entry["data"], headers={"X-Cache": "HIT"})
+        else:
+            response = self.list_rows(request)
+            if use_cache and response.status_code == status.HTTP_200_OK:
+                cache.set_page(
+                    key,
+                    {
+                        "data": response.data,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                    },
+                )
+            if use_cache:
+                response["X-Cache"] = "MISS"
+
+        if response.status_code == status.HTTP_200_OK:
+            conditional.set_validators(response, etag, last_modified)
+        return response
+
+    def list_rows(self, request):
+        """
+        Build the requested page from `.values()` rows with TaskRowSerializer.
+
+        With `include_archived`, the user's archived tasks are filtered the
+        same way and merged into the page (see paginate_querysets()).
+
+        Returns:
+            Response: The paginated page, identical to what TaskSerializer renders.
+        """
+        row_serializer = TaskRowSerializer()
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *row_serializer.fields
+        )
+        if include_archived(request):
+            archived = self.filter_queryset(
+                TaskArchive.objects.filter(user_id=request.user.pk)
+            ).values(*row_serializer.fields)
+            page = self.paginator.paginate_querysets(
+                [queryset, archived], request, view=self
+            )
+        else:
+            page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(row_serializer.to_representation(page))
+
     def perform_create(self, serializer):
         """
         Save the task instance with the authenticated user as the owner.
@@ -49,7 +155,7 @@ class TaskCreateListView(generics.ListCreateAPIView):
             ValidationError: If the provided data is invalid or task creation fails, raises an error with a custom message.
         """
         try:
-            serializer.save(user=self.request.user)
+            serializer.save(user_id=self.request.user.pk)
         except ValidationError as e:
             raise ValidationError(
                 {"error": "Invalid data provided.", "details": str(e)}
@@ -65,14 +171,24 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     User Task Update and Deletion view
 
     This view allows authenticated users to update or delete their tasks.
+    Ownership is part of every query, and updates and deletes run as a single
+    conditional UPDATE/DELETE without loading the task first. Responses carry an
+    ETag; GET honours If-None-Match/If-Modified-Since and PUT, PATCH and DELETE
+    honour If-Match.
     The user must be authenticated using JWT tokens to access these functionalities.
     """
 
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [StatelessJWTAuthentication]
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
 
+    def get_queryset(self):
+        """
+        Restrict lookups to tasks owned by the authenticated user.
+        """
+        return Task.objects.filter(user_id=self.request.user.pk)
+
     def get_object(self):
         """
         Retrieve the task object, ensuring it belongs to the authenticated user.
@@ -85,11 +201,8 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
             ValidationError: For general error handling during retrieval.
         """
         try:
-            obj = super().get_object()
-            if obj.user != self.request.user:
-                raise NotFound("Task not found")
-            return obj
-        except Task.DoesNotExist:
+            return super().get_object()
+        except Http404:
             raise NotFound({"error": "The requested task does not exist"})
         except Exception as e:
             raise ValidationError(
@@ -99,10 +212,25 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
                 }
             )
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the task, or 304 Not Modified if the client's copy is current.
+        """
+        task = self.get_object()
+        etag, last_modified = conditional.task_validators(task)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(task).data)
+            conditional.set_validators(response, etag, last_modified)
+        return response
+
     def update(self, request, *args, **kwargs):
         """
         Update the task instance with new data.
 
+        The validated fields are written with one UPDATE scoped to the user,
+        so e.g. a PATCH of just `status` is a single statement.
+
         Args:
             request (Request): The HTTP request containing the updated task data.
 
@@ -114,7 +242,16 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
             Exception: If any unexpected error occurs during the update.
         """
         try:
-            return super().update(request, *args, **kwargs)
+            partial = kwargs.pop("partial", False)
+            serializer = self.get_serializer(data=request.data, partial=partial)
+            serializer.is_valid(raise_exception=True)
+            expected = conditional.parse_if_match(request, self.kwargs["pk"])
+            task = self.perform_scoped_update(serializer.validated_data, expected)
+            if task is None:
+                return self.missing_task_response(expected)
+            response = Response(self.get_serializer(task).data)
+            conditional.set_validators(response, *conditional.task_validators(task))
+            return response
         except ValidationError as e:
             return Response(
                 {"error": "Validation error occurred.", "details": e.detail},
@@ -129,27 +266,59 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def perform_scoped_update(self, changes, expected_updated_at=None):
+        """
+        Write `changes` to the user's task, mapping title conflicts to a ValidationError.
+        """
+        pk, user_id = self.kwargs["pk"], self.request.user.pk
+        try:
+            # update_task() runs in its own transaction, rolled back on conflict.
+            return update_task(pk, user_id, changes, expected_updated_at)
+        except IntegrityError as exc:
+            if not is_duplicate_title(exc):
+                raise
+            raise ValidationError({"title": [DUPLICATE_TITLE_ERROR]})
+
+    def missing_task_response(self, expected_updated_at):
+        """
+        Explain why a conditional write matched no row: 412 if the task exists
+        but failed the If-Match precondition, 404 otherwise.
+        """
+        if (
+            expected_updated_at is not None
+            and self.get_queryset().filter(pk=self.kwargs["pk"]).exists()
+        ):
+            return Response(
+                {"error": "The task has been modified since it was retrieved."},
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            )
+        return Response(
+            {"error": "The requested task does not exist"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
     def destroy(self, request, *args, **kwargs):
         """
-        Delete the specified task.
+        Delete the specified task with a single DELETE scoped to the user.
 
         Returns:
             Response: Success message if the task is deleted successfully, or an error message with status code.
 
         Raises:
-            Task.DoesNotExist: If the task does not exist.
             Exception: If any unexpected error occurs during deletion.
         """
         try:
-            task = self.get_object()
-            task.delete()
+            expected = conditional.parse_if_match(request, self.kwargs["pk"])
+            if delete_task(self.kwargs["pk"], request.user.pk, expected) is None:
+                if expected is not None:
+                    return self.missing_task_response(expected)
+                return Response(
+                    {"error": "The task does not exist."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
             return Response(
                 {"message": "Task deleted successfully."}, status=status.HTTP_200_OK
             )
-        except Task.DoesNotExist:
-            return Response(
-                {"error": "The task does not exist."}, status=status.HTTP_404_NOT_FOUND
-            )
         except Exception as e:
             return Response(
                 {
@@ -158,3 +327,357 @@ class TaskUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class TaskBulkView(generics.GenericAPIView):
+    """
+    Bulk task creation, update and deletion view
+
+    This view applies arrays of create, update and delete operations for the
+    authenticated user in a single transaction and reports a result per item.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+
+    def post(self, request, *args, **kwargs):
+        """
+        Apply a batch of task operations.
+
+        Args:
+            request (Request): The HTTP request with a body of the form
+                {"create": [{...}], "update": [{"id": 1, ...}], "delete": [2, 3]}.
+
+        Returns:
+            Response: Per-item results, e.g. {"create": [{"status": 201, "id": 7}], ...}.
+
+        Raises:
+            ValidationError: If the payload is malformed or exceeds the size limit.
+        """
+        results = apply_bulk_operations(request.user, request.data)
+        return Response(results, status=status.HTTP_200_OK)
+
+
+class TaskExportView(generics.GenericAPIView):
+    """
+    User Task export view
+
+    This view streams all of the authenticated user's tasks as NDJSON
+    (`?format=ndjson` or `Accept: application/x-ndjson`, the default) or CSV
+    (`?format=csv` or `Accept: text/csv`). It accepts the same filters and
+    `ordering` as the task list. Rows are read with a chunked database cursor
+    and encoded as they are sent, so memory use does not grow with the number
+    of tasks.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    filter_backends = [TaskFilterBackend, TaskSearchFilter, OrderingFilter]
+    ordering_fields = ["created_at", "updated_at", "title", "status", "id"]
+    ordering = ["id"]
+
+    def get_queryset(self):
+        """
+        Restrict the export to tasks owned by the authenticated user.
+        """
+        return Task.objects.filter(user_id=self.request.user.pk)
+
+    def get_rows(self):
+        """
+        Return the filtered rows to export, read with a chunked cursor, and
+        the chunk size.
+
+        Raises:
+            ValidationError: If a filter parameter is invalid.
+        """
+        chunk_size = getattr(settings, "TASK_EXPORT", {}).get("CHUNK_SIZE", 2000)
+        row_serializer = TaskRowSerializer()
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values(*row_serializer.fields)
+            .iterator(chunk_size=chunk_size)
+        )
+        return row_serializer.iter_representation(rows), chunk_size
+
+    def get(self, request, *args, **kwargs):
+        """
+        Stream the user's tasks in the negotiated format.
+
+        Args:
+            request (Request): The HTTP request. With `Prefer: respond-async`
+                the export is written to a file by a background job instead.
+
+        Returns:
+            StreamingHttpResponse: The export as an attachment, `tasks.ndjson`
+            or `tasks.csv`; or a 202 response with the job, whose result is
+            the file, for an asynchronous export.
+
+        Raises:
+            ValidationError: If a filter parameter is invalid.
+        """
+        rows, chunk_size = self.get_rows()
+        renderer = request.accepted_renderer
+        if prefers_async(request):
+            job = enqueue(
+                "task.export",
+                {"format": renderer.format, "query": request.query_params.dict()},
+                user_id=request.user.pk,
+            )
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+            return accepted_response(request, job)
+        response = StreamingHttpResponse(
+            renderer.stream(rows, chunk_size),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+
+    def handle_exception(self, exc):
+        # Errors are reported as JSON whatever export format was requested.
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
+
+class TaskImportView(generics.GenericAPIView):
+    """
+    User Task import view
+
+    This view imports tasks for the authenticated user from an NDJSON or CSV
+    upload, e.g. a file produced by the export view. The file is parsed row by
+    row and written in batches (see TaskImporter); rows that fail validation or
+    reuse a title are rejected and reported, the rest are imported.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Import the uploaded tasks.
+
+        Args:
+            request (Request): A multipart request with the `file` to import and
+                optionally `format` (`ndjson` or `csv`, otherwise taken from the
+                file extension), `batch_size` and `resume_from`, the checkpoint
+                of an earlier, interrupted import of the same file. With
+                `Prefer: respond-async` the file is imported by a background
+                job instead.
+
+        Returns:
+            Response: The import report: rows read, imported and rejected, the
+            checkpoint, rows per second and the first rejected rows with
+            errors; or a 202 response with the job, whose result is the
+            report, for an asynchronous import.
+
+        Raises:
+            ValidationError: If the file is missing, or a parameter is invalid.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["No file was submitted."]})
+        format = detect_format(upload.name, request.data.get("format"))
+        try:
+            batch_size = int(request.data.get("batch_size") or 0)
+            resume_from = int(request.data.get("resume_from") or 0)
+        except ValueError:
+            raise ValidationError(
+                {"error": "batch_size and resume_from must be integers."}
+            )
+        if batch_size < 0 or resume_from < 0:
+            raise ValidationError(
+                {"error": "batch_size and resume_from must not be negative."}
+            )
+
+        if prefers_async(request):
+            name = get_storage().save(f"imports/{uuid.uuid4().hex}.{format}", upload)
+            job = enqueue(
+                "task.import",
+                {
+                    "file": name,
+                    "format": format,
+                    "batch_size": batch_size,
+                    "resume_from": resume_from,
+                },
+                user_id=request.user.pk,
+            )
+            return accepted_response(request, job)
+
+        importer = TaskImporter(
+            request.user, batch_size=batch_size, resume_from=resume_from
+        )
+        report = importer.run(read_rows(upload.file, format))
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class TaskStatsView(generics.GenericAPIView):
+    """
+    User Task statistics view
+
+    This view returns the authenticated user's task counts by status and the
+    number of tasks created and completed per day. They are read from
+    counters kept up to date on every write (see task.stats), so the cost does
+    not grow with the number of tasks.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the task statistics.
+
+        Args:
+            request (Request): The HTTP request, optionally with `days`, the
+                length of the per-day series ending today (default and maximum
+                from TASK_STATS).
+
+        Returns:
+            Response: {"counts": {"pending": n, "in_progress": n,
+            "completed": n, "total": n}, "created_per_day": [{"day": ...,
+            "count": n}, ...], "completed_per_day": [...]}; completed counts
+            only tasks that are still completed.
+
+        Raises:
+            ValidationError: If `days` is not an integer in range.
+        """
+        config = getattr(settings, "TASK_STATS", {})
+        max_days = config.get("MAX_DAYS", 365)
+        try:
+            days = int(request.query_params.get("days", config.get("DAYS", 30)))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= max_days:
+            raise ValidationError(
+                {"days": [f"Must be an integer between 1 and {max_days}."]}
+            )
+        return Response(stats.get_stats(request.user.pk, days))
+
+
+class TaskChangesView(generics.GenericAPIView):
+    """
+    User Task changes feed view
+
+    This view returns the authenticated user's tasks changed since a sequence
+    number, so a client can keep a local copy in sync without fetching every
+    task again. Each write gives the tasks it touches the next number of the
+    user's sequence, and deletions leave tombstones (see task.changes); a page
+    is an index seek on (user, seq).
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the changes after `since`, oldest first.
+
+        Args:
+            request (Request): The HTTP request, with `since`, the `cursor` of
+                the previous response (0, the default, for everything), and
+                optionally `limit` (default and maximum from TASK_CHANGES).
+
+        Returns:
+            Response: {"changes": [{"seq": n, "id": task id, "deleted": false,
+            "task": {...}} or {"seq": n, "id": task id, "deleted": true}, ...],
+            "cursor": the `since` to send next, "next": the URL of the
+            following page, or None once the client is up to date}.
+
+        Raises:
+            ValidationError: If `since` or `limit` is not an integer in range.
+            ChangesCompacted: With 410 Gone, if tombstones after `since` have
+                been compacted; the client has to sync again from since=0.
+        """
+        config = changes.get_changes_settings()
+        errors = {}
+        try:
+            since = int(request.query_params.get("since", 0))
+        except ValueError:
+            since = -1
+        if since < 0:
+            errors["since"] = ["Must be a non-negative integer."]
+        try:
+            limit = int(request.query_params.get("limit", config["PAGE_SIZE"]))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= config["MAX_PAGE_SIZE"]:
+            errors["limit"] = [
+                f"Must be an integer between 1 and {config['MAX_PAGE_SIZE']}."
+            ]
+        if errors:
+            raise ValidationError(errors)
+
+        page, has_more = changes.get_changes(request.user.pk, since, limit)
+        items = []
+        for change, task in page:
+            item = {"seq": change.seq, "id": change.task_id, "deleted": task is None}
+            if task is not None:
+                item["task"] = TaskSerializer(task).data
+            items.append(item)
+        cursor = page[-1][0].seq if page else since
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "since", cursor
+            )
+        return Response({"changes": items, "cursor": cursor, "next": next_url})
+
+
+class TaskRestoreView(generics.GenericAPIView):
+    """
+    User Task restore view
+
+    This view moves one of the authenticated user's archived tasks (see
+    task.archive) back into their task list, unchanged.
+    The user must be authenticated using JWT tokens to access these functionalities.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [StatelessJWTAuthentication]
+    serializer_class = TaskSerializer
+
+    def post(self, request, *args, **kwargs):
+        """
+        Restore the archived task.
+
+        Args:
+            request (Request): The HTTP request.
+            pk (int): The id of the task.
+
+        Returns:
+            Response: The restored task. A task that isn't archived (e.g. a
+            retried request) is returned as it is.
+
+        Raises:
+            NotFound: If the user has no such task, archived or not.
+            ValidationError: If another task of the user has taken its title.
+        """
+        pk = kwargs["pk"]
+        try:
+            restored, conflicts = archive.restore(request.user.pk, [pk])
+        except IntegrityError as exc:
+            if not is_duplicate_title(exc):
+                raise
+            # A task with the title was created concurrently.
+            conflicts = [pk]
+        if conflicts:
+            raise ValidationError({"title": [DUPLICATE_TITLE_ERROR]})
+        task = Task.objects.filter(user_id=request.user.pk, pk=pk).first()
+        if task is None:
+            raise NotFound({"error": "The requested task does not exist"})
+        return Response(TaskSerializer(task).data)
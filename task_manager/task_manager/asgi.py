@@ -2,6 +2,10 @@
 ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests served through it are routed with ``settings.ASGI_URLCONF`` when it
+is set, which can map the task and user endpoints to their async views,
+except for the task event stream, which task.streams.EventStreamApplication
+answers in front of Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -12,5 +16,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+# No persistent connections under ASGI (see conn_max_age in settings).
+os.environ.setdefault("DATABASE_CONN_MAX_AGE", "0")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from task.streams import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
@@ -0,0 +1,17 @@
+"""
+URL configuration used for requests served under ASGI.
+
+The async views listed first take over their URLs from the synchronous views;
+every other URL falls through to task_manager.urls unchanged. Selected per
+request by task_manager.middleware.asgi_urlconf_middleware.
+"""
+
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path("user/", include("user.asgi_urls")),
+    path("task/", include("task.asgi_urls")),
+    *wsgi_urlpatterns,
+]
@@ -0,0 +1,82 @@
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from task.renderers import FastJSONRenderer
+from user.authentication import StatelessJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView, for the views served under ASGI.
+
+    DRF views are synchronous, so under ASGI each request would hold a worker
+    thread for its whole duration. Subclasses implement `async def get()`,
+    `post()`, ... and use the async ORM; this class provides the parts of
+    APIView they rely on, with the same behaviour and response bodies as the
+    synchronous views:
+
+    - the request is wrapped in a DRF Request, for `data` and `query_params`,
+    - the user is authenticated with StatelessJWTAuthentication.aauthenticate,
+      and unauthenticated requests are rejected unless `authentication_required`
+      is False,
+    - APIExceptions go through DRF's exception handler,
+    - DRF Responses are rendered as JSON with FastJSONRenderer.
+    """
+
+    authentication_required = True
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Authentication is by bearer token, not session cookie.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.authenticator = StatelessJWTAuthentication()
+        self.request = Request(
+            request, parsers=[parser() for parser in self.parser_classes]
+        )
+        try:
+            await self.initial(self.request)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or not handler:
+                raise exceptions.MethodNotAllowed(request.method)
+            response = await handler(self.request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(response)
+
+    async def initial(self, request):
+        """
+        Authenticate the request and enforce `authentication_required`.
+
+        Raises:
+            NotAuthenticated: If no credentials were provided but are required.
+            AuthenticationFailed: If the credentials are invalid.
+        """
+        user_auth_tuple = await self.authenticator.aauthenticate(request._request)
+        if user_auth_tuple is not None:
+            request.user, request.auth = user_auth_tuple
+        elif self.authentication_required:
+            raise exceptions.NotAuthenticated()
+
+    def handle_exception(self, exc):
+        if isinstance(
+            exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            exc.auth_header = self.authenticator.authenticate_header(self.request)
+        return exception_handler(exc, {"view": self, "request": self.request})
+
+    def finalize_response(self, response):
+        if isinstance(response, Response) and not response.is_rendered:
+            response.accepted_renderer = FastJSONRenderer()
+            response.accepted_media_type = FastJSONRenderer.media_type
+            response.renderer_context = {"view": self, "request": self.request}
+            response.render()
+        return response
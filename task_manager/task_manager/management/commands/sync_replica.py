@@ -0,0 +1,59 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from task_manager import routers
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database over its replicas (the SQLITE_REPLICA "
+        "harness), once or every --interval seconds to emulate replication lag."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            action="append",
+            help="Replica alias to refresh; repeatable. Defaults to every replica.",
+        )
+        parser.add_argument(
+            "--interval", type=float, help="Keep copying, every INTERVAL seconds."
+        )
+
+    def handle(self, *args, **options):
+        aliases = options["database"] or routers.get_config()["REPLICAS"]
+        if not aliases:
+            raise CommandError("No replica databases are configured.")
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(
+                    f"{alias!r} isn't SQLite; its replication is the server's job."
+                )
+
+        while True:
+            for alias in aliases:
+                start = time.perf_counter()
+                self.copy(primary.settings_dict["NAME"], connections[alias])
+                self.stdout.write(
+                    f"Copied the primary to {alias!r} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms."
+                )
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def copy(self, source_name, replica):
+        # SQLite's online backup copies a consistent snapshot of the primary
+        # while it keeps serving writes; readers of the replica wait on its
+        # busy timeout while the copy is written.
+        source = sqlite3.connect(source_name)
+        target = sqlite3.connect(replica.settings_dict["NAME"], timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,240 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+# Upper bounds of the histogram buckets, in seconds and in queries.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def get_config():
+    config = {"ENABLED": True, "SERVER_TIMING": False, "SLOW_QUERY_MS": 200}
+    config.update(getattr(settings, "REQUEST_METRICS", {}))
+    return config
+
+
+class Histogram:
+    """
+    Counts of observed values per label set, in buckets bounded by `buckets`.
+
+    Not thread-safe on its own; RequestMetrics updates it under its lock.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self, name):
+        """
+        Yield the Prometheus sample lines of the histogram: the cumulative
+        buckets, sum and count of every label set.
+        """
+        bounds = [format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield sample(f"{name}_bucket", (*labels, ("le", bound)), cumulative)
+            yield sample(f"{name}_sum", labels, total)
+            yield sample(f"{name}_count", labels, cumulative)
+
+
+class RequestMetrics:
+    """
+    Per-view request counters and histograms of this process, recorded by
+    task_manager.middleware.metrics_middleware.
+
+    Each server process keeps its own; Prometheus sums them across the
+    scraped processes.
+    """
+
+    def __init__(self, duration_buckets=DURATION_BUCKETS, query_buckets=QUERY_BUCKETS):
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.slow_queries = Counter()
+        self.duration = Histogram(duration_buckets)
+        self.db_duration = Histogram(duration_buckets)
+        self.queries = Histogram(query_buckets)
+
+    def observe(self, view, method, status, duration, db_duration, queries, slow=0):
+        labels = (("view", view), ("method", method))
+        with self._lock:
+            self.requests[(*labels, ("status", str(status)))] += 1
+            self.duration.observe(labels, duration)
+            self.db_duration.observe(labels, db_duration)
+            self.queries.observe(labels, queries)
+            if slow:
+                self.slow_queries[labels] += slow
+
+    def render(self):
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = [
+                *family(
+                    "http_requests_total",
+                    "counter",
+                    "Requests handled, by view, method and status.",
+                    (
+                        sample("http_requests_total", labels, count)
+                        for labels, count in sorted(self.requests.items())
+                    ),
+                ),
+                *family(
+                    "http_request_duration_seconds",
+                    "histogram",
+                    "Time from the first middleware to the response.",
+                    self.duration.samples("http_request_duration_seconds"),
+                ),
+                *family(
+                    "http_request_db_duration_seconds",
+                    "histogram",
+                    "Time spent executing SQL queries per request.",
+                    self.db_duration.samples("http_request_db_duration_seconds"),
+                ),
+                *family(
+                    "http_request_queries",
+                    "histogram",
+                    "SQL queries executed per request.",
+                    self.queries.samples("http_request_queries"),
+                ),
+                *family(
+                    "db_slow_queries_total",
+                    "counter",
+                    "Queries slower than REQUEST_METRICS['SLOW_QUERY_MS'].",
+                    (
+                        sample("db_slow_queries_total", labels, count)
+                        for labels, count in sorted(self.slow_queries.items())
+                    ),
+                ),
+            ]
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self.requests.clear()
+            self.slow_queries.clear()
+            self.duration.series.clear()
+            self.db_duration.series.clear()
+            self.queries.series.clear()
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def sample(name, labels, value):
+    if labels:
+        name += (
+            "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+        )
+    return f"{name} {format_value(value)}"
+
+
+def family(name, kind, documentation, samples):
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+    yield from samples
+
+
+def process_samples():
+    """
+    Yield the metric families of the process-wide caches and pools that keep
+    their own counters.
+    """
+    from task import cache
+    from task.events import get_broker
+    from user.hashing import get_hashing_pool
+    from user.revocation import revocation_store
+
+    list_cache = cache.stats()
+    for name in ("hits", "misses"):
+        yield from family(
+            f"task_list_cache_{name}_total",
+            "counter",
+            f"Task list page cache {name}.",
+            [sample(f"task_list_cache_{name}_total", (), list_cache[name])],
+        )
+
+    pool = get_hashing_pool().stats()
+    for name in ("submitted", "rejected", "completed", "failed"):
+        yield from family(
+            f"password_hashing_{name}_total",
+            "counter",
+            f"Password hashing jobs {name}.",
+            [sample(f"password_hashing_{name}_total", (), pool[name])],
+        )
+    for name, documentation in (
+        ("wait_seconds", "Time hashing jobs spent queued."),
+        ("run_seconds", "Time hashing jobs spent running."),
+    ):
+        yield from family(
+            f"password_hashing_{name}_total",
+            "counter",
+            documentation,
+            [sample(f"password_hashing_{name}_total", (), pool[name])],
+        )
+    yield from family(
+        "password_hashing_in_flight",
+        "gauge",
+        "Password hashing jobs running or queued.",
+        [sample("password_hashing_in_flight", (), pool["in_flight"])],
+    )
+
+    revocation = revocation_store.stats()
+    yield from family(
+        "token_revocation_filter_ids",
+        "gauge",
+        "Revoked token ids in the Bloom filter.",
+        [sample("token_revocation_filter_ids", (), revocation["filter_ids"])],
+    )
+    yield from family(
+        "token_revocation_lookups_total",
+        "counter",
+        "Revocation checks that queried the database.",
+        [sample("token_revocation_lookups_total", (), revocation["lookups"])],
+    )
+
+    yield from family(
+        "task_event_streams",
+        "gauge",
+        "Open task event streams.",
+        [sample("task_event_streams", (), get_broker().stats()["subscriptions"])],
+    )
+
+
+registry = RequestMetrics()
+
+
+def metrics_view(request):
+    """
+    Serve the metrics of this process to Prometheus.
+
+    Args:
+        request (HttpRequest): The scrape request.
+
+    Returns:
+        HttpResponse: The metrics in the text exposition format.
+
+    Raises:
+        Http404: If REQUEST_METRICS is disabled.
+    """
+    if not get_config()["ENABLED"]:
+        raise Http404
+    body = registry.render() + "\n".join(process_samples()) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
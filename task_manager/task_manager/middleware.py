@@ -0,0 +1,285 @@
+import binascii
+import json
+import logging
+import math
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+from jwt.utils import base64url_decode
+from rest_framework_simplejwt.settings import api_settings
+
+from . import metrics, routers
+
+slow_query_logger = logging.getLogger("task_manager.slow_queries")
+logger = logging.getLogger(__name__)
+
+# QueryTimer of the request being handled. A context variable rather than a
+# per-request execute_wrapper because async views run their queries through
+# sync_to_async, on a thread (and so a connection) other than the
+# middleware's; the context is copied to that thread.
+current_query_timer = ContextVar("current_query_timer", default=None)
+
+
+@sync_and_async_middleware
+def asgi_urlconf_middleware(get_response):
+    """
+    Route requests served under ASGI through settings.ASGI_URLCONF.
+
+    That URLconf maps the task and user endpoints to their async views, so
+    the same URLs are handled without a worker thread per request under ASGI,
+    and by the synchronous DRF views under WSGI.
+    """
+    urlconf = getattr(settings, "ASGI_URLCONF", None)
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if urlconf and isinstance(request, ASGIRequest):
+                request.urlconf = urlconf
+            return await get_response(request)
+
+    else:
+
+        def middleware(request):
+            if urlconf and isinstance(request, ASGIRequest):
+                request.urlconf = urlconf
+            return get_response(request)
+
+    return middleware
+
+
+class QueryTimer:
+    """
+    Counts and times the queries of one request, keeping those slower than
+    `slow_threshold` seconds.
+    """
+
+    __slots__ = ("count", "duration", "slow_threshold", "slow")
+
+    def __init__(self, slow_threshold):
+        self.count = 0
+        self.duration = 0.0
+        self.slow_threshold = slow_threshold
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+                self.slow.append((elapsed, sql))
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Record the query count, database time and total time of every request in
+    task_manager.metrics.registry, served at /metrics.
+
+    Put it first in MIDDLEWARE so the total includes the other middleware.
+    Configured by settings.REQUEST_METRICS: ENABLED turns it on, SERVER_TIMING
+    adds a Server-Timing header with the same numbers to each response, and
+    queries taking SLOW_QUERY_MS or longer are logged to
+    "task_manager.slow_queries". Streaming responses are measured up to the
+    start of the stream.
+    """
+    config = metrics.get_config()
+    if not config["ENABLED"]:
+        raise MiddlewareNotUsed
+    server_timing = config["SERVER_TIMING"]
+    slow_threshold = (
+        config["SLOW_QUERY_MS"] / 1000 if config["SLOW_QUERY_MS"] is not None else None
+    )
+    # Connections opened from now on get the wrapper when they connect; those
+    # of this thread may be open already.
+    connection_created.connect(install_query_timer)
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(connection)
+
+    def finish(request, response, timer, started):
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = (match.view_name or match.route) if match else "unmatched"
+        for elapsed, sql in timer.slow:
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) in %s %s: %s",
+                elapsed * 1000,
+                request.method,
+                view,
+                sql,
+            )
+        metrics.registry.observe(
+            view,
+            request.method,
+            response.status_code,
+            duration,
+            timer.duration,
+            timer.count,
+            len(timer.slow),
+        )
+        if server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries", '
+                f"app;dur={(duration - timer.duration) * 1000:.2f}, "
+                f"total;dur={duration * 1000:.2f}"
+            )
+        return response
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            started = time.perf_counter()
+            timer = QueryTimer(slow_threshold)
+            token = current_query_timer.set(timer)
+            try:
+                response = await get_response(request)
+            finally:
+                current_query_timer.reset(token)
+            return finish(request, response, timer, started)
+
+    else:
+
+        def middleware(request):
+            started = time.perf_counter()
+            timer = QueryTimer(slow_threshold)
+            token = current_query_timer.set(timer)
+            try:
+                response = get_response(request)
+            finally:
+                current_query_timer.reset(token)
+            return finish(request, response, timer, started)
+
+    return middleware
+
+
+def token_user_id(request):
+    """
+    Return the user id claim of the request's bearer token, without
+    verifying the token: it only decides where the request reads from.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme != "Bearer" or token.count(".") != 2:
+        return None
+    try:
+        payload = json.loads(base64url_decode(token.split(".")[1]))
+    except (binascii.Error, ValueError):
+        return None
+    return (
+        payload.get(api_settings.USER_ID_CLAIM) if isinstance(payload, dict) else None
+    )
+
+
+def primary_marker_key(user_id):
+    return f"replica-routing:primary:{user_id}"
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Let task_manager.routers.PrimaryReplicaRouter send the request's reads
+    to a replica, unless its user wrote within the last
+    REPLICA_ROUTING["STICKY_SECONDS"] (read-your-writes).
+
+    After a request that wrote, the user is kept on the primary for that
+    window in two ways: a cookie holding the time the window ends, for
+    browsers, and an entry in the REPLICA_ROUTING["CACHE_ALIAS"] cache keyed
+    by the user id claim of the bearer token, for API clients that don't
+    keep cookies. That cache has to be shared by every server process, or a
+    client's next request may land on a process that doesn't know it wrote.
+    Only used when REPLICA_ROUTING["REPLICAS"] lists replica aliases.
+    """
+    config = routers.get_config()
+    if not config["REPLICAS"]:
+        raise MiddlewareNotUsed
+    cache = caches[config["CACHE_ALIAS"]]
+    if isinstance(cache, LocMemCache):
+        logger.warning(
+            'REPLICA_ROUTING["CACHE_ALIAS"] is a per-process cache; with '
+            "several server processes, API clients may not read their own "
+            "writes."
+        )
+    sticky_seconds = config["STICKY_SECONDS"]
+    cookie_name = config["COOKIE_NAME"]
+
+    def cookie_pinned(request):
+        try:
+            return float(request.COOKIES.get(cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def remember_write(response):
+        response.set_cookie(
+            cookie_name,
+            f"{time.time() + sticky_seconds:.3f}",
+            max_age=math.ceil(sticky_seconds),
+            httponly=True,
+            samesite="Lax",
+        )
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            user_id = token_user_id(request)
+            pinned = cookie_pinned(request) or (
+                user_id is not None
+                and bool(await cache.aget(primary_marker_key(user_id)))
+            )
+            state = routers.RoutingState(primary=pinned)
+            token = routers.current_routing.set(state)
+            try:
+                response = await get_response(request)
+            finally:
+                routers.current_routing.reset(token)
+            if state.wrote:
+                remember_write(response)
+                if user_id is not None:
+                    await cache.aset(
+                        primary_marker_key(user_id), True, timeout=sticky_seconds
+                    )
+            return response
+
+    else:
+
+        def middleware(request):
+            user_id = token_user_id(request)
+            pinned = cookie_pinned(request) or (
+                user_id is not None and bool(cache.get(primary_marker_key(user_id)))
+            )
+            state = routers.RoutingState(primary=pinned)
+            token = routers.current_routing.set(state)
+            try:
+                response = get_response(request)
+            finally:
+                routers.current_routing.reset(token)
+            if state.wrote:
+                remember_write(response)
+                if user_id is not None:
+                    cache.set(primary_marker_key(user_id), True, timeout=sticky_seconds)
+            return response
+
+    return middleware
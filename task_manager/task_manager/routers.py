@@ -0,0 +1,76 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# RoutingState of the request being handled, set by
+# task_manager.middleware.replica_routing_middleware. Like the query timer, a
+# context variable so that async views' ORM calls see it on their thread.
+current_routing = ContextVar("current_routing", default=None)
+
+
+def get_config():
+    config = {
+        "REPLICAS": [],
+        "MODELS": ["task.Task", "user.CustomUser"],
+        "STICKY_SECONDS": 5,
+        "COOKIE_NAME": "primary_until",
+        "CACHE_ALIAS": "default",
+    }
+    config.update(getattr(settings, "REPLICA_ROUTING", {}))
+    return config
+
+
+class RoutingState:
+    """
+    Where the current request reads from.
+
+    `primary` is set when the request must see the primary's data: its user
+    wrote recently, or the request itself has written. `wrote` records the
+    latter, so the middleware can keep the user on the primary afterwards.
+    """
+
+    __slots__ = ("primary", "wrote")
+
+    def __init__(self, primary=False):
+        self.primary = primary
+        self.wrote = False
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads of REPLICA_ROUTING["MODELS"] made while handling a request to
+    a random replica alias, and every write to the primary ("default").
+
+    Reads stay on the primary outside requests, inside transactions, and
+    for requests marked by replica_routing_middleware as needing to see
+    their user's recent writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if state is None or state.primary:
+            return None
+        config = get_config()
+        if not config["REPLICAS"] or model._meta.label not in config["MODELS"]:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(config["REPLICAS"])
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.primary = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        if db in get_config()["REPLICAS"]:
+            return False
+        return None
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -40,12 +41,17 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "user",
     "task",
+    "jobs",
     "rest_framework",
     "rest_framework_simplejwt",
     "drf_yasg",
+    "task_manager",
 ]
 
 MIDDLEWARE = [
+    "task_manager.middleware.metrics_middleware",
+    "task_manager.middleware.replica_routing_middleware",
+    "task_manager.middleware.asgi_urlconf_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -57,6 +63,21 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "task_manager.urls"
 
+# Per-view query counts, database time and total time, served in Prometheus
+# format at /metrics (task_manager.metrics). SERVER_TIMING adds them to every
+# response as a Server-Timing header; queries taking SLOW_QUERY_MS or longer
+# are logged to "task_manager.slow_queries" (None turns the log off).
+REQUEST_METRICS = {
+    "ENABLED": True,
+    "SERVER_TIMING": False,
+    "SLOW_QUERY_MS": 200,
+}
+
+# URLconf for requests served under ASGI. Set to "task_manager.asgi_urls" to
+# route the task and user endpoints to their async views; off by default, as
+# benchmarks.asgi measures them at about half the WSGI views' throughput.
+ASGI_URLCONF = None
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -79,12 +100,118 @@ WSGI_APPLICATION = "task_manager.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_PROFILE selects the database: "sqlite" (the default) or
+# "postgresql", configured with the POSTGRES_* environment variables.
+DATABASE_PROFILE = os.environ.get("DATABASE_PROFILE", "sqlite")
+
+# Seconds a thread keeps its database connection across requests (persistent
+# connections). task_manager.asgi sets it to 0: under ASGI every request runs
+# its queries on a thread of its own, which would strand its connection.
+conn_max_age = int(os.environ.get("DATABASE_CONN_MAX_AGE", "600"))
+
+if DATABASE_PROFILE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "task_manager"),
+            "USER": os.environ.get("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        }
+    }
+    # psycopg's connection pool (needs psycopg[pool]), shared by the threads
+    # of a server process: requests borrow an open connection instead of
+    # connecting. POSTGRES_POOL_MAX_SIZE=0 turns the pool off in favour of
+    # persistent per-thread connections, checked before reuse.
+    pool_max_size = int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "20"))
+    if pool_max_size:
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "2")),
+                "max_size": pool_max_size,
+                "timeout": 10,
+            }
+        }
+    else:
+        DATABASES["default"].update(CONN_MAX_AGE=conn_max_age, CONN_HEALTH_CHECKS=True)
+    # Read replicas: POSTGRES_REPLICA_HOSTS lists hosts streaming from the
+    # primary, reached with the same credentials.
+    for i, host in enumerate(
+        filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(","))
+    ):
+        DATABASES[f"replica_{i}"] = {
+            **DATABASES["default"],
+            "HOST": host,
+            "TEST": {"MIRROR": "default"},
+        }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            # Keep each thread's connection (and its PRAGMAs) across requests.
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            # Take the write lock when a transaction starts, so a transaction
+            # that reads before writing waits for busy_timeout instead of
+            # failing with "database is locked" when it upgrades its lock.
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        }
+    }
+    # Local harness for read replicas: SQLITE_REPLICA names a second file,
+    # refreshed from the primary by `manage.py sync_replica`.
+    if os.environ.get("SQLITE_REPLICA"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "NAME": os.environ["SQLITE_REPLICA"],
+            "OPTIONS": {"init_command": "PRAGMA query_only = 1"},
+            "TEST": {"MIRROR": "default"},
+        }
+
+DATABASE_ROUTERS = ["task_manager.routers.PrimaryReplicaRouter"]
+
+# Reads of MODELS made by requests go to a random alias in REPLICAS, except
+# for STICKY_SECONDS after the user's last write, when they go to the
+# primary so the user sees their own writes (task_manager.routers). The
+# write is remembered in a cookie and in the CACHE_ALIAS cache, which must be
+# shared by every server process (e.g. Redis, see CACHES) when there are
+# several.
+REPLICA_ROUTING = {
+    "REPLICAS": [alias for alias in DATABASES if alias != "default"],
+    "MODELS": ["task.Task", "user.CustomUser"],
+    "STICKY_SECONDS": 5,
+    "COOKIE_NAME": "primary_until",
+    "CACHE_ALIAS": "default",
+}
+
+# PRAGMAs run on every new SQLite connection (task_manager.database). WAL lets
+# readers proceed while a write commits, synchronous=NORMAL only syncs at
+# checkpoints in WAL mode, and busy_timeout (ms) makes writers queue for the
+# lock rather than fail.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+# A cache shared by every server process (needs the redis package).
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
 
 
 # Password validation
@@ -105,6 +232,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Django's default hashers; Argon2 is preferred when argon2-cffi is installed,
+# and existing PBKDF2 hashes are then rehashed with it on the user's next login.
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+try:
+    import argon2  # noqa: F401
+except ImportError:
+    pass
+else:
+    PASSWORD_HASHERS.remove("django.contrib.auth.hashers.Argon2PasswordHasher")
+    PASSWORD_HASHERS.insert(0, "django.contrib.auth.hashers.Argon2PasswordHasher")
+
+# Bounded pool that password hashing and verification run in (user.hashing).
+# When WORKERS hashes are running and QUEUE_SIZE more are waiting, further
+# logins and registrations get 429 Too Many Requests with Retry-After. Under
+# WSGI a waiting login still holds its request thread, so keep WORKERS +
+# QUEUE_SIZE well below the server's thread count.
+PASSWORD_HASHING_POOL = {
+    "WORKERS": 4,
+    "QUEUE_SIZE": 8,
+    "RETRY_AFTER": 1,
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -123,6 +278,20 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# The "jobs" storage holds the files background jobs read and write (imports
+# waiting to run, finished exports); every worker process must see the same
+# files.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "jobs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {
+            "location": os.environ.get("JOBS_FILES_DIR", BASE_DIR / "job_files")
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -134,7 +303,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ],
 }
 
@@ -143,4 +312,131 @@ AUTH_USER_MODEL = "user.CustomUser"
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_REFRESH_SERIALIZER": "user.serializers.UserTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "user.serializers.UserTokenBlacklistSerializer",
+    "AUTH_TOKEN_CLASSES": ("user.tokens.UserAccessToken",),
+}
+
+# Sign tokens with a local key pair instead of SECRET_KEY: set JWT_ALGORITHM
+# to RS256 or EdDSA and point JWT_SIGNING_KEY_FILE and JWT_VERIFYING_KEY_FILE
+# at the PEM files written by `manage.py generate_signing_keys`. Requires the
+# cryptography package.
+if os.environ.get("JWT_SIGNING_KEY_FILE"):
+    SIMPLE_JWT.update(
+        ALGORITHM=os.environ.get("JWT_ALGORITHM", "RS256"),
+        SIGNING_KEY=Path(os.environ["JWT_SIGNING_KEY_FILE"]).read_text(),
+        VERIFYING_KEY=Path(os.environ["JWT_VERIFYING_KEY_FILE"]).read_text(),
+    )
+
+# Revoked refresh tokens (user.revocation): the in-memory Bloom filter is sized
+# for BLOOM_CAPACITY unexpired revocations and picks up revocations made by
+# other processes every SYNC_INTERVAL seconds. Each sync re-reads the last
+# SYNC_OVERLAP seconds, which must exceed the longest a revoking transaction
+# takes to commit plus the clock skew between servers.
+TOKEN_REVOCATION = {
+    "BLOOM_CAPACITY": 100000,
+    "BLOOM_ERROR_RATE": 0.001,
+    "SYNC_INTERVAL": 5,
+    "SYNC_OVERLAP": 60,
+}
+
+# In-process cache of user state (exists / is_active) used by
+# StatelessJWTAuthentication; TTL is in seconds.
+USER_STATE_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 60,
+}
+
+# Background deletion of users marked for deletion (user.purge): rows per
+# transaction, pause between transactions, and how often the purge_users
+# worker looks for new purges.
+USER_PURGE = {
+    "BATCH_SIZE": 1000,
+    "PAUSE_MS": 50,
+    "POLL_SECONDS": 5,
+}
+
+# Background jobs (jobs.queue): worker processes started by run_workers, how
+# often idle workers look for jobs, how long a claimed job stays leased to
+# its worker without a heartbeat, the retry backoff, how long finished jobs
+# are kept by prune_jobs, and per-kind limits on jobs running at once.
+JOBS = {
+    "PROCESSES": 2,
+    "POLL_SECONDS": 1,
+    "LEASE_SECONDS": 60,
+    "HEARTBEAT_SECONDS": 15,
+    "RETRY_DELAY_SECONDS": 10,
+    "MAX_RETRY_DELAY_SECONDS": 3600,
+    "KEEP_DAYS": 7,
+    "CONCURRENCY": {},
+}
+
+TASK_PAGINATION = {
+    "PAGE_SIZE": 50,
+    "MAX_PAGE_SIZE": 500,
+}
+
+TASK_BULK = {
+    "MAX_OPERATIONS": 10000,
+    "BATCH_SIZE": 1000,
+}
+
+# Rows fetched per database round trip and encoded per streamed chunk.
+TASK_EXPORT = {
+    "CHUNK_SIZE": 2000,
+}
+
+# Rows inserted per transaction, and rejected rows listed in an import report.
+TASK_IMPORT = {
+    "BATCH_SIZE": 1000,
+    "MAX_REJECTED": 1000,
+}
+
+# Default and maximum length, in days, of the per-day series in task stats.
+TASK_STATS = {
+    "DAYS": 30,
+    "MAX_DAYS": 365,
+}
+
+# Server-Sent Events stream of task changes, served under ASGI
+# (task.events). BROKER is the class events are published through; events
+# arriving within COALESCE_MS are sent as one message; a stream more than
+# MAX_PENDING events behind is told to resync from the changes feed; the last
+# REPLAY_SIZE events of the REPLAY_USERS most recent subscribers, and of
+# every user with an open stream, are kept for reconnects.
+TASK_EVENTS = {
+    "BROKER": "task.events.InProcessBroker",
+    "COALESCE_MS": 50,
+    "MAX_BATCH": 500,
+    "MAX_PENDING": 1000,
+    "REPLAY_SIZE": 1000,
+    "REPLAY_USERS": 10000,
+    "HEARTBEAT_SECONDS": 15,
+}
+
+# Default and maximum page size of the task changes feed, and the number of
+# days deleted tasks' tombstones are kept before `compact_task_changes`
+# drops them; clients that last synced before that must sync from scratch.
+TASK_CHANGES = {
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1000,
+    "TOMBSTONE_DAYS": 30,
+}
+
+# Archiving of completed tasks (task.archive): tasks completed and not
+# updated for AFTER_DAYS days are moved out of the task table by
+# archive_tasks, BATCH_SIZE per transaction with PAUSE_MS in between.
+TASK_ARCHIVE = {
+    "AFTER_DAYS": 90,
+    "BATCH_SIZE": 1000,
+    "PAUSE_MS": 50,
+}
+
+# Per-user cache of rendered task list pages; ALIAS selects the CACHES entry.
+TASK_LIST_CACHE = {
+    "ENABLED": True,
+    "ALIAS": "default",
+    "TIMEOUT": 300,
 }
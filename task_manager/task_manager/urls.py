@@ -21,6 +21,8 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from .metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Snippets API",
@@ -38,6 +40,8 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("user/", include("user.urls")),
     path("task/", include("task.urls")),
+    path("jobs/", include("jobs.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path(
         "swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -0,0 +1,20 @@
+import pytest
+from django.core.cache import caches
+
+from task.events import get_broker
+from task_manager.metrics import registry
+from user.revocation import revocation_store
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Database ids restart in every test, so cached pages of "user 1" from one
+    # test must not leak into the next.
+    for cache in caches.all():
+        cache.clear()
+    # Likewise the revocation filter's high-water mark of RevokedToken ids.
+    revocation_store.clear()
+    # And the request metrics recorded by earlier tests.
+    registry.clear()
+    # And the event streams' replay buffers.
+    get_broker().clear()
@@ -0,0 +1,250 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.async_views import AsyncTaskCreateListView, AsyncTaskUpdateDeleteView
+from task.models import Task, TaskChange
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture(autouse=True)
+def async_views(settings):
+    settings.ASGI_URLCONF = "task_manager.asgi_urls"
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def create_test_task(create_test_user):
+    return Task.objects.create(
+        user=create_test_user,
+        title="Test Task",
+        description="Task for testing purposes",
+        status="pending",
+    )
+
+
+class TokenClient(AsyncClient):
+    """
+    AsyncClient sending a bearer token for `user` with every request.
+    """
+
+    def __init__(self, user=None, token=None):
+        super().__init__()
+        if user is not None:
+            token = UserRefreshToken.for_user(user).access_token
+        self.token = token
+
+    def generic(self, *args, headers=None, **kwargs):
+        if self.token is not None:
+            headers = {"Authorization": f"Bearer {self.token}", **(headers or {})}
+        return super().generic(*args, headers=headers, **kwargs)
+
+
+@pytest.fixture
+def async_client(create_test_user):
+    return TokenClient(create_test_user)
+
+
+def request(client, method, *args, **kwargs):
+    return async_to_sync(getattr(client, method))(*args, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_list_matches_sync_list(async_client, create_test_user):
+    for i in range(3):
+        Task.objects.create(user=create_test_user, title=f"Task {i}")
+    params = {"page_size": 2, "ordering": "title"}
+
+    response = request(async_client, "get", reverse("task-list"), params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.resolver_match.func.view_class is AsyncTaskCreateListView
+    assert response["X-Cache"] == "MISS"
+
+    sync_client = APIClient()
+    sync_client.force_authenticate(create_test_user)
+    expected = sync_client.get(reverse("task-list"), params)
+    assert response.content == expected.content
+    assert response["ETag"] == expected["ETag"]
+
+    cached = request(async_client, "get", reverse("task-list"), params)
+    assert cached["X-Cache"] == "HIT"
+    assert cached.content == expected.content
+
+    not_modified = request(
+        async_client,
+        "get",
+        reverse("task-list"),
+        params,
+        headers={"If-None-Match": expected["ETag"]},
+    )
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_async_list_requires_authentication():
+    response = request(TokenClient(), "get", reverse("task-list"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    response = request(
+        TokenClient(token="invalid"),
+        "get",
+        reverse("task-list"),
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["code"] == "token_not_valid"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_create_task(async_client, create_test_user):
+    data = {"title": "New Task", "description": "Created under ASGI"}
+    response = request(
+        async_client,
+        "post",
+        reverse("task-list"),
+        data,
+        content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["title"] == "New Task"
+    assert Task.objects.filter(user=create_test_user, title="New Task").exists()
+
+    response = request(
+        async_client,
+        "post",
+        reverse("task-list"),
+        data,
+        content_type="application/json",
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["error"] == "Invalid data provided."
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_create_rolls_back_with_its_receivers(async_client, create_test_user):
+    def fail(**kwargs):
+        raise RuntimeError("Receiver failed")
+
+    post_save.connect(fail, sender=Task, dispatch_uid="test-fail")
+    try:
+        with pytest.raises(RuntimeError):
+            request(
+                async_client,
+                "post",
+                reverse("task-list"),
+                {"title": "New Task"},
+                content_type="application/json",
+            )
+    finally:
+        post_save.disconnect(sender=Task, dispatch_uid="test-fail")
+    # The row and what the receivers before the failing one wrote are gone.
+    assert not Task.objects.exists()
+    assert not TaskChange.objects.exists()
+
+
+@pytest.mark.django_db
+def test_async_task_detail(async_client, create_test_user, create_test_task):
+    url = reverse("task-detail", args=[create_test_task.pk])
+    response = request(async_client, "get", url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.resolver_match.func.view_class is AsyncTaskUpdateDeleteView
+    assert response.json()["title"] == "Test Task"
+    etag = response["ETag"]
+
+    response = request(
+        async_client,
+        "patch",
+        url,
+        {"status": "completed"},
+        content_type="application/json",
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "completed"
+
+    response = request(
+        async_client,
+        "delete",
+        url,
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+    response = request(async_client, "delete", url)
+    assert response.status_code == status.HTTP_200_OK
+    assert not Task.objects.filter(pk=create_test_task.pk).exists()
+
+    response = request(async_client, "get", url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_task_detail_of_other_user(create_test_task):
+    other = get_user_model().objects.create_user(
+        email="other@example.com",
+        password="otherpass123",
+        first_name="Other",
+        last_name="User",
+    )
+    client = TokenClient(other)
+    url = reverse("task-detail", args=[create_test_task.pk])
+    assert request(client, "get", url).status_code == status.HTTP_404_NOT_FOUND
+    response = request(
+        client, "put", url, {"title": "Mine"}, content_type="application/json"
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_register_and_login():
+    client = TokenClient()
+    data = {
+        "email": "new@example.com",
+        "first_name": "New",
+        "last_name": "User",
+        "password": "newpassword123",
+        "password_confirmation": "newpassword123",
+    }
+    response = request(client, "post", reverse("register"), data)
+    assert response.status_code == status.HTTP_201_CREATED
+    response = request(client, "post", reverse("register"), data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "email" in response.json()
+
+    response = request(
+        client,
+        "post",
+        reverse("login"),
+        {"email": "new@example.com", "password": "wrongpassword"},
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = request(
+        client,
+        "post",
+        reverse("login"),
+        {"email": "new@example.com", "password": "newpassword123"},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    token = response.json()["access_token"]
+    response = request(
+        TokenClient(token=token),
+        "get",
+        reverse("task-list"),
+    )
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,87 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import Task
+from user.authentication import UserStateCache, user_state_cache
+from user.models import CustomUser
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def create_test_user():
+    return CustomUser.objects.create_user(
+        email="testuser@example.com",
+        first_name="Test",
+        last_name="User",
+        password="testpassword123",
+    )
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    user_state_cache.clear()
+    client = APIClient()
+    token = UserRefreshToken.for_user(create_test_user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.mark.django_db
+def test_token_auth_skips_user_query_when_cached(
+    api_client, create_test_user, django_assert_num_queries
+):
+    task = Task.objects.create(user=create_test_user, title="Cached")
+    url = reverse("task-detail", kwargs={"pk": task.id})
+
+    # First request loads the user state, later ones only query the task.
+    with django_assert_num_queries(2):
+        api_client.get(url)
+    with django_assert_num_queries(1):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["user"] == create_test_user.id
+
+
+@pytest.mark.django_db
+def test_token_auth_creates_task_for_token_user(api_client, create_test_user):
+    response = api_client.post(reverse("task-list"), {"title": "From token"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Task.objects.get(title="From token").user == create_test_user
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(api_client, create_test_user):
+    assert api_client.get(reverse("task-list")).status_code == status.HTTP_200_OK
+
+    create_test_user.is_active = False
+    create_test_user.save()
+
+    response = api_client.get(reverse("task-list"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_deleted_user_is_rejected(api_client, create_test_user):
+    assert api_client.get(reverse("task-list")).status_code == status.HTTP_200_OK
+    create_test_user.delete()
+    response = api_client.get(reverse("task-list"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_user_state_cache_is_bounded():
+    cache = UserStateCache(max_size=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+
+
+def test_user_state_cache_expires():
+    cache = UserStateCache(max_size=2, ttl=0)
+    cache.set(1, "a")
+    assert cache.get(1) is None
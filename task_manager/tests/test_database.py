@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+
+def open_sqlite(path):
+    wrapper = DatabaseWrapper({**connection.settings_dict, "NAME": str(path)})
+    wrapper.ensure_connection()
+    return wrapper
+
+
+def pragma(wrapper, name):
+    return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_sqlite_connections_are_tuned(tmp_path):
+    wrapper = open_sqlite(tmp_path / "tuned.sqlite3")
+    try:
+        assert pragma(wrapper, "journal_mode") == "wal"
+        assert pragma(wrapper, "synchronous") == 1  # NORMAL
+        assert pragma(wrapper, "busy_timeout") == 5000
+        assert pragma(wrapper, "mmap_size") == 256 * 1024 * 1024
+        assert wrapper.transaction_mode == "IMMEDIATE"
+    finally:
+        wrapper.close()
+
+
+@pytest.mark.django_db
+@override_settings(SQLITE_PRAGMAS={})
+def test_sqlite_pragmas_follow_settings(tmp_path):
+    wrapper = open_sqlite(tmp_path / "plain.sqlite3")
+    try:
+        assert pragma(wrapper, "journal_mode") == "delete"
+        assert pragma(wrapper, "synchronous") == 2  # FULL
+    finally:
+        wrapper.close()
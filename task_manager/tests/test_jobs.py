@@ -0,0 +1,171 @@
+import datetime
+import json
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from jobs import queue
+from jobs.models import Job
+from jobs.worker import Worker
+from task.models import Task
+
+calls = []
+
+
+@queue.register("tests.flaky", max_attempts=2)
+def flaky(job):
+    calls.append(job.attempts)
+    if job.payload.get("fail"):
+        raise RuntimeError("Flaky failure")
+    return {"attempt": job.attempts}
+
+
+@queue.register("tests.limited", concurrency=1)
+def limited(job):
+    return None
+
+
+hooks = []
+
+
+@queue.register("tests.hooked")
+def hooked(job):
+    return hooks.pop()(job)
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    client = APIClient()
+    client.force_authenticate(create_test_user)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def job_files(settings, tmp_path):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "jobs": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": tmp_path},
+        },
+    }
+
+
+@pytest.mark.django_db
+def test_jobs_are_retried_leased_and_limited():
+    calls.clear()
+    job = queue.enqueue("tests.flaky", {"fail": True})
+    assert Worker(["tests.flaky"]).run(burst=True) == 1
+
+    # Queued again after a backoff delay, which the worker doesn't wait for.
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED and job.attempts == 1
+    assert job.run_at > timezone.now()
+    assert job.error.strip().endswith("RuntimeError: Flaky failure")
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    Worker(["tests.flaky"]).run(burst=True)
+    job.refresh_from_db()
+    assert job.status == Job.FAILED and job.attempts == 2 and calls == [1, 2]
+
+    # A job whose worker stopped renewing its lease is claimed again.
+    job = queue.enqueue("tests.flaky")
+    assert queue.claim("dead", ["tests.flaky"]).attempts == 1
+    assert queue.claim("other", ["tests.flaky"]) is None
+    Job.objects.filter(pk=job.pk).update(
+        lease_expires_at=timezone.now() - datetime.timedelta(seconds=1)
+    )
+    Worker(["tests.flaky"], name="live").run(burst=True)
+    job.refresh_from_db()
+    assert (job.status, job.worker, job.result) == (
+        Job.SUCCEEDED,
+        "live",
+        {"attempt": 2},
+    )
+
+    # At most `concurrency` jobs of a kind run at once.
+    first = queue.enqueue("tests.limited")
+    queue.enqueue("tests.limited")
+    other = queue.enqueue("tests.flaky")
+    assert queue.claim("a", ["tests.limited", "tests.flaky"]).pk == first.pk
+    assert queue.claim("b", ["tests.limited", "tests.flaky"]).pk == other.pk
+    assert queue.claim("c", ["tests.limited", "tests.flaky"]) is None
+
+
+@pytest.mark.django_db
+def test_async_import_and_export(api_client, create_test_user):
+    rows = "".join(json.dumps({"title": f"Task {i}"}) + "\n" for i in range(5))
+    response = api_client.post(
+        reverse("task-import"),
+        {"file": SimpleUploadedFile("tasks.ndjson", rows.encode())},
+        format="multipart",
+        HTTP_PREFER="respond-async",
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response["Preference-Applied"] == "respond-async"
+    assert not Task.objects.exists()
+    status_url = response["Location"]
+    result_url = reverse("job-result", args=[response.data["id"]])
+    assert api_client.get(result_url).status_code == status.HTTP_409_CONFLICT
+
+    Worker().run(burst=True)
+    data = api_client.get(status_url).data
+    assert data["status"] == Job.SUCCEEDED
+    assert (data["result"]["imported"], data["result"]["rejected"]) == (5, 0)
+    assert api_client.get(result_url).data["imported"] == 5
+
+    response = api_client.get(
+        reverse("task-export"),
+        {"format": "csv", "ordering": "-title"},
+        HTTP_PREFER="respond-async",
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = Job.objects.get(pk=response.data["id"])
+    assert (job.kind, job.user_id) == ("task.export", create_test_user.pk)
+    Worker().run(burst=True)
+    response = api_client.get(reverse("job-result", args=[job.pk]))
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    assert 'filename="tasks.csv"' in response["Content-Disposition"]
+    lines = b"".join(response.streaming_content).splitlines()
+    assert len(lines) == 6 and lines[1].split(b",")[2] == b"Task 4"
+
+    # Other users' jobs are not found.
+    other = get_user_model().objects.create_user(
+        email="other@example.com", first_name="Other", last_name="User"
+    )
+    api_client.force_authenticate(other)
+    assert api_client.get(status_url).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_stopped_worker_renews_the_lease_until_its_job_is_done(monkeypatch):
+    renewed = threading.Event()
+    monkeypatch.setattr(queue, "renew", lambda job: renewed.set())
+    worker = Worker(["tests.hooked"])
+    worker.config = {**worker.config, "HEARTBEAT_SECONDS": 0.01}
+
+    def run_after_stop(job):
+        worker.stop()
+        return {"renewed": renewed.wait(5)}
+
+    hooks.append(run_after_stop)
+    job = queue.enqueue("tests.hooked")
+    assert worker.run() == 1
+    job.refresh_from_db()
+    assert job.status == Job.SUCCEEDED and job.result == {"renewed": True}
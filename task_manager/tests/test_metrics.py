@@ -0,0 +1,103 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import Task
+from task_manager.metrics import registry
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    client = APIClient()
+    client.force_authenticate(create_test_user)
+    return client
+
+
+def metric_lines(client):
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    return response.content.decode().splitlines()
+
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_view(api_client, create_test_user):
+    Task.objects.create(user=create_test_user, title="Test Task")
+    api_client.get(reverse("task-list"))
+    api_client.get(reverse("task-list"))
+    api_client.get("/task/missing/")
+
+    lines = metric_lines(api_client)
+    labels = 'view="task-list",method="GET"'
+    assert f'http_requests_total{{{labels},status="200"}} 2' in lines
+    assert f"http_request_duration_seconds_count{{{labels}}} 2" in lines
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"http_request_db_duration_seconds_count{{{labels}}} 2" in lines
+    # The list is served from the cache the second time, without a query.
+    assert f'http_request_queries_bucket{{{labels},le="0"}} 1' in lines
+    assert f'http_request_queries_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert any(
+        line.startswith(f"http_request_queries_sum{{{labels}}}") for line in lines
+    )
+    assert 'http_requests_total{view="unmatched",method="GET",status="404"} 1' in lines
+    # Process-wide counters of the caches and pools are exported too.
+    assert any(line.startswith("task_list_cache_misses_total ") for line in lines)
+    assert "password_hashing_in_flight 0" in lines
+
+
+@pytest.mark.django_db
+def test_async_views_queries_are_counted(create_test_user):
+    Task.objects.create(user=create_test_user, title="Test Task")
+    token = UserRefreshToken.for_user(create_test_user).access_token
+    response = async_to_sync(AsyncClient().get)(
+        reverse("task-list"), headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    ((labels, (counts, queries)),) = registry.queries.series.items()
+    assert labels == (("view", "task-list"), ("method", "GET"))
+    assert queries > 0
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_METRICS={"SERVER_TIMING": True, "SLOW_QUERY_MS": 0})
+def test_server_timing_and_slow_query_log(api_client, caplog):
+    with caplog.at_level(logging.WARNING, logger="task_manager.slow_queries"):
+        response = api_client.get(reverse("task-list"))
+
+    timing = response["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing and "total;dur=" in timing
+    queries = int(timing.split('desc="')[1].split(" ")[0])
+    assert queries > 0
+    assert len(caplog.records) == queries
+    assert "GET task-list" in caplog.records[0].getMessage()
+    lines = metric_lines(api_client)
+    assert f'db_slow_queries_total{{view="task-list",method="GET"}} {queries}' in lines
+
+
+@pytest.mark.django_db
+@override_settings(REQUEST_METRICS={"ENABLED": False})
+def test_metrics_can_be_disabled(api_client):
+    response = api_client.get(reverse("task-list"))
+    assert "Server-Timing" not in response
+    assert api_client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+    assert not registry.requests
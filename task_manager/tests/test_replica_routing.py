@@ -0,0 +1,114 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from task.models import Task
+from task_manager.middleware import replica_routing_middleware
+from task_manager.routers import PrimaryReplicaRouter, RoutingState, current_routing
+from user.models import RevokedToken
+from user.tokens import UserRefreshToken
+
+REPLICAS = {"REPLICAS": ["replica"], "STICKY_SECONDS": 5}
+
+
+@pytest.fixture
+def routing_state():
+    state = RoutingState()
+    token = current_routing.set(state)
+    yield state
+    current_routing.reset(token)
+
+
+@override_settings(REPLICA_ROUTING=REPLICAS)
+def test_request_reads_go_to_replica_until_a_write(routing_state):
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Task) == "replica"
+    assert router.db_for_read(get_user_model()) == "replica"
+    # Models not listed always read from the primary.
+    assert router.db_for_read(RevokedToken) is None
+
+    assert router.db_for_write(Task) == "default"
+    assert routing_state.wrote
+    assert router.db_for_read(Task) is None
+
+
+@override_settings(REPLICA_ROUTING=REPLICAS)
+def test_reads_outside_requests_stay_on_primary():
+    assert PrimaryReplicaRouter().db_for_read(Task) is None
+
+
+@pytest.mark.django_db
+@override_settings(REPLICA_ROUTING=REPLICAS)
+def test_reads_in_transactions_stay_on_primary(routing_state):
+    with transaction.atomic():
+        assert PrimaryReplicaRouter().db_for_read(Task) is None
+
+
+def route(request, write=False):
+    """
+    Pass `request` through the middleware to a view that reads a Task and
+    optionally writes one; return the read's alias and the response.
+    """
+    reads = []
+
+    def view(request):
+        reads.append(PrimaryReplicaRouter().db_for_read(Task))
+        if write:
+            PrimaryReplicaRouter().db_for_write(Task)
+        return HttpResponse()
+
+    response = replica_routing_middleware(view)(request)
+    return reads[0], response
+
+
+@override_settings(REPLICA_ROUTING=REPLICAS)
+def test_cookie_keeps_writer_on_primary():
+    factory = RequestFactory()
+    assert route(factory.get("/"))[0] == "replica"
+
+    alias, response = route(factory.post("/"), write=True)
+    cookie = response.cookies["primary_until"]
+    assert cookie["max-age"] == 5
+    assert cookie["httponly"]
+
+    factory.cookies["primary_until"] = cookie.value
+    assert route(factory.get("/"))[0] is None
+    factory.cookies["primary_until"] = str(time.time() - 1)
+    assert route(factory.get("/"))[0] == "replica"
+
+
+@override_settings(REPLICA_ROUTING=REPLICAS)
+def test_token_claim_keeps_writer_on_primary():
+    # Outside a test transaction, which would keep every read on the primary.
+    user = get_user_model()(pk=7, email="testuser@example.com")
+    token = UserRefreshToken.for_user(user).access_token
+    headers = {"Authorization": f"Bearer {token}"}
+    factory = RequestFactory(headers=headers)
+    assert route(factory.get("/"))[0] == "replica"
+
+    route(factory.post("/"), write=True)
+    # No cookie: the user id claim finds the write.
+    assert route(factory.get("/"))[0] is None
+    other = RequestFactory(headers={"Authorization": "Bearer not.a.token"})
+    assert route(other.get("/"))[0] == "replica"
+
+
+def test_two_file_harness():
+    # Runs the harness with its own primary and replica SQLite files.
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.replicas", "--tasks", "10"]
+        + ["--requests", "5", "--sticky-seconds", "0.5"],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "read after the window, stale replica: 404" in result.stdout
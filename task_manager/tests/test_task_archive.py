@@ -0,0 +1,165 @@
+import datetime
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task import archive, changes, search, stats
+from task.models import Task, TaskArchive
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    client = APIClient()
+    client.force_authenticate(create_test_user)
+    return client
+
+
+def age(tasks, days):
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+        updated_at=timezone.now() - datetime.timedelta(days=days)
+    )
+
+
+def list_all(client, **params):
+    """
+    Follow the task list from its first page to its last, returning the ids.
+    """
+    ids = []
+    url = reverse("task-list")
+    while url:
+        response = client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        ids += [row["id"] for row in response.data["results"]]
+        url, params = response.data["next"], {}
+    return ids
+
+
+@pytest.mark.django_db
+def test_archive_and_restore(api_client, create_test_user):
+    for i in range(5):
+        api_client.post(reverse("task-list"), {"title": f"Old {i}"})
+    api_client.post(reverse("task-list"), {"title": "Recent"})
+    api_client.post(reverse("task-list"), {"title": "Open"})
+    old = list(Task.objects.filter(title__startswith="Old").order_by("pk"))
+    for task in old + [Task.objects.get(title="Recent")]:
+        api_client.patch(
+            reverse("task-detail", args=[task.pk]), {"status": "completed"}
+        )
+    age(old + [Task.objects.get(title="Open")], 100)
+    old = list(Task.objects.filter(title__startswith="Old").order_by("pk"))
+    before = stats.get_stats(create_test_user.pk, 1)["counts"]
+    page, _ = changes.get_changes(create_test_user.pk, 0, 100)
+    cursor = page[-1][0].seq
+    url = reverse("task-list") + "?include_archived=true"
+    etags = [api_client.get(url)["ETag"]]
+
+    # Only the old completed tasks move, in batches, with their columns kept.
+    assert archive.archive(90, batch_size=2, pause=0) == 5
+    assert set(Task.objects.values_list("title", flat=True)) == {"Recent", "Open"}
+    assert list(TaskArchive.objects.order_by("pk").values_list("pk", flat=True)) == [
+        task.pk for task in old
+    ]
+    archived = TaskArchive.objects.get(pk=old[0].pk)
+    assert (archived.created_at, archived.updated_at, archived.completed_at) == (
+        old[0].created_at,
+        old[0].updated_at,
+        old[0].completed_at,
+    )
+
+    # The validators of lists including archived tasks follow the archive.
+    etags.append(api_client.get(url)["ETag"])
+    archive.restore(create_test_user.pk, [old[4].pk])
+    etags.append(api_client.get(url)["ETag"])
+    assert len(set(etags)) == 3
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etags[1])
+    assert response.status_code == status.HTTP_200_OK
+    archive.archive(90, pause=0)
+    cursor = changes.get_changes(create_test_user.pk, 0, 100)[0][-1][0].seq
+
+    # Archived tasks still count in the stats and exist in the changes feed.
+    assert stats.get_stats(create_test_user.pk, 1)["counts"] == before
+    assert not stats.rebuild(create_test_user.pk)
+    page, _ = changes.get_changes(create_test_user.pk, 0, 100)
+    assert all(task is not None for _, task in page)
+
+    # Restoring a task puts it back as it was, searchable, on the feed.
+    response = api_client.post(reverse("task-restore", args=[old[0].pk]))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["title"] == "Old 0"
+    assert Task.objects.get(pk=old[0].pk).updated_at == old[0].updated_at
+    response = api_client.get(reverse("task-list"), {"search": "old"})
+    assert [row["id"] for row in response.data["results"]] == [old[0].pk]
+    page, _ = changes.get_changes(create_test_user.pk, cursor, 100)
+    assert [change.task_id for change, _ in page] == [old[0].pk]
+    # Restoring it again (a retry) returns it as it is.
+    response = api_client.post(reverse("task-restore", args=[old[0].pk]))
+    assert response.status_code == status.HTTP_200_OK
+
+    # A task whose title was taken stays archived.
+    api_client.post(reverse("task-list"), {"title": "Old 1"})
+    response = api_client.post(reverse("task-restore", args=[old[1].pk]))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert TaskArchive.objects.filter(pk=old[1].pk).exists()
+    response = api_client.post(reverse("task-restore", args=[123456]))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    call_command("restore_tasks", create_test_user.email, stdout=io.StringIO())
+    assert list(TaskArchive.objects.values_list("pk", flat=True)) == [old[1].pk]
+
+
+@pytest.mark.django_db
+def test_list_includes_archived_tasks(api_client, create_test_user):
+    Task.objects.bulk_create(
+        [
+            Task(
+                user=create_test_user,
+                title=f"Task {i}",
+                status="pending" if i % 2 else "completed",
+            )
+            for i in range(12)
+        ]
+    )
+    tasks = list(Task.objects.order_by("pk"))
+    search.index_tasks(tasks)
+    # The archived (even) and hot (odd) tasks alternate in the list.
+    for i, task in enumerate(tasks):
+        age([task], 200 - i)
+    assert archive.archive(150, pause=0) == 6
+
+    assert len(list_all(api_client, page_size=4)) == 6
+    expected = [task.pk for task in reversed(tasks)]
+    for page_size in (1, 4, 5, 50):
+        assert (
+            list_all(api_client, page_size=page_size, include_archived="true")
+            == expected
+        )
+    assert list_all(
+        api_client, include_archived="true", ordering="title", page_size=5
+    ) == [task.pk for task in sorted(tasks, key=lambda task: (task.title, task.pk))]
+    assert list_all(api_client, include_archived="1", search="task 11") == [
+        tasks[11].pk
+    ]
+    assert list_all(api_client, include_archived="1", search="task 10") == [
+        tasks[10].pk
+    ]
+
+    response = api_client.get(reverse("task-list"), {"include_archived": "maybe"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "include_archived" in response.data
@@ -0,0 +1,193 @@
+import datetime
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import Task, TaskChange
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    client = APIClient()
+    client.force_authenticate(create_test_user)
+    return client
+
+
+def get_changes(client, **params):
+    response = client.get(reverse("task-changes"), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def sync(client, since=0, **params):
+    """
+    Follow the feed from `since` to the end, returning the changes and the
+    final cursor.
+    """
+    changes = []
+    while True:
+        data = get_changes(client, since=since, **params)
+        changes += data["changes"]
+        since = data["cursor"]
+        if data["next"] is None:
+            return changes, since
+
+
+@pytest.mark.django_db
+def test_changes_follow_every_write_path(api_client, create_test_user):
+    for title in ["A", "B", "C"]:
+        api_client.post(reverse("task-list"), {"title": title})
+    a, b, c = Task.objects.order_by("id")
+    changes, cursor = sync(api_client)
+    assert [(item["id"], item["seq"]) for item in changes] == [
+        (a.id, 1),
+        (b.id, 2),
+        (c.id, 3),
+    ]
+    assert changes[0]["task"]["title"] == "A"
+    assert not any(item["deleted"] for item in changes)
+
+    # Single-statement update and delete, bulk update, delete and create.
+    api_client.patch(
+        reverse("task-detail", kwargs={"pk": a.id}), {"status": "in_progress"}
+    )
+    api_client.patch(
+        reverse("task-detail", kwargs={"pk": a.id}), {"status": "completed"}
+    )
+    api_client.delete(reverse("task-detail", kwargs={"pk": c.id}))
+    bulk = {
+        "create": [{"title": "D"}],
+        "update": [{"id": b.id, "title": "B2"}],
+        "delete": [a.id],
+    }
+    api_client.post(reverse("task-bulk"), bulk, format="json")
+    d = Task.objects.get(title="D")
+    # Import.
+    upload = SimpleUploadedFile("tasks.ndjson", json.dumps({"title": "E"}).encode())
+    api_client.post(reverse("task-import"), {"file": upload}, format="multipart")
+    e = Task.objects.get(title="E")
+
+    changes, cursor = sync(api_client, since=cursor)
+    # a's updates are superseded by its deletion; the bulk writes share a batch.
+    assert [changes[0]["id"], changes[-1]["id"]] == [c.id, e.id]
+    assert {item["id"]: item["deleted"] for item in changes} == {
+        c.id: True,
+        a.id: True,
+        b.id: False,
+        d.id: False,
+        e.id: False,
+    }
+    seqs = [item["seq"] for item in changes]
+    assert seqs == sorted(seqs) and seqs[0] > 3
+    assert "task" not in changes[0]
+    assert next(item for item in changes if item["id"] == b.id)["task"]["title"] == "B2"
+    assert get_changes(api_client, since=cursor) == {
+        "changes": [],
+        "cursor": cursor,
+        "next": None,
+    }
+
+    # Model.save() and Model.delete().
+    d.title = "D2"
+    d.save()
+    e_id = e.id
+    e.delete()
+    changes, _ = sync(api_client, since=cursor)
+    assert [(item["id"], item["deleted"]) for item in changes] == [
+        (d.id, False),
+        (e_id, True),
+    ]
+
+    # Other users' changes are not in the feed, and deleting a user drops
+    # their feed along with their tasks.
+    other = get_user_model().objects.create_user(
+        email="other@example.com", password="password123", first_name="O", last_name="U"
+    )
+    Task.objects.create(user=other, title="Not yours")
+    assert sync(api_client, since=cursor)[0] == changes
+    other_id = other.pk
+    other.delete()
+    assert not TaskChange.objects.filter(user_id=other_id).exists()
+
+
+@pytest.mark.django_db
+def test_changes_are_paginated(api_client, create_test_user, django_assert_num_queries):
+    for i in range(5):
+        Task.objects.create(user=create_test_user, title=f"Task {i}")
+    Task.objects.filter(title="Task 1").delete()
+
+    # The compaction horizon, one index seek for the changes and one lookup
+    # of their tasks.
+    with django_assert_num_queries(3):
+        data = get_changes(api_client, since=1, limit=2)
+    assert [item["seq"] for item in data["changes"]] == [3, 4]
+    assert data["cursor"] == 4
+    assert "since=4" in data["next"] and "limit=2" in data["next"]
+
+    data = api_client.get(data["next"]).data
+    assert [(item["seq"], item["deleted"]) for item in data["changes"]] == [
+        (5, False),
+        (6, True),
+    ]
+    assert data["next"] is None
+
+    changes, _ = sync(api_client, limit=2)
+    assert [item["seq"] for item in changes] == [1, 3, 4, 5, 6]
+
+
+@pytest.mark.django_db
+def test_changes_rejects_invalid_parameters(api_client):
+    for params in [{"since": -1}, {"since": "x"}, {"limit": 0}, {"limit": 1001}]:
+        response = api_client.get(reverse("task-changes"), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_compaction_drops_old_tombstones(api_client, create_test_user):
+    tasks = [
+        Task.objects.create(user=create_test_user, title=f"Task {i}") for i in range(4)
+    ]
+    ids = [task.id for task in tasks]
+    tasks[0].delete()  # seq 5
+    tasks[1].delete()  # seq 6
+    TaskChange.objects.filter(deleted=True).update(
+        changed_at=timezone.now() - datetime.timedelta(days=31)
+    )
+    tasks[2].delete()  # seq 7, recent
+
+    out = io.StringIO()
+    call_command("compact_task_changes", stdout=out)
+    assert out.getvalue().strip() == "Deleted 2 tombstones."
+    assert list(
+        TaskChange.objects.filter(deleted=True).values_list("seq", flat=True)
+    ) == [7]
+
+    # Clients that may have missed the dropped tombstones must start over.
+    response = api_client.get(reverse("task-changes"), {"since": 5})
+    assert response.status_code == status.HTTP_410_GONE
+    assert response.data["detail"].code == "changes_compacted"
+    assert [item["seq"] for item in get_changes(api_client, since=6)["changes"]] == [7]
+    changes, _ = sync(api_client)
+    assert [(item["id"], item["deleted"]) for item in changes] == [
+        (ids[3], False),
+        (ids[2], True),
+    ]
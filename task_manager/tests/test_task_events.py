@@ -0,0 +1,253 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from task.events import InProcessBroker, Subscription, get_broker
+from task.models import Task
+from task.queries import delete_task, update_task
+from task_manager.asgi import application
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+class Stream:
+    """
+    A GET /task/tasks/events/ request to the ASGI application, read message
+    by message until disconnect().
+    """
+
+    def __init__(self, user=None, headers=()):
+        self.headers = [(b"host", b"testserver"), *headers]
+        if user is not None:
+            token = UserRefreshToken.for_user(user).access_token
+            self.headers.append((b"authorization", f"Bearer {token}".encode()))
+        self.start = None
+        self.messages = asyncio.Queue()
+        self.buffer = b""
+        self.disconnected = asyncio.Event()
+
+    async def open(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/task/tasks/events/",
+            "raw_path": b"/task/tasks/events/",
+            "query_string": b"",
+            "root_path": "",
+            "headers": self.headers,
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 50000),
+        }
+        started = asyncio.Event()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.start = message
+                started.set()
+                return
+            self.buffer += message.get("body", b"")
+            while b"\n\n" in self.buffer:
+                event, self.buffer = self.buffer.split(b"\n\n", 1)
+                await self.messages.put(parse(event))
+            if not message.get("more_body", False):
+                await self.messages.put(None)
+
+        self.task = asyncio.create_task(application(scope, receive, send))
+        await asyncio.wait(
+            [asyncio.create_task(started.wait()), self.task],
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        return self.start["status"]
+
+    async def next(self, timeout=5):
+        return await asyncio.wait_for(self.messages.get(), timeout)
+
+    async def disconnect(self):
+        self.disconnected.set()
+        await self.task
+
+
+def parse(message):
+    fields = {}
+    for line in message.decode().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(TASK_EVENTS={"COALESCE_MS": 200, "HEARTBEAT_SECONDS": 60})
+def test_stream_pushes_task_changes(create_test_user):
+    @async_to_sync
+    async def run():
+        stream = Stream(create_test_user)
+        assert await stream.open() == 200
+        assert stream.start["headers"][0] == (b"content-type", b"text/event-stream")
+
+        # Writes that land within COALESCE_MS share a message, and only the
+        # latest event of each task is sent.
+        @sync_to_async
+        def write():
+            a = Task.objects.create(user=create_test_user, title="A")
+            b = Task.objects.create(user=create_test_user, title="B")
+            update_task(a.pk, create_test_user.pk, {"status": "completed"})
+            delete_task(b.pk, create_test_user.pk)
+            return a.pk, b.pk
+
+        a, b = await write()
+        message = await stream.next()
+        assert message["event"] == "tasks"
+        assert [(e["id"], e["type"], e["task_id"]) for e in message["data"]] == [
+            (3, "updated", a),
+            (4, "deleted", b),
+        ]
+        assert message["data"][0]["task"]["status"] == "completed"
+        assert message["id"] == "4"
+        assert get_broker().stats()["subscriptions"] == 1
+
+        # Other users' writes are not streamed.
+        other = await get_user_model().objects.acreate(email="other@example.com")
+        await Task.objects.acreate(user=other, title="Not yours")
+        await Task.objects.acreate(user=create_test_user, title="C")
+        message = await stream.next()
+        assert [e["type"] for e in message["data"]] == ["created"]
+
+        await stream.disconnect()
+        assert get_broker().stats()["subscriptions"] == 0
+
+        # Reconnecting replays what was missed since Last-Event-ID.
+        await Task.objects.filter(title="C").aupdate(title="C2")  # no signal
+        await sync_to_async(update_task)(a, create_test_user.pk, {"title": "A2"})
+        stream = Stream(create_test_user, [(b"last-event-id", b"4")])
+        assert await stream.open() == 200
+        message = await stream.next()
+        assert [(e["id"], e["type"]) for e in message["data"]] == [
+            (5, "created"),
+            (6, "updated"),
+        ]
+        await stream.disconnect()
+
+        # Events older than the replay buffer have to come from the feed.
+        get_broker().clear()
+        stream = Stream(create_test_user, [(b"last-event-id", b"4")])
+        assert await stream.open() == 200
+        assert await stream.next() == {"event": "resync", "data": {"since": 4}}
+        assert await stream.next() is None
+        await stream.disconnect()
+
+    run()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_requires_token():
+    @async_to_sync
+    async def run():
+        stream = Stream()
+        assert await stream.open() == 401
+        assert stream.start["headers"][1] == (
+            b"www-authenticate",
+            b'Bearer realm="api"',
+        )
+        await stream.disconnect()
+
+    run()
+
+
+def test_slow_subscriber_is_cut_off():
+    @async_to_sync
+    async def run():
+        broker = InProcessBroker(replay_size=3)
+        subscription = Subscription(1, max_pending=2)
+        assert broker.subscribe(subscription) == []
+        events = [{"id": i, "task_id": i} for i in range(1, 4)]
+
+        broker.publish(1, events[:2])
+        await asyncio.sleep(0)
+        assert await subscription.get(1, 0, 10) == events[:2]
+        broker.publish(1, events[2:])
+        broker.publish(1, [{"id": 4, "task_id": 4}, {"id": 5, "task_id": 5}])
+        await asyncio.sleep(0)
+        assert subscription.overflowed
+        assert await subscription.get(1, 0, 10) == []
+
+        # The replay buffer keeps the last three events.
+        broker.unsubscribe(subscription)
+        assert [e["id"] for e in broker.subscribe(Subscription(1, 2), 2)] == [3, 4, 5]
+        assert broker.subscribe(Subscription(1, 2), 1) is None
+
+    run()
+
+
+def test_coalesced_ids_are_not_missed_events():
+    @async_to_sync
+    async def run():
+        broker = InProcessBroker()
+        subscription = Subscription(1, max_pending=10)
+        broker.subscribe(subscription)
+        subscription.last_id = 2
+
+        # Ids 3 and 4 are updates of task 7 superseded by id 5.
+        broker.publish(1, [{"id": 2, "task_id": 1}, {"id": 3, "task_id": 7}])
+        broker.publish(1, [{"id": 5, "task_id": 7}, {"id": 4, "task_id": 7}])
+        await asyncio.sleep(0)
+        assert await subscription.get(1, 0, 10) == [{"id": 5, "task_id": 7}]
+        assert not subscription.missed
+
+        # Id 6 never arrives.
+        broker.publish(1, [{"id": 7, "task_id": 8}])
+        await asyncio.sleep(0)
+        assert await subscription.get(1, 0, 10) == []
+        assert subscription.missed
+
+    run()
+
+
+def test_open_streams_outlive_the_replay_users():
+    @async_to_sync
+    async def run():
+        broker = InProcessBroker(replay_size=10, replay_users=2)
+        subscriptions = {user_id: Subscription(user_id, 10) for user_id in (1, 2, 3)}
+        for subscription in subscriptions.values():
+            broker.subscribe(subscription)
+        assert broker.stats()["replay_users"] == 3
+        assert broker.wants(1)
+        broker.publish(1, [{"id": 1, "task_id": 1}])
+        await asyncio.sleep(0)
+        assert await subscriptions[1].get(1, 0, 10) == [{"id": 1, "task_id": 1}]
+
+        # Once its stream is closed, the user's buffer is the first to go.
+        broker.unsubscribe(subscriptions[1])
+        broker.subscribe(Subscription(4, 10))
+        assert not broker.wants(1)
+        assert broker.wants(2) and broker.wants(4)
+        assert broker.stats()["replay_users"] == 3
+
+    run()
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import Task
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def ndjson(*items):
+    return "\n".join(
+        item if isinstance(item, str) else json.dumps(item) for item in items
+    ).encode()
+
+
+@pytest.mark.django_db
+def test_import_tasks_ndjson(api_client, create_test_user):
+    Task.objects.create(user=create_test_user, title="Existing")
+    api_client.force_authenticate(create_test_user)
+    upload = SimpleUploadedFile(
+        "tasks.ndjson",
+        ndjson(
+            {"title": "First", "description": "One"},
+            {"title": "Second", "status": "completed"},
+            {"title": "First"},
+            {"title": "Existing"},
+            {"title": "Bad", "status": "unknown"},
+            "{not json",
+            {"title": "Third"},
+        ),
+    )
+
+    response = api_client.post(
+        reverse("task-import"), {"file": upload, "batch_size": 2}, format="multipart"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["rows"] == 7
+    assert response.data["imported"] == 3
+    assert response.data["rejected"] == 4
+    assert response.data["checkpoint"] == 7
+    assert [row["row"] for row in response.data["rejected_rows"]] == [3, 4, 5, 6]
+    assert "status" in response.data["rejected_rows"][2]["errors"]
+    assert Task.objects.get(title="Second").status == "completed"
+    assert Task.objects.filter(user=create_test_user).count() == 4
+
+
+@pytest.mark.django_db
+def test_import_tasks_csv_round_trip(api_client, create_test_user):
+    for title in ("One", "Two", 'Three, "quoted"'):
+        Task.objects.create(user=create_test_user, title=title, description="d")
+    other = get_user_model().objects.create_user(
+        email="other@example.com",
+        password="otherpass123",
+        first_name="Other",
+        last_name="User",
+    )
+    api_client.force_authenticate(create_test_user)
+    export = api_client.get(reverse("task-export"), {"format": "csv"})
+    content = b"".join(export.streaming_content)
+
+    api_client.force_authenticate(other)
+    upload = SimpleUploadedFile("tasks.csv", content)
+    response = api_client.post(
+        reverse("task-import"), {"file": upload}, format="multipart"
+    )
+    assert response.data["imported"] == 3
+    assert set(Task.objects.filter(user=other).values_list("title", flat=True)) == {
+        "One",
+        "Two",
+        'Three, "quoted"',
+    }
+
+
+@pytest.mark.django_db
+def test_import_tasks_resume_from_checkpoint(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    content = ndjson(*({"title": f"Task {i}"} for i in range(1, 6)))
+
+    response = api_client.post(
+        reverse("task-import"),
+        {"file": SimpleUploadedFile("tasks.ndjson", content), "resume_from": 3},
+        format="multipart",
+    )
+    assert response.data["rows"] == 2
+    assert response.data["checkpoint"] == 5
+    assert set(
+        Task.objects.filter(user=create_test_user).values_list("title", flat=True)
+    ) == {"Task 4", "Task 5"}
+
+
+@pytest.mark.django_db
+def test_import_tasks_command_resumes(create_test_user, tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    path.write_bytes(ndjson(*({"title": f"Task {i}"} for i in range(1, 6))))
+    checkpoint = tmp_path / "tasks.ndjson.checkpoint"
+    checkpoint.write_text(json.dumps({"checkpoint": 2}))
+
+    call_command("import_tasks", str(path), user=create_test_user.email, batch_size=2)
+    assert Task.objects.filter(user=create_test_user).count() == 3
+    assert not checkpoint.exists()
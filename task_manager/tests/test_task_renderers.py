@@ -0,0 +1,60 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.renderers import JSONRenderer
+
+from task.models import Task
+from task.renderers import FastJSONRenderer
+from task.serializers import TaskRowSerializer, TaskSerializer
+
+
+@pytest.fixture
+def create_test_user():
+    return get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+
+
+@pytest.mark.django_db
+def test_fast_path_is_byte_compatible(create_test_user):
+    Task.objects.create(user=create_test_user, title="Plain", status="completed")
+    Task.objects.create(
+        user=create_test_user,
+        title='Ünïcode "quotes" \\ \u2028 \u2029 \x1f',
+        description="Line\nbreak \U0001f600 </script>",
+    )
+    queryset = Task.objects.filter(user=create_test_user).order_by("id")
+
+    expected = JSONRenderer().render(
+        {"next": None, "results": TaskSerializer(queryset, many=True).data}
+    )
+    rows = TaskRowSerializer().to_representation(
+        queryset.values(*TaskRowSerializer.fields)
+    )
+    actual = FastJSONRenderer().render({"next": None, "results": rows})
+
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_fast_path_matches_in_utc(create_test_user, settings):
+    settings.TIME_ZONE = "UTC"
+    Task.objects.create(user=create_test_user, title="UTC")
+    queryset = Task.objects.filter(user=create_test_user)
+
+    expected = TaskSerializer(queryset, many=True).data
+    rows = TaskRowSerializer().to_representation(
+        queryset.values(*TaskRowSerializer.fields)
+    )
+    assert rows == [dict(task) for task in expected]
+    assert rows[0]["updated_at"].endswith("Z")
+
+
+def test_fast_renderer_falls_back_for_indent():
+    data = {"a": [1, 2]}
+    context = {"indent": 2}
+    assert FastJSONRenderer().render(
+        data, "application/json", context
+    ) == JSONRenderer().render(data, "application/json", context)
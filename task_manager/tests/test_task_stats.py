@@ -0,0 +1,137 @@
+import datetime
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task import stats
+from task.models import Task, TaskCounts, TaskDailyCount
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+@pytest.fixture
+def api_client(create_test_user):
+    client = APIClient()
+    client.force_authenticate(create_test_user)
+    return client
+
+
+def get_stats(client, **params):
+    response = client.get(reverse("task-stats"), params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+@pytest.mark.django_db
+def test_stats_follow_every_write_path(api_client, create_test_user):
+    today = datetime.date.today().isoformat()
+    for title in ["A", "B", "C"]:
+        api_client.post(reverse("task-list"), {"title": title})
+    a, b, c = Task.objects.order_by("id")
+
+    # Single-statement update and delete.
+    detail = reverse("task-detail", kwargs={"pk": a.id})
+    api_client.patch(detail, {"status": "in_progress"})
+    api_client.patch(detail, {"status": "completed"})
+    api_client.delete(reverse("task-detail", kwargs={"pk": c.id}))
+
+    # Bulk update (shared and individual changes), delete and create.
+    bulk = {
+        "create": [{"title": "D", "status": "completed"}, {"title": "E"}],
+        "update": [{"id": b.id, "status": "completed"}],
+        "delete": [],
+    }
+    api_client.post(reverse("task-bulk"), bulk, format="json")
+    d, e = Task.objects.filter(title__in=["D", "E"]).order_by("title")
+    bulk = {
+        "update": [
+            {"id": d.id, "status": "pending"},
+            {"id": e.id, "status": "in_progress"},
+        ],
+        "delete": [b.id],
+    }
+    api_client.post(reverse("task-bulk"), bulk, format="json")
+
+    # Import.
+    upload = SimpleUploadedFile(
+        "tasks.ndjson",
+        "\n".join(
+            json.dumps(item)
+            for item in [{"title": "F", "status": "completed"}, {"title": "G"}]
+        ).encode(),
+    )
+    api_client.post(reverse("task-import"), {"file": upload}, format="multipart")
+
+    data = get_stats(api_client, days=1)
+    assert data["counts"] == {
+        "pending": 2,
+        "in_progress": 1,
+        "completed": 2,
+        "total": 5,
+    }
+    assert data["created_per_day"] == [{"day": today, "count": 5}]
+    assert data["completed_per_day"] == [{"day": today, "count": 2}]
+    # Nothing for the reconciliation to fix.
+    assert not stats.rebuild(create_test_user.pk)
+
+
+@pytest.mark.django_db
+def test_reopened_task_leaves_completed_series(api_client, create_test_user):
+    task = Task.objects.create(user=create_test_user, title="A", status="completed")
+    assert get_stats(api_client, days=1)["completed_per_day"][0]["count"] == 1
+
+    task.status = "pending"
+    task.save()
+    data = get_stats(api_client, days=3)
+    assert data["counts"]["pending"] == 1
+    assert [point["count"] for point in data["completed_per_day"]] == [0, 0, 0]
+    assert not stats.rebuild(create_test_user.pk)
+
+
+@pytest.mark.django_db
+def test_stats_cost_does_not_grow_with_tasks(
+    api_client, create_test_user, django_assert_num_queries
+):
+    Task.objects.bulk_create(
+        [Task(user=create_test_user, title=f"Task {i}") for i in range(500)]
+    )
+    # The counters row and the daily rows, however many tasks there are.
+    with django_assert_num_queries(2):
+        get_stats(api_client)
+
+
+@pytest.mark.django_db
+def test_stats_rejects_invalid_days(api_client):
+    for days in ["0", "366", "week"]:
+        response = api_client.get(reverse("task-stats"), {"days": days})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_reconcile_rebuilds_drifted_counters(api_client, create_test_user):
+    Task.objects.create(user=create_test_user, title="A")
+    Task.objects.create(user=create_test_user, title="B", status="completed")
+    TaskCounts.objects.filter(user=create_test_user).update(pending=40)
+    TaskDailyCount.objects.filter(user=create_test_user).delete()
+
+    call_command("reconcile_task_stats")
+    data = get_stats(api_client, days=1)
+    assert data["counts"]["pending"] == 1
+    assert data["counts"]["completed"] == 1
+    assert data["created_per_day"][0]["count"] == 2
+    assert not stats.rebuild(create_test_user.pk)
@@ -1,10 +1,17 @@
+import csv
+import io
+import json
+import tracemalloc
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from task.models import Task
+from task.serializers import TaskSerializer, is_duplicate_title
 
 
 # Fixture to create a test user
@@ -54,7 +61,51 @@ def test_list_tasks_view(api_client, create_test_user, create_test_task):
     api_client.force_authenticate(create_test_user)
     response = api_client.get(reverse("task-list"))
     assert response.status_code == status.HTTP_200_OK
-    assert len(response.data) == 1
+    assert len(response.data["results"]) == 1
+    assert response.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_list_tasks_cursor_pagination(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    Task.objects.bulk_create(
+        Task(user=create_test_user, title=f"Task {i}") for i in range(5)
+    )
+
+    titles = []
+    url = reverse("task-list") + "?page_size=2"
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) <= 2
+        titles += [task["title"] for task in response.data["results"]]
+        url = response.data["next"]
+
+    # Newest first, every task exactly once.
+    assert titles == [f"Task {i}" for i in reversed(range(5))]
+
+
+@pytest.mark.django_db
+def test_list_tasks_page_size_is_capped(api_client, create_test_user, settings):
+    settings.TASK_PAGINATION = {"PAGE_SIZE": 2, "MAX_PAGE_SIZE": 3}
+    api_client.force_authenticate(create_test_user)
+    Task.objects.bulk_create(
+        Task(user=create_test_user, title=f"Task {i}") for i in range(5)
+    )
+
+    response = api_client.get(reverse("task-list"))
+    assert len(response.data["results"]) == 2
+
+    response = api_client.get(reverse("task-list") + "?page_size=100")
+    assert len(response.data["results"]) == 3
+    assert response.data["next"] is not None
+
+
+@pytest.mark.django_db
+def test_list_tasks_invalid_cursor(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    response = api_client.get(reverse("task-list") + "?cursor=not-a-cursor")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 @pytest.mark.django_db
@@ -101,3 +152,450 @@ def test_update_task_view_fail(api_client, create_test_user, create_test_task):
         reverse("task-detail", kwargs={"pk": create_test_task.id}), data
     )
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_tasks_filter_by_status_and_date(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    Task.objects.create(user=create_test_user, title="Open", status="pending")
+    Task.objects.create(user=create_test_user, title="Done", status="completed")
+    Task.objects.create(user=create_test_user, title="Busy", status="in_progress")
+
+    response = api_client.get(reverse("task-list"), {"status": "pending,completed"})
+    assert response.status_code == status.HTTP_200_OK
+    assert {task["title"] for task in response.data["results"]} == {"Open", "Done"}
+
+    response = api_client.get(reverse("task-list"), {"created_after": "2999-01-01"})
+    assert response.data["results"] == []
+
+    response = api_client.get(reverse("task-list"), {"status": "archived"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = api_client.get(reverse("task-list"), {"updated_before": "yesterday"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_tasks_ordering(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    for title in ["Bravo", "Alpha", "Charlie"]:
+        Task.objects.create(user=create_test_user, title=title)
+
+    titles = []
+    url = reverse("task-list") + "?ordering=title&page_size=2"
+    while url:
+        response = api_client.get(url)
+        titles += [task["title"] for task in response.data["results"]]
+        url = response.data["next"]
+    assert titles == ["Alpha", "Bravo", "Charlie"]
+
+
+@pytest.mark.django_db
+def test_list_tasks_ordering_by_id(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    tasks = [
+        Task.objects.create(user=create_test_user, title=title, status=status_)
+        for title, status_ in [("A", "pending"), ("B", "completed"), ("C", "pending")]
+    ]
+
+    def list_ids(ordering):
+        ids = []
+        url = reverse("task-list") + f"?ordering={ordering}&page_size=2"
+        while url:
+            response = api_client.get(url)
+            ids += [task["id"] for task in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    a, b, c = (task.id for task in tasks)
+    assert list_ids("-id") == [c, b, a]
+    assert list_ids("id") == [a, b, c]
+    assert list_ids("status,-id") == [b, c, a]
+
+
+@pytest.mark.django_db
+def test_list_tasks_search(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    task = Task.objects.create(
+        user=create_test_user, title="Quarterly report", description="Finance numbers"
+    )
+    Task.objects.create(user=create_test_user, title="Groceries", description="Milk")
+
+    response = api_client.get(reverse("task-list"), {"search": "financ"})
+    assert [t["title"] for t in response.data["results"]] == ["Quarterly report"]
+
+    # The index follows updates and deletes.
+    task.title = "Annual report"
+    task.save()
+    response = api_client.get(reverse("task-list"), {"search": "annual"})
+    assert [t["title"] for t in response.data["results"]] == ["Annual report"]
+
+    task.delete()
+    response = api_client.get(reverse("task-list"), {"search": "report"})
+    assert response.data["results"] == []
+
+
+# Test TaskBulkView
+@pytest.mark.django_db
+def test_bulk_task_operations(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    other = Task.objects.create(user=create_test_user, title="Other Task")
+    data = {
+        "create": [
+            {"title": "Bulk 1", "status": "pending"},
+            {"title": "Bulk 1"},
+            {"title": "Other Task"},
+            {"title": "", "status": "pending"},
+        ],
+        "update": [{"id": other.id, "status": "completed"}, {"id": 9999}],
+        "delete": [create_test_task.id],
+    }
+    response = api_client.post(reverse("task-bulk"), data, format="json")
+    assert response.status_code == status.HTTP_200_OK
+
+    created = response.data["create"]
+    assert created[0]["status"] == status.HTTP_201_CREATED
+    assert Task.objects.get(id=created[0]["id"]).title == "Bulk 1"
+    assert [item["status"] for item in created[1:]] == [400, 400, 400]
+    assert [item["status"] for item in response.data["update"]] == [200, 404]
+    assert response.data["delete"] == [{"id": create_test_task.id, "status": 204}]
+
+    other.refresh_from_db()
+    assert other.status == "completed"
+    assert not Task.objects.filter(id=create_test_task.id).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_create_frees_titles_of_deleted_tasks(
+    api_client, create_test_user, create_test_task
+):
+    api_client.force_authenticate(create_test_user)
+    data = {"create": [{"title": "Test Task"}], "delete": [create_test_task.id]}
+    response = api_client.post(reverse("task-bulk"), data, format="json")
+    assert response.data["create"][0]["status"] == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db
+def test_bulk_create_is_batched(
+    api_client, create_test_user, django_assert_max_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    data = {"create": [{"title": f"Task {i}"} for i in range(200)]}
+    # One title check, the insert, the search index sync, the status and
+    # per-day counters and the changes feed (created on first use), not one
+    # per task.
+    with django_assert_max_num_queries(21):
+        response = api_client.post(reverse("task-bulk"), data, format="json")
+    assert all(item["status"] == 201 for item in response.data["create"])
+    assert Task.objects.filter(user=create_test_user).count() == 200
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_other_users_tasks(api_client, create_test_user):
+    other_user = get_user_model().objects.create_user(
+        email="other@example.com", password="password123", first_name="O", last_name="U"
+    )
+    task = Task.objects.create(user=other_user, title="Not yours")
+    api_client.force_authenticate(create_test_user)
+    data = {"update": [{"id": task.id, "title": "Mine"}], "delete": [task.id]}
+    response = api_client.post(reverse("task-bulk"), data, format="json")
+    assert response.data["update"][0]["status"] == status.HTTP_404_NOT_FOUND
+    assert response.data["delete"][0]["status"] == status.HTTP_404_NOT_FOUND
+    assert Task.objects.get(id=task.id).title == "Not yours"
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_invalid_ids(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    data = {
+        "update": [{"id": [create_test_task.id], "title": "Mine"}, {"id": True}],
+        "delete": [[create_test_task.id], {"id": 1}, "1"],
+    }
+    response = api_client.post(reverse("task-bulk"), data, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    for item in response.data["update"] + response.data["delete"]:
+        assert item["status"] == status.HTTP_400_BAD_REQUEST
+        assert item["errors"] == {"id": ["A valid integer is required."]}
+    assert Task.objects.get(id=create_test_task.id).title == "Test Task"
+
+
+@pytest.mark.django_db
+def test_create_task_duplicate_title(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    data = {"title": create_test_task.title, "status": "pending"}
+    # Savepoint, failed INSERT, rollback and release; no title lookup first.
+    with django_assert_num_queries(4):
+        response = api_client.post(reverse("task-list"), data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "already exists" in str(response.data)
+    assert Task.objects.filter(title=create_test_task.title).count() == 1
+
+
+@pytest.mark.django_db
+def test_update_task_duplicate_title(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    other = Task.objects.create(user=create_test_user, title="Other Task")
+    response = api_client.patch(
+        reverse("task-detail", kwargs={"pk": other.id}),
+        {"title": create_test_task.title},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    other.refresh_from_db()
+    assert other.title == "Other Task"
+
+
+@pytest.mark.django_db
+def test_other_integrity_errors_are_not_duplicate_titles(create_test_user):
+    # A NOT NULL violation is raised as is, not reported as a taken title.
+    serializer = TaskSerializer(data={"title": "No owner"})
+    assert serializer.is_valid()
+    with pytest.raises(IntegrityError) as excinfo:
+        serializer.save(user_id=None)
+    assert not is_duplicate_title(excinfo.value)
+    assert not Task.objects.filter(title="No owner").exists()
+
+
+# Query counts for TaskUpdateDeleteView: ownership is checked in SQL and
+# writes don't load the task first.
+@pytest.mark.django_db
+def test_retrieve_task_is_one_query(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    with django_assert_num_queries(1):
+        response = api_client.get(
+            reverse("task-detail", kwargs={"pk": create_test_task.id})
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_patch_status_updates_without_select(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    # One transaction (a savepoint inside the test's) holding the UPDATE
+    # itself, then the status and per-day counters and the sequence number
+    # and change row for the changes feed.
+    with django_assert_num_queries(7) as captured:
+        response = api_client.patch(
+            reverse("task-detail", kwargs={"pk": create_test_task.id}),
+            {"status": "completed"},
+        )
+    assert captured.captured_queries[1]["sql"].startswith("UPDATE")
+    assert not any(q["sql"].startswith("SELECT") for q in captured.captured_queries)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["status"] == "completed"
+    assert response.data["title"] == create_test_task.title
+    create_test_task.refresh_from_db()
+    assert create_test_task.status == "completed"
+
+
+@pytest.mark.django_db
+def test_put_task_updates_without_select(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    data = {"title": "Renamed", "description": "New", "status": "pending"}
+    # One transaction (a savepoint inside the test's, also rolled back on a
+    # title conflict) holding the UPDATE, the search index sync and the
+    # changes feed.
+    with django_assert_num_queries(7) as captured:
+        response = api_client.put(
+            reverse("task-detail", kwargs={"pk": create_test_task.id}), data
+        )
+    assert not any(q["sql"].startswith("SELECT") for q in captured.captured_queries)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["title"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_delete_task_deletes_without_select(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    # One transaction (a savepoint inside the test's) holding the DELETE
+    # itself, the search index sync, the two counters and the tombstone for
+    # the changes feed.
+    with django_assert_num_queries(8) as captured:
+        response = api_client.delete(
+            reverse("task-detail", kwargs={"pk": create_test_task.id})
+        )
+    assert captured.captured_queries[1]["sql"].startswith("DELETE FROM")
+    assert not any(q["sql"].startswith("SELECT") for q in captured.captured_queries)
+    assert response.status_code == status.HTTP_200_OK
+    assert not Task.objects.filter(id=create_test_task.id).exists()
+
+
+@pytest.mark.django_db
+def test_other_users_task_is_not_found(api_client, create_test_task):
+    other_user = get_user_model().objects.create_user(
+        email="other@example.com", password="password123", first_name="O", last_name="U"
+    )
+    api_client.force_authenticate(other_user)
+    url = reverse("task-detail", kwargs={"pk": create_test_task.id})
+
+    assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+    response = api_client.patch(url, {"status": "completed"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.delete(url).status_code == status.HTTP_404_NOT_FOUND
+    assert Task.objects.get(id=create_test_task.id).status == "pending"
+
+
+@pytest.mark.django_db
+def test_list_tasks_served_from_cache(
+    api_client, create_test_user, create_test_task, django_assert_num_queries
+):
+    api_client.force_authenticate(create_test_user)
+    url = reverse("task-list")
+    assert api_client.get(url)["X-Cache"] == "MISS"
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url)
+    assert response["X-Cache"] == "HIT"
+    assert response.data["results"][0]["title"] == create_test_task.title
+
+    # Any write to the user's tasks invalidates the cached pages.
+    api_client.patch(
+        reverse("task-detail", kwargs={"pk": create_test_task.id}),
+        {"status": "completed"},
+    )
+    response = api_client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert response.data["results"][0]["status"] == "completed"
+
+    api_client.post(reverse("task-bulk"), {"create": [{"title": "B"}]}, format="json")
+    response = api_client.get(url)
+    assert response["X-Cache"] == "MISS"
+    assert len(response.data["results"]) == 2
+
+
+# Conditional requests
+@pytest.mark.django_db
+def test_list_tasks_not_modified(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    url = reverse("task-list")
+    response = api_client.get(url)
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    Task.objects.create(user=create_test_user, title="Another")
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_retrieve_task_not_modified(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    url = reverse("task-detail", kwargs={"pk": create_test_task.id})
+    etag = api_client.get(url)["ETag"]
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+    api_client.patch(url, {"status": "completed"})
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_update_task_if_match(api_client, create_test_user, create_test_task):
+    api_client.force_authenticate(create_test_user)
+    url = reverse("task-detail", kwargs={"pk": create_test_task.id})
+    etag = api_client.get(url)["ETag"]
+
+    response = api_client.patch(url, {"status": "in_progress"}, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+    # The stored copy moved on, so the stale ETag no longer matches.
+    response = api_client.patch(url, {"status": "completed"}, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    response = api_client.delete(url, HTTP_IF_MATCH=etag)
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    create_test_task.refresh_from_db()
+    assert create_test_task.status == "in_progress"
+
+    etag = api_client.get(url)["ETag"]
+    assert api_client.delete(url, HTTP_IF_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_export_tasks_ndjson(api_client, create_test_user, create_test_task):
+    Task.objects.create(user=create_test_user, title="Done", status="completed")
+    other = get_user_model().objects.create_user(
+        email="other@example.com",
+        password="otherpass123",
+        first_name="Other",
+        last_name="User",
+    )
+    Task.objects.create(user=other, title="Not mine")
+    api_client.force_authenticate(create_test_user)
+
+    response = api_client.get(reverse("task-export"), {"status": "pending"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    listed = api_client.get(reverse("task-list"), {"status": "pending"})
+    assert [json.loads(line) for line in lines] == json.loads(listed.content)["results"]
+
+
+@pytest.mark.django_db
+def test_export_tasks_csv(api_client, create_test_user, create_test_task):
+    Task.objects.create(user=create_test_user, title='Quote "me", please')
+    api_client.force_authenticate(create_test_user)
+
+    response = api_client.get(reverse("task-export"), {"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Disposition"] == 'attachment; filename="tasks.csv"'
+    rows = list(
+        csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+    )
+    assert [row["title"] for row in rows] == ["Test Task", 'Quote "me", please']
+    assert rows[0]["status"] == "pending"
+
+
+@pytest.mark.django_db
+def test_export_tasks_invalid_filter(api_client, create_test_user):
+    api_client.force_authenticate(create_test_user)
+    response = api_client.get(reverse("task-export"), {"status": "unknown"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response["Content-Type"] == "application/json"
+
+
+def export_peak_memory(api_client):
+    tracemalloc.start()
+    try:
+        response = api_client.get(reverse("task-export"))
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        return size, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.django_db
+def test_export_tasks_memory_is_bounded(api_client, create_test_user, settings):
+    settings.TASK_EXPORT = {"CHUNK_SIZE": 500}
+    api_client.force_authenticate(create_test_user)
+    Task.objects.bulk_create(
+        Task(user=create_test_user, title=f"Task {i}", description="x" * 100)
+        for i in range(5000)
+    )
+    small_size, small_peak = export_peak_memory(api_client)
+    Task.objects.bulk_create(
+        Task(user=create_test_user, title=f"Task {i}", description="x" * 100)
+        for i in range(5000, 50000)
+    )
+    size, peak = export_peak_memory(api_client)
+    # Ten times the rows, but peak memory stays that of a few chunks and well
+    # below the size of the export itself.
+    assert size > 9 * small_size
+    assert peak < 2 * small_peak
+    assert peak < size / 4
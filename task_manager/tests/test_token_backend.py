@@ -0,0 +1,117 @@
+import time
+
+import jwt
+import pytest
+from django.test import override_settings
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+from user.token_backend import CachedTokenBackend, get_token_backend
+from user.tokens import UserAccessToken
+
+KEY = "test-signing-key-with-enough-bytes-for-hs256"
+
+
+@pytest.fixture
+def payload():
+    return {"token_type": "access", "exp": int(time.time()) + 60, "user_id": 1}
+
+
+def test_tokens_are_interchangeable_with_token_backend(payload):
+    cached = CachedTokenBackend("HS256", KEY)
+    plain = TokenBackend("HS256", KEY)
+    assert plain.decode(cached.encode(payload)) == payload
+    assert cached.decode(plain.encode(payload)) == payload
+
+
+def test_invalid_tokens_are_rejected(payload):
+    backend = CachedTokenBackend("HS256", KEY)
+    token = backend.encode(payload)
+    header, segment, signature = token.split(".")
+
+    forged = jwt.encode({**payload, "user_id": 2}, "other-key-with-enough-bytes-too")
+    unsigned = jwt.encode(payload, None, algorithm="none")
+    expired = backend.encode({**payload, "exp": int(time.time()) - 1})
+    for token in [
+        f"{header}.{segment}.{signature[::-1]}",
+        f"{header}.{forged.split('.')[1]}.{signature}",
+        unsigned,
+        expired,
+        "not.a.token",
+        "garbage",
+    ]:
+        with pytest.raises(TokenBackendError):
+            backend.decode(token)
+    assert backend.decode(expired, verify=False)["user_id"] == 1
+
+
+def test_audience_and_issuer_are_checked(payload):
+    backend = CachedTokenBackend("HS256", KEY, audience="tasks", issuer="login")
+    token = backend.encode(payload)
+    assert backend.decode(token)["aud"] == "tasks"
+
+    for other in [
+        CachedTokenBackend("HS256", KEY),
+        CachedTokenBackend("HS256", KEY, audience="reports", issuer="login"),
+        CachedTokenBackend("HS256", KEY, audience="tasks", issuer="admin"),
+    ]:
+        with pytest.raises(TokenBackendError):
+            backend.decode(other.encode(payload))
+
+
+def test_tokens_issued_in_the_future_are_rejected(payload):
+    backend = CachedTokenBackend("HS256", KEY, leeway=30)
+    now = int(time.time())
+    assert backend.decode(backend.encode({**payload, "iat": now + 10}))
+    with pytest.raises(TokenBackendError):
+        backend.decode(backend.encode({**payload, "iat": now + 120}))
+
+
+def test_backend_follows_the_settings(payload):
+    default = get_token_backend()
+    assert get_token_backend() is default
+    with override_settings(
+        SIMPLE_JWT={"SIGNING_KEY": KEY, "AUDIENCE": "tasks", "ISSUER": "login"}
+    ):
+        backend = get_token_backend()
+        assert (backend.signing_key, backend.audience) == (KEY, "tasks")
+        token = UserAccessToken()
+        assert UserAccessToken(str(token))["aud"] == "tasks"
+        assert jwt.decode(
+            str(token), KEY, algorithms=["HS256"], audience="tasks", issuer="login"
+        )
+    assert get_token_backend().signing_key == default.signing_key
+    assert get_token_backend().audience is None
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_asymmetric_signing(algorithm, payload):
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+
+    token = CachedTokenBackend(algorithm, private_pem, public_pem).encode(payload)
+    # A service holding only the public key can verify, not sign.
+    verifier = CachedTokenBackend(algorithm, None, public_pem)
+    assert verifier.decode(token) == payload
+    assert jwt.decode(token, public_pem, algorithms=[algorithm]) == payload
+    with pytest.raises(TokenBackendError):
+        verifier.encode(payload)
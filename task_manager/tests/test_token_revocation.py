@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import CustomUser, RevokedToken
+from user.revocation import BloomFilter, RevocationStore, revocation_store
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def create_test_user():
+    return CustomUser.objects.create_user(
+        email="testuser@example.com",
+        first_name="Test",
+        last_name="User",
+        password="testpassword123",
+    )
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def refresh_token(create_test_user):
+    return str(UserRefreshToken.for_user(create_test_user))
+
+
+def refresh(client, token):
+    return client.post(reverse("token_refresh"), {"refresh": token})
+
+
+@pytest.mark.django_db
+def test_refresh_rotates_and_revokes_the_old_token(api_client, refresh_token):
+    response = refresh(api_client, refresh_token)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["refresh"] != refresh_token
+    assert "access" in response.data
+
+    replayed = refresh(api_client, refresh_token)
+    assert replayed.status_code == status.HTTP_401_UNAUTHORIZED
+    assert refresh(api_client, response.data["refresh"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_revoked_token_cannot_refresh(api_client, refresh_token):
+    response = api_client.post(reverse("token_revoke"), {"refresh": refresh_token})
+    assert response.status_code == status.HTTP_200_OK
+    assert refresh(api_client, refresh_token).status_code == 401
+    assert (
+        api_client.post(reverse("token_revoke"), {"refresh": refresh_token}).status_code
+        == 401
+    )
+
+
+@pytest.mark.django_db
+def test_valid_token_check_skips_the_database(
+    api_client, refresh_token, django_assert_max_num_queries
+):
+    revocation_store.sync(force=True)
+    # Only the INSERT revoking the old token (in a savepoint).
+    with django_assert_max_num_queries(3) as context:
+        response = refresh(api_client, refresh_token)
+    assert response.status_code == status.HTTP_200_OK
+    assert not any("SELECT" in query["sql"] for query in context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_revocation_by_another_process_is_enforced(api_client, refresh_token):
+    revocation_store.sync(force=True)
+    # Revoked elsewhere: this process' filter hasn't seen it yet.
+    token = UserRefreshToken(refresh_token)
+    RevokedToken.objects.create(
+        jti=token["jti"], expires_at=timezone.now() + timedelta(days=1)
+    )
+    assert refresh(api_client, refresh_token).status_code == 401
+
+
+@pytest.mark.django_db
+def test_sync_sees_revocations_committed_out_of_order():
+    store = RevocationStore(sync_overlap=60)
+    now = timezone.now()
+    expires_at = now + timedelta(days=1)
+    RevokedToken.objects.create(pk=1, jti="first", expires_at=expires_at)
+    store.sync(force=True)
+    RevokedToken.objects.create(pk=10, jti="second", expires_at=expires_at)
+    store.sync(force=True)
+    # Revoked (and given its id) before "second", but committed after it.
+    RevokedToken.objects.create(
+        pk=5,
+        jti="late",
+        expires_at=expires_at,
+        revoked_at=now - timedelta(seconds=10),
+    )
+    store.sync(force=True)
+    assert store.is_revoked("late")
+    assert store.stats()["filter_ids"] == 3
+
+
+@pytest.mark.django_db
+def test_prune_deletes_only_expired_tokens():
+    now = timezone.now()
+    RevokedToken.objects.bulk_create(
+        [
+            RevokedToken(jti=f"expired-{i}", expires_at=now - timedelta(hours=1))
+            for i in range(5)
+        ]
+        + [RevokedToken(jti="live", expires_at=now + timedelta(hours=1))]
+    )
+    call_command("prune_revoked_tokens", batch_size=2)
+    assert list(RevokedToken.objects.values_list("jti", flat=True)) == ["live"]
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"added-{i}")
+    assert all(f"added-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
@@ -0,0 +1,93 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from task.models import Task, TaskChange, TaskCounts, TaskSequence
+from task.search import FTS_TABLE
+from user.models import UserPurge
+from user.purge import run, schedule
+from user.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def create_test_user():
+    user = get_user_model().objects.create_user(
+        email="testuser@example.com",
+        password="testpassword123",
+        first_name="Test",
+        last_name="User",
+    )
+    return user
+
+
+def indexed_task_count():
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_purge_deletes_user_and_tasks_in_batches(create_test_user):
+    client = APIClient()
+    token = UserRefreshToken.for_user(create_test_user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    for i in range(5):
+        client.post(reverse("task-list"), {"title": f"Task {i}"})
+    other = get_user_model().objects.create_user(
+        email="other@example.com", first_name="Other", last_name="User"
+    )
+    Task.objects.create(user=other, title="Kept")
+
+    # Marked for deletion: locked out at once, nothing deleted yet.
+    (purge,) = schedule([create_test_user])
+    assert client.get(reverse("task-list")).status_code == (
+        status.HTTP_401_UNAUTHORIZED
+    )
+    assert Task.objects.filter(user=create_test_user).count() == 5
+    assert [p.pk for p in UserPurge.objects.filter(finished_at=None)] == [purge.pk]
+
+    purge = run(purge, batch_size=2, pause=0)
+    assert not get_user_model().objects.filter(pk=create_test_user.pk).exists()
+    assert list(Task.objects.values_list("title", flat=True)) == ["Kept"]
+    assert not TaskCounts.objects.filter(user_id=create_test_user.pk).exists()
+    assert not TaskSequence.objects.filter(user_id=create_test_user.pk).exists()
+    assert not TaskChange.objects.filter(user_id=create_test_user.pk).exists()
+    assert indexed_task_count() == 1
+    # 5 tasks, their 5 changes, the sequence, the counters and a daily count.
+    assert purge.rows_deleted == 13
+    assert purge.finished_at is not None and purge.stage == ""
+
+    # Nothing left to do for the worker.
+    out = io.StringIO()
+    call_command("purge_users", "--once", stdout=out)
+    assert out.getvalue() == ""
+
+
+@pytest.mark.django_db
+def test_admin_delete_marks_user_for_purge(client, create_test_user):
+    admin = get_user_model().objects.create_superuser(
+        "admin@example.com", "Admin", "User", "adminpassword123"
+    )
+    client.force_login(admin)
+    Task.objects.create(user=create_test_user, title="Task")
+    url = reverse("admin:user_customuser_delete", args=[create_test_user.pk])
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert b"Task (pending)" not in response.content
+
+    client.post(url, {"post": "yes"})
+    create_test_user.refresh_from_db()
+    assert not create_test_user.is_active
+    assert Task.objects.filter(user=create_test_user).count() == 1
+
+    out = io.StringIO()
+    call_command("purge_users", "--once", "--pause-ms", "0", stdout=out)
+    assert out.getvalue().startswith("Deleted testuser@example.com and 5 rows")
+    assert not Task.objects.exists()
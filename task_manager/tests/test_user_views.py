@@ -1,8 +1,13 @@
+import threading
+
 import pytest
+from django.contrib.auth.hashers import make_password
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from user import hashing
+from user.hashing import HashingPool
 from user.models import CustomUser
 
 
@@ -53,3 +58,50 @@ def test_invalid_user_login(api_client, create_test_user):
     invalid_login_data = {"email": "wronguser@example.com", "password": "wrongpassword"}
     response = api_client.post(reverse("login"), invalid_login_data)
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.fixture
+def small_hashing_pool(monkeypatch):
+    pool = HashingPool(workers=1, queue_size=0, retry_after=2)
+    monkeypatch.setattr(hashing, "_pool", pool)
+    return pool
+
+
+@pytest.mark.django_db
+def test_login_rejected_when_hashing_pool_full(
+    api_client, create_test_user, small_hashing_pool
+):
+    release = threading.Event()
+    busy = small_hashing_pool.submit(release.wait)
+    try:
+        login_data = {"email": "testuser@example.com", "password": "testpassword123"}
+        response = api_client.post(reverse("login"), login_data)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["Retry-After"] == "2"
+    finally:
+        release.set()
+        busy.result()
+
+    response = api_client.post(reverse("login"), login_data)
+    assert response.status_code == status.HTTP_200_OK
+    stats = small_hashing_pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.django_db
+def test_login_rehashes_outdated_password(api_client, create_test_user, settings):
+    settings.PASSWORD_HASHERS = [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ]
+    create_test_user.password = make_password("testpassword123", hasher="md5")
+    create_test_user.save()
+
+    login_data = {"email": "testuser@example.com", "password": "testpassword123"}
+    response = api_client.post(reverse("login"), login_data)
+    assert response.status_code == status.HTTP_200_OK
+    create_test_user.refresh_from_db()
+    assert create_test_user.password.startswith("pbkdf2_sha256$")
+    assert create_test_user.check_password("testpassword123")
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import CustomUser
+from . import purge
+from .models import CustomUser, UserPurge
 
 
 class CustomUserAdmin(UserAdmin):
@@ -11,5 +12,34 @@ class CustomUserAdmin(UserAdmin):
     search_fields = ["email", "first_name", "last_name"]
     ordering = ["email"]
 
+    # Deleting a user only marks them for deletion; the purge_users worker
+    # deletes them and their tasks in batches. The confirmation page doesn't
+    # collect (and list) every related row either.
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {"users": len(objs)}, set(), []
+
+    def delete_model(self, request, obj):
+        purge.schedule([obj])
+
+    def delete_queryset(self, request, queryset):
+        purge.schedule(queryset)
+
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+@admin.register(UserPurge)
+class UserPurgeAdmin(admin.ModelAdmin):
+    list_display = [
+        "email",
+        "requested_at",
+        "started_at",
+        "finished_at",
+        "stage",
+        "rows_deleted",
+    ]
+    readonly_fields = list_display + ["user_id"]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .async_views import AsyncUserLoginView, AsyncUserRegistrationView
+
+# Async views that take over these URLs under ASGI, see task_manager.asgi_urls.
+urlpatterns = [
+    path("register/", AsyncUserRegistrationView.as_view(), name="register"),
+    path("login/", AsyncUserLoginView.as_view(), name="login"),
+]
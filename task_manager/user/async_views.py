@@ -0,0 +1,98 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+
+from task_manager.async_api import AsyncAPIView
+
+from .authentication import aauthenticate_credentials
+from .serializers import UserCredentialsSerializer, UserRegistrationSerializer
+from .tokens import UserRefreshToken
+
+
+class AsyncUserRegistrationView(AsyncAPIView):
+    """
+    Async variant of UserRegistrationView, served under ASGI.
+    """
+
+    authentication_required = False
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle user registration by creating a new user instance.
+
+        The password is hashed in the hashing pool and the user is inserted
+        with the async ORM.
+
+        Raises:
+            HashingPoolFull: If the hashing pool is saturated.
+        """
+        serializer = UserRegistrationSerializer(data=request.data)
+        # The email uniqueness validator queries the database.
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        user_model = get_user_model()
+        user = user_model(
+            email=user_model.objects.normalize_email(data["email"]),
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+        )
+        await user.aset_password(data["password"])
+        try:
+            await user.asave(force_insert=True)
+        except IntegrityError:
+            # The email was registered concurrently; report it like the validator.
+            serializer = UserRegistrationSerializer(data=request.data)
+            await sync_to_async(serializer.is_valid)()
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "message": "User successfully registered!",
+                "user": {
+                    "email": user.email,
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                },
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AsyncUserLoginView(AsyncAPIView):
+    """
+    Async variant of UserLoginView, served under ASGI.
+    """
+
+    authentication_required = False
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle user login by generating JWT tokens for the user.
+
+        Raises:
+            AuthenticationFailed: If the credentials are invalid.
+        """
+        serializer = UserCredentialsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
+
+        user = await aauthenticate_credentials(
+            serializer.validated_data["email"], serializer.validated_data["password"]
+        )
+        if user is None:
+            raise AuthenticationFailed("Invalid credentials")
+
+        refresh = UserRefreshToken.for_user(user)
+        return Response(
+            {
+                "message": "Login successful!",
+                "access_token": str(refresh.access_token),
+                "refresh_token": str(refresh),
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserStateCache:
+    """
+    Bounded, thread-safe LRU cache of per-user state with a TTL.
+
+    Entries expire `ttl` seconds after they were stored and the least recently
+    used entry is evicted once `max_size` users are cached.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        Return the cached state for `user_id`, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return state
+
+    def set(self, user_id, state):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, state)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def build_user_state_cache():
+    config = getattr(settings, "USER_STATE_CACHE", {})
+    return UserStateCache(
+        max_size=config.get("MAX_SIZE", 10000), ttl=config.get("TTL", 60)
+    )
+
+
+user_state_cache = build_user_state_cache()
+
+
+class TokenClaimsUser(TokenUser):
+    """
+    Lightweight user built from access token claims instead of a database row.
+
+    Exposes `id`/`pk`, `email` and `is_active`; code that needs the full
+    CustomUser must load it explicitly.
+    """
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+    def __str__(self):
+        return self.email or super().__str__()
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that does not load the user row on every request.
+
+    The user is built from the token claims. Whether the account still exists
+    and is active is read from an in-process cache (USER_STATE_CACHE) that is
+    invalidated when a CustomUser is saved or deleted, so a cache hit costs no
+    query at all.
+    """
+
+    def get_user(self, validated_token):
+        """
+        Return a TokenClaimsUser for the validated token.
+
+        Raises:
+            InvalidToken: If the token has no user id claim.
+            AuthenticationFailed: If the user no longer exists or is inactive.
+        """
+        user_id = self.get_user_id(validated_token)
+        state = user_state_cache.get(user_id)
+        if state is None:
+            state = self.get_state_queryset(user_id).first()
+            if state is not None:
+                user_state_cache.set(user_id, state)
+        return self.get_claims_user(validated_token, state)
+
+    async def aauthenticate(self, request):
+        """
+        Async authenticate() for async views.
+
+        Decoding the token needs no I/O; only a user state cache miss awaits a
+        query, through the async ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """
+        Async get_user().
+        """
+        user_id = self.get_user_id(validated_token)
+        state = user_state_cache.get(user_id)
+        if state is None:
+            state = await self.get_state_queryset(user_id).afirst()
+            if state is not None:
+                user_state_cache.set(user_id, state)
+        return self.get_claims_user(validated_token, state)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def get_state_queryset(self, user_id):
+        return (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values("is_active")
+        )
+
+    def get_claims_user(self, validated_token, state):
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return TokenClaimsUser(validated_token)
+
+
+async def aauthenticate_credentials(email, password):
+    """
+    Async equivalent of authenticate(email=..., password=...) with ModelBackend.
+
+    The user is loaded through the async ORM and the password is verified in
+    the hashing pool (see user.hashing), so the event loop isn't blocked for
+    the duration of the hash.
+
+    Returns:
+        CustomUser: The user if the credentials are valid and the user is
+        active, otherwise None.
+
+    Raises:
+        HashingPoolFull: If the hashing pool is saturated.
+    """
+    user_model = get_user_model()
+    user = await user_model._default_manager.filter(
+        **{user_model.USERNAME_FIELD: email}
+    ).afirst()
+    if user is None:
+        # Hash anyway, like ModelBackend, so the response time doesn't reveal
+        # whether the email is registered.
+        await user_model().aset_password(password)
+        return None
+    if not await user.acheck_password(password) or not user.is_active:
+        return None
+    return user
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import Throttled
+
+
+class HashingPoolFull(Throttled):
+    """
+    Raised when the password hashing pool has no room for another job.
+
+    A Throttled subclass, so DRF answers it with 429 Too Many Requests and a
+    Retry-After header.
+    """
+
+    default_detail = _("Too many logins in progress. Please try again shortly.")
+    default_code = "hashing_pool_full"
+
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing and verification.
+
+    Password hashes are deliberately slow. Running them on the request
+    thread lets a burst of logins occupy every worker, so the requests
+    serving task traffic queue behind them. Here at most `workers` hashes run
+    at once and at most `queue_size` more wait; beyond that a job is rejected
+    straight away with HashingPoolFull instead of tying up a request thread.
+
+    Threads rather than processes: hashlib's PBKDF2 and argon2-cffi release
+    the GIL while hashing, so the hashes run in parallel without pickling
+    arguments to another process.
+    """
+
+    def __init__(self, workers=4, queue_size=8, retry_after=1):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="hashing")
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def submit(self, func, *args):
+        """
+        Schedule `func(*args)` and return its Future.
+
+        Raises:
+            HashingPoolFull: If `workers + queue_size` jobs are already pending.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HashingPoolFull(wait=self.retry_after)
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["in_flight"] += 1
+        try:
+            return self._executor.submit(self._run, func, args, time.perf_counter())
+        except BaseException:
+            self._release(0, 0, failed=True)
+            raise
+
+    def run(self, func, *args):
+        """
+        Run `func(*args)` in the pool and wait for the result.
+        """
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        """
+        Run `func(*args)` in the pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def _run(self, func, args, queued_at):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(*args)
+            failed = False
+            return result
+        finally:
+            self._release(started - queued_at, time.perf_counter() - started, failed)
+
+    def _release(self, waited, ran, failed):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+            self._stats["failed" if failed else "completed"] += 1
+            self._stats["wait_seconds"] += waited
+            self._stats["run_seconds"] += ran
+        self._slots.release()
+
+    def stats(self):
+        """
+        Return the pool's counters: jobs submitted, rejected, completed and
+        failed, jobs in flight (running or queued), and the total seconds
+        jobs spent queued and running.
+        """
+        with self._lock:
+            return {"workers": self.workers, "capacity": self.capacity, **self._stats}
+
+
+def build_hashing_pool():
+    config = getattr(settings, "PASSWORD_HASHING_POOL", {})
+    return HashingPool(
+        workers=config.get("WORKERS", 4),
+        queue_size=config.get("QUEUE_SIZE", 8),
+        retry_after=config.get("RETRY_AFTER", 1),
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    """
+    Return the process-wide hashing pool, creating it on first use so that
+    forked server workers each start their own threads.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = build_hashing_pool()
+    return _pool
@@ -0,0 +1,15 @@
+from jobs.queue import register
+
+from . import purge
+from .models import UserPurge
+
+
+# One purge at a time, so deleting many users at once doesn't multiply the
+# write load of the batches.
+@register("user.purge", concurrency=1)
+def purge_user(job):
+    """
+    Run the purge payload["purge_id"] of a user marked for deletion.
+    """
+    user_purge = purge.run(UserPurge.objects.get(pk=job.payload["purge_id"]))
+    return {"rows_deleted": user_purge.rows_deleted}
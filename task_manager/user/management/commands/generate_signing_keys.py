@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+ALGORITHMS = ("RS256", "EdDSA")
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a private/public PEM key pair for signing tokens with RS256 or "
+        "EdDSA, see JWT_SIGNING_KEY_FILE in settings. Requires cryptography."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directory to write the keys to.")
+        parser.add_argument("--algorithm", choices=ALGORITHMS, default="EdDSA")
+        parser.add_argument(
+            "--force", action="store_true", help="Overwrite existing key files."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+        except ImportError:
+            raise CommandError("The cryptography package is required.")
+
+        directory = Path(options["directory"])
+        private_path = directory / "jwt_signing_key.pem"
+        public_path = directory / "jwt_verifying_key.pem"
+        if not options["force"] and (private_path.exists() or public_path.exists()):
+            raise CommandError(f"Keys already exist in {directory}, use --force.")
+
+        if options["algorithm"] == "RS256":
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        private_path.write_bytes(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        private_path.chmod(0o600)
+        public_path.write_bytes(
+            private_key.public_key().public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        )
+        self.stdout.write(
+            f"JWT_ALGORITHM={options['algorithm']}\n"
+            f"JWT_SIGNING_KEY_FILE={private_path}\n"
+            f"JWT_VERIFYING_KEY_FILE={public_path}"
+        )
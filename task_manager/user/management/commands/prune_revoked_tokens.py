@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete revoked refresh tokens that have expired. Run it periodically, "
+        "e.g. hourly from cron, to keep the revocation table to the tokens "
+        "that could still be used."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Rows deleted per statement, to keep each transaction short.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            # Walks the expires_at index; no full table scan.
+            batch = list(
+                RevokedToken.objects.filter(expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", flat=True)[: options["batch_size"]]
+            )
+            if not batch:
+                break
+            deleted += RevokedToken.objects.filter(pk__in=batch).delete()[0]
+        self.stdout.write(f"Deleted {deleted} expired revoked tokens.")
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user import purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the users marked for deletion (e.g. deleted in the admin) and "
+        "their tasks, in short transactions of --batch-size rows. Runs as a "
+        'background worker checking for new purges every USER_PURGE["POLL_SECONDS"] '
+        "seconds; --once exits when none are left."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction.")
+        parser.add_argument("--pause-ms", type=int, help="Pause between transactions.")
+        parser.add_argument(
+            "--once", action="store_true", help="Exit once no purge is pending."
+        )
+
+    def handle(self, *args, **options):
+        config = purge.get_config()
+        pause = options["pause_ms"]
+        while True:
+            for user_purge in purge.pending():
+                start = time.perf_counter()
+                user_purge = purge.run(
+                    user_purge,
+                    batch_size=options["batch_size"],
+                    pause=None if pause is None else pause / 1000,
+                )
+                self.stdout.write(
+                    f"Deleted {user_purge} and {user_purge.rows_deleted} rows "
+                    f"in {time.perf_counter() - start:.1f} s."
+                )
+            if options["once"]:
+                break
+            time.sleep(config["POLL_SECONDS"])
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0003_revokedtoken"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserPurge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("user_id", models.BigIntegerField(unique=True)),
+                ("email", models.EmailField(max_length=254)),
+                (
+                    "requested_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("started_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, db_index=True, null=True),
+                ),
+                ("stage", models.CharField(blank=True, max_length=100)),
+                ("rows_deleted", models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
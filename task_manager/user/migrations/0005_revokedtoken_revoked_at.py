@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0004_userpurge"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="revokedtoken",
+            name="revoked_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+    ]
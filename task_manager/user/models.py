@@ -1,3 +1,4 @@
+from django.contrib.auth.hashers import make_password, verify_password
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -6,6 +7,8 @@ from django.contrib.auth.models import (
 from django.db import models
 from django.utils import timezone
 
+from .hashing import HashingPoolFull, get_hashing_pool
+
 
 class CustomUserManager(BaseUserManager):
     """
@@ -54,3 +57,101 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.first_name + " " + self.last_name
+
+    def set_password(self, raw_password):
+        """
+        Hash the password in the hashing pool instead of on the calling thread.
+
+        Raises:
+            HashingPoolFull: If the hashing pool is saturated.
+        """
+        if raw_password is None:
+            return super().set_password(raw_password)
+        self.password = get_hashing_pool().run(make_password, raw_password)
+        self._password = raw_password
+
+    async def aset_password(self, raw_password):
+        """
+        Async set_password().
+        """
+        self.password = await get_hashing_pool().arun(make_password, raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Verify the password in the hashing pool.
+
+        A correct password stored with an outdated hasher or work factor, e.g.
+        PBKDF2 once Argon2 is the preferred hasher, is rehashed and saved.
+
+        Raises:
+            HashingPoolFull: If the hashing pool is saturated.
+        """
+        is_correct, must_update = get_hashing_pool().run(
+            verify_password, raw_password, self.password
+        )
+        if is_correct and must_update:
+            try:
+                self.set_password(raw_password)
+            except HashingPoolFull:
+                # Upgrade on a later login rather than fail this one.
+                return is_correct
+            # Hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
+
+    async def acheck_password(self, raw_password):
+        """
+        Async check_password().
+        """
+        is_correct, must_update = await get_hashing_pool().arun(
+            verify_password, raw_password, self.password
+        )
+        if is_correct and must_update:
+            try:
+                await self.aset_password(raw_password)
+            except HashingPoolFull:
+                return is_correct
+            self._password = None
+            await self.asave(update_fields=["password"])
+        return is_correct
+
+
+class RevokedToken(models.Model):
+    """
+    A revoked refresh token, identified by its `jti` claim.
+
+    Rows are only needed until the token would have expired anyway; the
+    prune_revoked_tokens command deletes them after that. `revoked_at` is
+    what other processes sync their revocation filters from.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class UserPurge(models.Model):
+    """
+    A user marked for deletion, whose rows the purge_users worker deletes in
+    batches (user.purge) before deleting the user.
+
+    `user_id` is not a foreign key, so the row outlives the user as a record
+    of the purge. `stage` names the table being purged and `rows_deleted`
+    counts the rows deleted so far.
+    """
+
+    user_id = models.BigIntegerField(unique=True)
+    email = models.EmailField()
+    requested_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    stage = models.CharField(max_length=100, blank=True)
+    rows_deleted = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return self.email
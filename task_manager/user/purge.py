@@ -0,0 +1,147 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, models, router, transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from jobs.queue import enqueue
+
+from .models import UserPurge
+
+# Sent for every batch of rows a purge deletes, inside the batch's
+# transaction, so that anything derived from those rows without a foreign key
+# to them (e.g. the task search index) can be dropped too. The sender is the
+# model; arguments: ids (the primary keys deleted) and using.
+rows_purged = Signal()
+
+
+def get_config():
+    config = {
+        "BATCH_SIZE": 1000,
+        "PAUSE_MS": 50,
+        "POLL_SECONDS": 5,
+    }
+    config.update(getattr(settings, "USER_PURGE", {}))
+    return config
+
+
+def schedule(users):
+    """
+    Mark `users` for deletion: deactivate them, which locks them out at once,
+    and queue a "user.purge" job for each (which the purge_users command
+    also runs).
+
+    Returns:
+        list: The UserPurge of each user.
+    """
+    purges = []
+    for user in users:
+        using = user._state.db or router.db_for_write(type(user))
+        with transaction.atomic(using):
+            user.is_active = False
+            user.save(update_fields=["is_active"])
+            user_purge, created = UserPurge.objects.using(using).get_or_create(
+                user_id=user.pk, defaults={"email": user.email}
+            )
+            if created:
+                enqueue("user.purge", {"purge_id": user_purge.pk}, using=using)
+            purges.append(user_purge)
+    return purges
+
+
+def pending(using=None):
+    """
+    Return the purges not finished yet, oldest first.
+    """
+    using = using or router.db_for_read(UserPurge)
+    return UserPurge.objects.using(using).filter(finished_at=None).order_by("pk")
+
+
+def purged_relations(model):
+    """
+    Return the relations to `model` whose rows are purged in batches: the
+    one-to-many and one-to-one relations with on_delete=CASCADE, from models
+    nothing else points to, so deleting their rows cascades no further.
+    Anything else is left to Django's collector, which deletes the user
+    once these tables are empty.
+    """
+    return [
+        relation
+        for relation in model._meta.related_objects
+        if relation.on_delete is models.CASCADE
+        and not relation.many_to_many
+        and not relation.related_model._meta.related_objects
+    ]
+
+
+def purge_batch(relation, user_id, batch_size, using):
+    """
+    Delete up to `batch_size` of the rows of `relation` pointing to the user.
+
+    Returns:
+        list: The primary keys of the deleted rows.
+    """
+    model = relation.related_model
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    pk = qn(model._meta.pk.column)
+    batch = f"SELECT {pk} FROM {table} WHERE {qn(relation.field.column)} = %s LIMIT %s"
+    with connection.cursor() as cursor:
+        if connection.features.can_return_columns_from_insert:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {pk} IN ({batch}) RETURNING {pk}",
+                [user_id, batch_size],
+            )
+            return [row[0] for row in cursor.fetchall()]
+        # No RETURNING (and, on MySQL, no LIMIT in an IN subquery).
+        cursor.execute(batch, [user_id, batch_size])
+        ids = [row[0] for row in cursor.fetchall()]
+        if ids:
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({placeholders})", ids)
+        return ids
+
+
+def run(purge, batch_size=None, pause=None, using=None):
+    """
+    Delete the user of `purge` and everything that points to them.
+
+    Each table is emptied with one short transaction per `batch_size` rows,
+    `pause` seconds apart so that other writers get the database in between,
+    instead of one transaction holding the write lock for the whole cascade.
+    The progress is saved on `purge` with every batch. A purge that was
+    interrupted carries on where it stopped when run again.
+    """
+    config = get_config()
+    batch_size = batch_size or config["BATCH_SIZE"]
+    pause = config["PAUSE_MS"] / 1000 if pause is None else pause
+    User = get_user_model()
+    using = using or router.db_for_write(User)
+    purges = UserPurge.objects.using(using).filter(pk=purge.pk)
+    if purge.started_at is None:
+        purges.update(started_at=timezone.now())
+
+    for relation in purged_relations(User):
+        model = relation.related_model
+        while True:
+            with transaction.atomic(using):
+                ids = purge_batch(relation, purge.user_id, batch_size, using)
+                if ids:
+                    rows_purged.send(sender=model, ids=ids, using=using)
+                purges.update(
+                    stage=model._meta.label,
+                    rows_deleted=F("rows_deleted") + len(ids),
+                )
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause)
+
+    with transaction.atomic(using):
+        User.objects.using(using).filter(pk=purge.user_id).delete()
+        purges.update(stage="", finished_at=timezone.now())
+    purge.refresh_from_db(using=using)
+    return purge
@@ -0,0 +1,178 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    `in` never gives a false negative; it gives a false positive for about
+    `error_rate` of the strings not added, as long as at most `capacity`
+    strings have been added.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one digest give every position.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationStore:
+    """
+    Revoked token ids (`jti`), stored in the RevokedToken table with a Bloom
+    filter of them in memory.
+
+    is_revoked() only queries the database when the filter reports a
+    possible match, so checking a token that was never revoked costs no query.
+    The filter is loaded on first use and picks up rows revoked by other
+    processes at most every `sync_interval` seconds. That delay never lets a
+    revoked refresh token through: revoke() inserts the `jti` under a unique
+    constraint and reports a token that was already revoked, and refreshing a
+    token revokes it (see UserRefreshToken.blacklist()).
+
+    Rows are synced by `revoked_at` rather than by id: a revocation can
+    commit after others with later ids or times, so each sync re-reads the
+    last `sync_overlap` seconds before the newest row seen. That must cover
+    the longest a revoking transaction takes to commit plus the clock skew
+    between servers.
+    """
+
+    def __init__(
+        self, capacity=100000, error_rate=0.001, sync_interval=5, sync_overlap=60
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.sync_overlap = timedelta(seconds=sync_overlap)
+        self._filter = None
+        self._watermark = None
+        self._synced_at = 0.0
+        self._lookups = 0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        """
+        Return whether the token id `jti` has been revoked.
+        """
+        from .models import RevokedToken
+
+        self.sync()
+        if jti not in self._filter:
+            return False
+        with self._lock:
+            self._lookups += 1
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        """
+        Record `jti` as revoked until `expires_at`.
+
+        Returns:
+            bool: True if the token was revoked now, False if it already was.
+        """
+        from .models import RevokedToken
+
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+            revoked = True
+        except IntegrityError:
+            revoked = False
+        self.sync()
+        with self._lock:
+            self._filter.add(jti)
+        return revoked
+
+    def sync(self, force=False):
+        """
+        Load the revoked ids added since the last sync, less the overlap,
+        into the filter.
+
+        The filter is rebuilt from the unexpired rows on first use and once it
+        holds more ids than it was sized for, which also drops pruned ids.
+        """
+        if (
+            self._filter is not None
+            and not force
+            and time.monotonic() - self._synced_at < self.sync_interval
+        ):
+            return
+        from .models import RevokedToken
+
+        with self._lock:
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                self._watermark = timezone.now()
+                rows = RevokedToken.objects.filter(expires_at__gt=self._watermark)
+                self._filter = BloomFilter(
+                    max(self.capacity, 2 * rows.count()), self.error_rate
+                )
+            else:
+                rows = RevokedToken.objects.filter(
+                    revoked_at__gte=self._watermark - self.sync_overlap
+                )
+            for revoked_at, jti in rows.values_list("revoked_at", "jti").iterator():
+                # The overlap reads rows again; don't count them twice. An id
+                # the filter already (falsely) reports needs no bits either.
+                if jti not in self._filter:
+                    self._filter.add(jti)
+                self._watermark = max(self._watermark, revoked_at)
+            self._synced_at = time.monotonic()
+
+    def stats(self):
+        """
+        Return the number of ids in the filter and of checks that queried
+        the database (revoked tokens and false positives).
+        """
+        return {
+            "filter_ids": self._filter.count if self._filter is not None else 0,
+            "lookups": self._lookups,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+            self._watermark = None
+            self._synced_at = 0.0
+            self._lookups = 0
+
+
+def build_revocation_store():
+    config = getattr(settings, "TOKEN_REVOCATION", {})
+    return RevocationStore(
+        capacity=config.get("BLOOM_CAPACITY", 100000),
+        error_rate=config.get("BLOOM_ERROR_RATE", 0.001),
+        sync_interval=config.get("SYNC_INTERVAL", 5),
+        sync_overlap=config.get("SYNC_OVERLAP", 60),
+    )
+
+
+revocation_store = build_revocation_store()
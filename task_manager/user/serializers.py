@@ -2,6 +2,12 @@ from django.contrib.auth import authenticate, get_user_model
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenRefreshSerializer,
+)
+
+from .tokens import UserRefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -44,10 +50,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserLoginSerializer(serializers.Serializer):
+class UserCredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
+
+class UserLoginSerializer(UserCredentialsSerializer):
     def validate(self, attrs):
         email = attrs.get("email")
         password = attrs.get("password")
@@ -58,3 +66,17 @@ class UserLoginSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer for UserRefreshToken: with ROTATE_REFRESH_TOKENS and
+    BLACKLIST_AFTER_ROTATION, the submitted token is revoked and a new one
+    returned, so each refresh token can be used once.
+    """
+
+    token_class = UserRefreshToken
+
+
+class UserTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = UserRefreshToken
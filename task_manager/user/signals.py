@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_state_cache
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_state(sender, instance, **kwargs):
+    """
+    Drop the cached auth state when a user is saved, deactivated or deleted.
+    """
+    user_state_cache.invalidate(instance.pk)
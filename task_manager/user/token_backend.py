@@ -0,0 +1,184 @@
+import binascii
+import json
+import time
+
+import jwt
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import has_crypto
+from jwt.utils import base64url_decode, base64url_encode
+from rest_framework_simplejwt import settings as jwt_settings
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.utils import format_lazy
+
+
+class CachedTokenBackend(TokenBackend):
+    """
+    TokenBackend that prepares everything that doesn't vary per token once.
+
+    PyJWT's encode() and decode() parse the key (a PEM file's contents for
+    RS256/EdDSA), build and serialize the header and merge their options on
+    every call. Here the keys are loaded, the header encoded and the
+    audience/issuer claims built when the backend is created, so issuing a
+    token is one JSON dump and one signature, and verifying it one signature
+    check and one JSON load.
+
+    The tokens are standard JWTs: TokenBackend and other JWT libraries
+    configured with the same key and algorithm accept them, and tokens with a
+    different header (e.g. a `kid`) are handed to TokenBackend.decode().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._algorithm = jwt.get_algorithm_by_name(self.algorithm)
+        self._signing_key = (
+            self._algorithm.prepare_key(self.signing_key) if self.signing_key else None
+        )
+        verifying_key = (
+            self.signing_key if self.algorithm.startswith("HS") else self.verifying_key
+        )
+        self._verifying_key = (
+            self._algorithm.prepare_key(verifying_key) if verifying_key else None
+        )
+        self._header = base64url_encode(
+            json.dumps(
+                {"alg": self.algorithm, "typ": "JWT"},
+                separators=(",", ":"),
+                sort_keys=True,
+            ).encode()
+        )
+        self._claims = {}
+        if self.audience is not None:
+            self._claims["aud"] = self.audience
+        if self.issuer is not None:
+            self._claims["iss"] = self.issuer
+        self._leeway = self.get_leeway().total_seconds()
+
+    def _validate_algorithm(self, algorithm):
+        # PyJWT signs EdDSA (Ed25519) tokens; simplejwt's backend doesn't list it.
+        if algorithm != "EdDSA":
+            return super()._validate_algorithm(algorithm)
+        if not has_crypto:
+            raise TokenBackendError(
+                format_lazy(
+                    _("You must have cryptography installed to use {}."), algorithm
+                )
+            )
+
+    def encode(self, payload):
+        """
+        Returns an encoded token for the given payload dictionary.
+        """
+        if self._signing_key is None:
+            raise TokenBackendError(_("No signing key configured"))
+        segment = base64url_encode(
+            json.dumps(
+                {**payload, **self._claims},
+                separators=(",", ":"),
+                cls=self.json_encoder,
+            ).encode()
+        )
+        signing_input = self._header + b"." + segment
+        signature = self._algorithm.sign(signing_input, self._signing_key)
+        return (signing_input + b"." + base64url_encode(signature)).decode()
+
+    def decode(self, token, verify=True):
+        """
+        Performs a validation of the given token and returns its payload
+        dictionary.
+
+        Raises a `TokenBackendError` if the token is malformed, if its
+        signature check fails, or if its claims indicate it has expired, isn't
+        valid yet or is for another audience or issuer.
+        """
+        if isinstance(token, str):
+            token = token.encode()
+        try:
+            header, segment, signature = token.split(b".")
+        except ValueError:
+            raise TokenBackendError(_("Token is invalid or expired"))
+        if header != self._header or self.jwks_client or self._verifying_key is None:
+            return super().decode(token.decode(), verify=verify)
+
+        try:
+            if verify and not self._algorithm.verify(
+                header + b"." + segment,
+                self._verifying_key,
+                base64url_decode(signature),
+            ):
+                raise TokenBackendError(_("Token is invalid or expired"))
+            payload = json.loads(base64url_decode(segment))
+        except (binascii.Error, ValueError):
+            raise TokenBackendError(_("Token is invalid or expired"))
+        if not isinstance(payload, dict):
+            raise TokenBackendError(_("Token is invalid or expired"))
+        if verify:
+            self.validate_claims(payload)
+        return payload
+
+    def validate_claims(self, payload):
+        """
+        The registered claim checks jwt.decode() makes: `exp`, `nbf`, `iat`,
+        `aud` and `iss`.
+        """
+        now = time.time()
+        try:
+            if "exp" in payload and int(payload["exp"]) <= now - self._leeway:
+                raise TokenBackendError(_("Token is invalid or expired"))
+            if "nbf" in payload and int(payload["nbf"]) > now + self._leeway:
+                raise TokenBackendError(_("Token is invalid or expired"))
+            if "iat" in payload and int(payload["iat"]) > now + self._leeway:
+                raise TokenBackendError(_("Token is invalid or expired"))
+        except (TypeError, ValueError):
+            raise TokenBackendError(_("Token is invalid or expired"))
+
+        if self.audience is not None:
+            audience = payload.get("aud")
+            expected = (
+                {self.audience}
+                if isinstance(self.audience, str)
+                else set(self.audience)
+            )
+            if isinstance(audience, str):
+                received = {audience}
+            elif isinstance(audience, list):
+                received = {item for item in audience if isinstance(item, str)}
+            else:
+                received = set()
+            if not expected & received:
+                raise TokenBackendError(_("Token is invalid or expired"))
+        if self.issuer is not None and payload.get("iss") != self.issuer:
+            raise TokenBackendError(_("Token is invalid or expired"))
+
+
+def build_token_backend(api_settings):
+    return CachedTokenBackend(
+        api_settings.ALGORITHM,
+        signing_key=api_settings.SIGNING_KEY,
+        verifying_key=api_settings.VERIFYING_KEY,
+        audience=api_settings.AUDIENCE,
+        issuer=api_settings.ISSUER,
+        jwk_url=api_settings.JWK_URL,
+        leeway=api_settings.LEEWAY,
+        json_encoder=api_settings.JSON_ENCODER,
+    )
+
+
+_token_backend = (None, None)
+
+
+def get_token_backend():
+    """
+    Return the CachedTokenBackend for the current SIMPLE_JWT settings.
+
+    It is built on first use, and again whenever simplejwt reloads its
+    settings (override_settings(), a rotated key): simplejwt then replaces
+    its module's `api_settings`, so it is looked up on every call.
+    """
+    global _token_backend
+    api_settings, backend = _token_backend
+    if api_settings is not jwt_settings.api_settings:
+        api_settings = jwt_settings.api_settings
+        backend = build_token_backend(api_settings)
+        _token_backend = (api_settings, backend)
+    return backend
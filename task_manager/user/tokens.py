@@ -0,0 +1,82 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .revocation import revocation_store
+from .token_backend import get_token_backend
+
+
+class CachedBackendMixin:
+    """
+    Sign and verify with the CachedTokenBackend, and set the time claims
+    without going through a time tuple.
+    """
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+    def set_exp(self, claim="exp", from_time=None, lifetime=None):
+        if from_time is None:
+            from_time = self.current_time
+        if lifetime is None:
+            lifetime = self.lifetime
+        # Same value as datetime_to_epoch(), which goes through utctimetuple().
+        self.payload[claim] = int((from_time + lifetime).timestamp())
+
+    def set_iat(self, claim="iat", at_time=None):
+        if at_time is None:
+            at_time = self.current_time
+        self.payload[claim] = int(at_time.timestamp())
+
+
+class UserAccessToken(CachedBackendMixin, AccessToken):
+    pass
+
+
+class UserRefreshToken(CachedBackendMixin, RefreshToken):
+    """
+    Refresh token carrying the claims StatelessJWTAuthentication builds its
+    user from. Access tokens derived from it inherit the same claims.
+
+    Revocation works like simplejwt's BlacklistMixin, without its outstanding
+    token table: only revoked tokens are stored, see user.revocation.
+    """
+
+    access_token_class = UserAccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["email"] = user.email
+        token["is_active"] = user.is_active
+        return token
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        """
+        Raises:
+            TokenError: If the token has been revoked.
+        """
+        if revocation_store.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        """
+        Revoke the token. Called by the refresh serializer before it rotates
+        the token and by the revoke endpoint.
+
+        Raises:
+            TokenError: If the token was already revoked, e.g. a rotated
+            refresh token being replayed concurrently.
+        """
+        revoked = revocation_store.revoke(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload["exp"]),
+        )
+        if not revoked:
+            raise TokenError(_("Token is blacklisted"))
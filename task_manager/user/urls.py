@@ -7,4 +7,5 @@ urlpatterns = [
     path("register/", UserRegistrationView.as_view(), name="register"),
     path("login/", UserLoginView.as_view(), name="login"),
     path("token/refresh/", jwt_views.TokenRefreshView.as_view(), name="token_refresh"),
+    path("token/revoke/", jwt_views.TokenBlacklistView.as_view(), name="token_revoke"),
 ]
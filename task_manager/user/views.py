@@ -1,9 +1,9 @@
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from .serializers import UserLoginSerializer, UserRegistrationSerializer
+from .tokens import UserRefreshToken
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -52,7 +52,7 @@ class UserLoginView(generics.GenericAPIView):
         if serializer.is_valid():
             user = serializer.validated_data["user"]
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
 
             return Response(